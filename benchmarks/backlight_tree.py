@@ -0,0 +1,84 @@
+"""
+Check of sysfs backlight discovery against a fake /sys/class/backlight tree.
+
+Builds a temporary tree with two interfaces for one laptop panel,
+acpi_video0 (firmware) and intel_backlight (raw), plus a fake
+screen_brightness_control backend that lists the panel and one external
+monitor. Verifies that only one interface per panel is written and that
+the external monitor keeps its index.
+
+Usage:
+    python benchmarks/backlight_tree.py
+
+Exits with status 1 if any check fails.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from controllers.backlight import SysfsBacklightBackend  # noqa: E402
+
+
+class FakeMonitorBackend:
+    """Stand-in for screen_brightness_control listing the panel first, then external monitors."""
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.writes = []
+
+    def set_brightness(self, value, display=None):
+        self.writes.append((display, value))
+        self.values[display] = value
+
+    def get_brightness(self, display=None):
+        return list(self.values) if display is None else [self.values[display]]
+
+
+def make_device(root, name, kind, max_brightness, brightness):
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    for file_name, value in (("type", kind), ("max_brightness", max_brightness), ("brightness", brightness)):
+        with open(os.path.join(path, file_name), "w") as device_file:
+            device_file.write(f"{value}\n")
+
+
+def read_raw(root, name):
+    with open(os.path.join(root, name, "brightness")) as device_file:
+        return int(device_file.read().strip())
+
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as root:
+        make_device(root, "acpi_video0", "firmware", 100, 50)
+        make_device(root, "intel_backlight", "raw", 1000, 500)
+        fallback = FakeMonitorBackend([50, 60])
+        backend = SysfsBacklightBackend(root, fallback=lambda: fallback)
+
+        names = [device.name for device in backend.devices]
+        if names != ["acpi_video0"]:
+            failures.append(f"expected only acpi_video0, got {names}")
+
+        backend.set_brightness(40)
+        if read_raw(root, "acpi_video0") != 40:
+            failures.append(f"acpi_video0 not written: {read_raw(root, 'acpi_video0')}")
+        if read_raw(root, "intel_backlight") != 500:
+            failures.append(f"intel_backlight written as well: {read_raw(root, 'intel_backlight')}")
+        if fallback.writes != [(1, 40)]:
+            failures.append(f"expected one external write at index 1, got {fallback.writes}")
+        values = backend.get_brightness()
+        if values != [40, 40]:
+            failures.append(f"expected [40, 40], got {values}")
+        backend.close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if not failures:
+        print("ok")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Startup import-time benchmark with a regression budget.
+
+Imports each target module in a fresh interpreter under `python -X importtime`,
+takes the median cumulative import time over several runs, and checks it
+against the budget in import_budget.json. Budgets are multiples of the
+import time of a baseline module (numpy) measured the same way on the same
+machine, so the gate holds on slow CI runners as well as fast laptops. The
+budget also lists modules a target must not pull in, such as PyQt5 for the
+headless daemon, and modules a target needs; targets whose requirements
+are not installed are reported as skipped.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--budget FILE] [--output FILE]
+
+Exits with status 1 if any target is over budget or imports a forbidden module.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+DEFAULT_BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+
+
+def measure_import(module):
+    """
+    Import a module in a fresh interpreter and parse the -X importtime report.
+
+    Returns:
+        tuple: (cumulative_us, imported) where cumulative_us is the cumulative
+        import time of the module in microseconds and imported is the set of
+        all module names loaded while importing it.
+    """
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=SRC
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    cumulative_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us, imported
+
+
+def median_import_ms(module, runs):
+    """Median cumulative import time in milliseconds, with the samples and the modules loaded."""
+    samples = []
+    imported = set()
+    for _ in range(runs):
+        cumulative_us, imported = measure_import(module)
+        samples.append(cumulative_us)
+    return statistics.median(samples) / 1000, samples, imported
+
+
+def run(budget, runs):
+    baseline_ms, _, _ = median_import_ms(budget["baseline"], runs)
+    report = {
+        "python": sys.version.split()[0], "runs": runs,
+        "baseline": {"module": budget["baseline"], "median_ms": round(baseline_ms, 2)},
+        "targets": {},
+    }
+    ok = True
+    for module, limits in budget["targets"].items():
+        missing = [name for name in limits.get("requires", []) if importlib.util.find_spec(name) is None]
+        if missing:
+            report["targets"][module] = {"skipped": f"not installed: {', '.join(missing)}", "ok": True}
+            continue
+        median_ms, samples, imported = median_import_ms(module, runs)
+        budget_ms = limits["budget_x_baseline"] * baseline_ms
+        forbidden = sorted(
+            name for name in imported
+            if any(name == banned or name.startswith(banned + ".") for banned in limits.get("forbidden", []))
+        )
+        within = median_ms <= budget_ms and not forbidden
+        ok = ok and within
+        report["targets"][module] = {
+            "median_ms": round(median_ms, 2),
+            "min_ms": round(min(samples) / 1000, 2),
+            "max_ms": round(max(samples) / 1000, 2),
+            "budget_ms": round(budget_ms, 2),
+            "modules_imported": len(imported),
+            "forbidden_imported": forbidden,
+            "ok": within,
+        }
+    report["ok"] = ok
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET, help="JSON budget file")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    with open(args.budget) as budget_file:
+        budget = json.load(budget_file)
+    report = run(budget, args.runs)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text + "\n")
+    print(text)
+    for module, result in report["targets"].items():
+        if "skipped" in result:
+            print(f"SKIPPED: {module} ({result['skipped']})", file=sys.stderr)
+        elif not result["ok"]:
+            print(
+                f"OVER BUDGET: {module} took {result['median_ms']} ms "
+                f"(budget {result['budget_ms']} ms), forbidden imports: {result['forbidden_imported']}",
+                file=sys.stderr
+            )
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Benchmark of the capture -> analyze -> apply pipeline.
+
+Drives BrightnessController with synthetic frames at common desktop sizes,
+a synthetic capture source and a fake brightness backend with configurable
+write latency. Every scenario runs in a fresh interpreter so peak RSS is
+measured per scenario. Reports per-stage latency percentiles, bytes
+allocated per tick and peak RSS as JSON.
+
+Usage:
+    python benchmarks/pipeline.py [--ticks 200] [--write-latency-ms 5]
+                                  [--estimator strided] [--incremental]
+                                  [--analysis-process] [--capture-region center]
+                                  [--memory-ceiling-mb 64]
+                                  [--output results.json]
+                                  [--compare baseline.json --tolerance 0.25]
+
+With --compare, exits with status 1 if any p50 latency or allocation figure
+regressed by more than the tolerance against the baseline report.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# (height, width) of the captured virtual desktop
+SCENARIOS = {
+    "1080p": (1080, 1920),
+    "1440p": (1440, 2560),
+    "4k": (2160, 3840),
+    "dual-1080p": (1080, 3840),
+    "dual-4k": (2160, 7680),
+    "triple-1440p": (1440, 7680),
+}
+
+STAGES = ("get_average_brightness", "calculate_target_brightness", "adjust_brightness", "write")
+
+
+class FakeBrightnessBackend:
+    """Stand-in for screen_brightness_control that sleeps for a fixed write latency."""
+
+    def __init__(self, write_latency=0.0, displays=1):
+        self.write_latency = write_latency
+        self.values = [50] * displays
+        self.write_durations = []
+
+    def set_brightness(self, value, display=None):
+        started = time.perf_counter()
+        if self.write_latency:
+            time.sleep(self.write_latency)
+        targets = range(len(self.values)) if display is None else [display]
+        for index in targets:
+            self.values[index] = value
+        self.write_durations.append(time.perf_counter() - started)
+
+    def get_brightness(self, display=None):
+        return list(self.values) if display is None else [self.values[display]]
+
+
+def make_frames(height, width, count=4, seed=0):
+    """A short sequence of noisy frames with a window moving across them and changing brightness."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 96, size=(height, width, 3), dtype=np.uint8)
+    frames = []
+    for index in range(count):
+        frame = base.copy()
+        x = (index * width // count) % max(width - width // 4, 1)
+        frame[height // 4:3 * height // 4, x:x + width // 4] = 40 + 60 * index
+        frames.append(frame)
+    return frames
+
+
+def percentiles(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1000
+
+    return {
+        "p50_ms": round(pick(0.50), 4),
+        "p90_ms": round(pick(0.90), 4),
+        "p99_ms": round(pick(0.99), 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+        "count": len(ordered),
+    }
+
+
+def run_scenario(name, ticks, write_latency, estimator, incremental, metering, analysis_process,
+                 capture_region, memory_ceiling_mb):
+    """Run one scenario in this process and return its report."""
+    from controllers.brightness_controller import BrightnessController
+    from controllers.capture import SyntheticCaptureBackend
+
+    height, width = SCENARIOS[name]
+    capture = SyntheticCaptureBackend(make_frames(height, width))
+    backend = FakeBrightnessBackend(write_latency)
+    controller = BrightnessController(capture, backend)
+    controller.set_memory_ceiling(int(memory_ceiling_mb * 1024 * 1024))
+    controller.set_estimator(estimator)
+    controller.set_incremental(incremental)
+    controller.set_metering(metering)
+    controller.set_analysis_process(analysis_process)
+    controller.set_capture_region(capture_region)
+    # Let every changed target through so the write path is measured
+    controller.write_filter.hysteresis = 0
+    controller.write_filter.max_writes_per_minute = 0
+
+    timings = {stage: [] for stage in STAGES}
+    for _ in range(ticks):
+        started = time.perf_counter()
+        avg_brightness = controller.get_average_brightness()
+        timings["get_average_brightness"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        controller.calculate_target_brightness(avg_brightness, 7)
+        timings["calculate_target_brightness"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        controller.adjust_brightness(sensitivity=7, max_brightness=100, min_brightness=0)
+        timings["adjust_brightness"].append(time.perf_counter() - started)
+    timings["write"] = backend.write_durations
+
+    # Allocation pass: peak bytes allocated above the steady state per tick
+    tracemalloc.start()
+    allocated = []
+    for _ in range(min(ticks, 50)):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        controller.adjust_brightness(sensitivity=7, max_brightness=100, min_brightness=0)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak - baseline)
+    tracemalloc.stop()
+    dropped = sum(writer.dropped for writer in controller.writers.values())
+    pool = controller.buffer_pool.stats()
+    controller.close()
+
+    allocated.sort()
+    return {
+        "frame": {"height": height, "width": width},
+        "stages": {stage: percentiles(samples) for stage, samples in timings.items()},
+        "allocated_bytes_per_tick": {
+            "p50": allocated[len(allocated) // 2],
+            "max": allocated[-1],
+        },
+        "writes": len(backend.write_durations),
+        "writes_dropped": dropped,
+        "buffer_pool": pool,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Return human readable regressions of report against baseline."""
+    regressions = []
+    for name, result in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for stage, stats in result["stages"].items():
+            before = (previous["stages"].get(stage) or {}).get("p50_ms")
+            if stats and before and stats["p50_ms"] > before * (1 + tolerance):
+                regressions.append(f"{name}/{stage}: p50 {before} ms -> {stats['p50_ms']} ms")
+        before = previous["allocated_bytes_per_tick"]["p50"]
+        after = result["allocated_bytes_per_tick"]["p50"]
+        if before and after > before * (1 + tolerance):
+            regressions.append(f"{name}: allocated/tick {before} B -> {after} B")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--ticks", type=int, default=200, help="ticks per scenario")
+    parser.add_argument("--write-latency-ms", type=float, default=5.0, help="fake brightness write latency")
+    parser.add_argument("--estimator", choices=["exact", "strided"], default="strided")
+    parser.add_argument("--incremental", action="store_true", help="enable tile-based incremental analysis")
+    parser.add_argument("--metering", choices=["mean", "linear", "percentile", "trimmed"], default="mean")
+    parser.add_argument("--analysis-process", action="store_true", help="analyze in a worker process")
+    parser.add_argument("--capture-region", choices=["full", "center"], default="full",
+                        help="capture the whole frame or a center crop")
+    parser.add_argument("--memory-ceiling-mb", type=float, default=64.0,
+                        help="ceiling on pooled analysis buffers")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    settings = [args.ticks, args.write_latency_ms / 1000, args.estimator, args.incremental, args.metering,
+                args.analysis_process, args.capture_region, args.memory_ceiling_mb]
+    if args.single:
+        print(json.dumps(run_scenario(args.single, *settings)))
+        return 0
+
+    report = {
+        "python": sys.version.split()[0],
+        "settings": {
+            "ticks": args.ticks, "write_latency_ms": args.write_latency_ms,
+            "estimator": args.estimator, "incremental": args.incremental,
+            "metering": args.metering, "analysis_process": args.analysis_process,
+            "capture_region": args.capture_region, "memory_ceiling_mb": args.memory_ceiling_mb,
+        },
+        "scenarios": {},
+    }
+    for name in args.scenarios:
+        command = [
+            sys.executable, os.path.abspath(__file__), "--single", name,
+            "--ticks", str(args.ticks), "--write-latency-ms", str(args.write_latency_ms),
+            "--estimator", args.estimator, "--metering", args.metering,
+            "--capture-region", args.capture_region, "--memory-ceiling-mb", str(args.memory_ceiling_mb),
+        ]
+        if args.incremental:
+            command.append("--incremental")
+        if args.analysis_process:
+            command.append("--analysis-process")
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(result.stderr, file=sys.stderr)
+            return 2
+        report["scenarios"][name] = json.loads(result.stdout.strip().splitlines()[-1])
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text + "\n")
+    print(text)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
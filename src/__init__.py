@@ -1,7 +1,14 @@
-from .ui import UI
-from .controllers.brightness_controller import BrightnessController
-from .components import TitleSection, ButtonSection, SliderSection, StatusSection
-from .utils.styles import StyleManager
+# Exports are resolved on first access so that importing the package (for
+# example from the headless daemon) does not load PyQt5 and every UI component.
+_EXPORTS = {
+    'UI': ('.ui', 'UI'),
+    'BrightnessController': ('.controllers.brightness_controller', 'BrightnessController'),
+    'TitleSection': ('.components', 'TitleSection'),
+    'ButtonSection': ('.components', 'ButtonSection'),
+    'SliderSection': ('.components', 'SliderSection'),
+    'StatusSection': ('.components', 'StatusSection'),
+    'StyleManager': ('.utils.styles', 'StyleManager'),
+}
 
 __all__ = [
     'UI',
@@ -11,4 +18,14 @@ __all__ = [
     'SliderSection',
     'StatusSection',
     'StyleManager'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    module_name, attribute = _EXPORTS[name]
+    value = getattr(import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -0,0 +1,16 @@
+# __main__.py
+"""
+Runs the headless daemon as `python -m src [options]` from the repository root.
+
+Takes the same options as `python src/headless.py`.
+"""
+import os
+import sys
+
+# The daemon's modules import each other as top-level packages (controllers, ...)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from headless import main  # noqa: E402
+
+sys.argv[0] = "python -m src"  # Shown in --help instead of __main__.py
+sys.exit(main())
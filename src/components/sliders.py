@@ -27,6 +27,9 @@ class SliderSection:
         self.manual_brightness_label.setVisible(False)
 
         self.manual_brightness_slider.valueChanged.connect(self.parent.set_manual_brightness)
+        self.sensitivity_slider.valueChanged.connect(self.parent.on_settings_changed)
+        self.max_brightness_slider.valueChanged.connect(self.parent.on_settings_changed)
+        self.min_brightness_slider.valueChanged.connect(self.parent.on_settings_changed)
         self.min_brightness_slider.valueChanged.connect(self._ensure_min_max_order)
         self.max_brightness_slider.valueChanged.connect(self._ensure_min_max_order)
 
@@ -11,10 +11,16 @@ class StatusSection:
     def _create_status(self):
         """Create and setup the status display."""
         self.group = QGroupBox("Status")
-        self.group.setFixedHeight(100)
+        self.group.setFixedHeight(160)
         status_layout = QVBoxLayout()
         self.status_label = QLabel("Average Brightness: 0\nAdjusted Brightness: 0%")
         status_layout.addWidget(self.status_label)
+        self.polling_label = QLabel("Polling Interval: - ms")
+        status_layout.addWidget(self.polling_label)
+        self.metrics_label = QLabel("")
+        status_layout.addWidget(self.metrics_label)
+        self.health_label = QLabel("Health: -")
+        status_layout.addWidget(self.health_label)
         self.group.setLayout(status_layout)
         self.group.setStyleSheet("color: rgb(230, 180, 255);")
         self.layout.addWidget(self.group)
@@ -30,4 +36,44 @@ class StatusSection:
         self.status_label.setText(
             f"Average Brightness: {avg_brightness:.2f}\n"
             f"Adjusted Brightness: {adjusted_brightness:.2f}%"
-        )
\ No newline at end of file
+        )
+        
+    def update_polling(self, interval_ms, rate_hz):
+        """
+        Update the display of the adaptive polling rate.
+        
+        Args:
+            interval_ms (int): Current polling interval in milliseconds
+            rate_hz (float): Current sampling rate in ticks per second
+        """
+        self.polling_label.setText(f"Polling Interval: {interval_ms} ms ({rate_hz:.1f} Hz)")
+        
+    def update_metrics(self, metrics):
+        """
+        Update the display of hot-path timings and counters.
+        
+        Args:
+            metrics (Metrics): Controller metrics registry
+        """
+        def p50(stage):
+            value = metrics.quantile(stage, 0.5)
+            return "-" if value is None else f"{value * 1000:.1f}"
+            
+        snapshot = metrics.snapshot()
+        counters, gauges = snapshot["counters"], snapshot["gauges"]
+        self.metrics_label.setText(
+            f"p50 ms: capture {p50('capture')}, analyze {p50('analyze')}, write {p50('write')}\n"
+            f"Writes: {gauges.get('writes_issued', 0)} issued, "
+            f"{gauges.get('writes_suppressed', 0)} suppressed, "
+            f"{gauges.get('writes_dropped', 0)} dropped, "
+            f"capture failures: {counters.get('capture_failures', 0)}"
+        )
+        
+    def update_health(self, health):
+        """
+        Update the display of backend and display health.
+        
+        Args:
+            health (HealthTracker): Controller circuit breakers
+        """
+        self.health_label.setText(f"Health: {health.summary()}")
\ No newline at end of file
@@ -0,0 +1,46 @@
+import numpy as np
+from collections import namedtuple
+from typing import Optional, Tuple
+from .buffers import BufferPool
+from .luminance import estimate_luma_mean, histogram_luminance, luma_histogram
+from .tiles import TileAnalyzer
+
+AnalysisSettings = namedtuple(
+    "AnalysisSettings",
+    "estimator_mode sampling_factor metering percentile trim incremental tile_size"
+)
+
+
+def analyze_region(frame: np.ndarray, channels: str, settings: AnalysisSettings,
+                   analyzer: Optional[TileAnalyzer] = None,
+                   pool: Optional[BufferPool] = None) -> Tuple[float, bool, Optional[float]]:
+    """
+    Compute the metered luma of a frame region.
+
+    Args:
+        frame (np.ndarray): HxWxC uint8 region
+        channels (str): Channel order of the frame
+        settings (AnalysisSettings): Estimator, metering and incremental settings
+        analyzer (TileAnalyzer, optional): Incremental analyzer of this region,
+            used when settings.incremental is set and metering is "mean"
+        pool (BufferPool, optional): Source of scratch buffers
+
+    Returns:
+        tuple: (average_brightness, changed, error_bound) where changed is
+        False only when incremental analysis found the region unchanged, and
+        error_bound is None when unknown.
+    """
+    if settings.metering != "mean":
+        histogram = luma_histogram(frame, settings.sampling_factor, channels, pool)
+        return histogram_luminance(
+            histogram, settings.metering, settings.percentile, settings.trim
+        ), True, None
+
+    if settings.incremental and analyzer is not None:
+        avg_brightness, changed_tiles = analyzer.analyze(frame, channels)
+        return avg_brightness, changed_tiles > 0, 0.0
+
+    avg_brightness, error_bound = estimate_luma_mean(
+        frame, settings.estimator_mode, settings.sampling_factor, channels, pool
+    )
+    return avg_brightness, True, error_bound
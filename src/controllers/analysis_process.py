@@ -0,0 +1,202 @@
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+from .analysis import AnalysisSettings, analyze_region
+from .buffers import DEFAULT_MAX_BYTES, BufferPool
+from .tiles import TileAnalyzer
+
+READY = "ready"  # First message of a worker, once it is attached to the ring
+
+
+def _worker_main(conn, shm_name: str, slot_bytes: int, pool_bytes: int) -> None:
+    """Analysis process entry point: serve requests until the pipe closes."""
+    # Spawned children share the parent's resource tracker, which already
+    # tracks this segment; the parent unlinks it, so do not unregister here
+    shm = shared_memory.SharedMemory(name=shm_name)
+    pool = BufferPool(pool_bytes)
+    analyzers = {}
+    conn.send(READY)
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                return
+            if request is None:
+                return
+            sequence, slot, shape, channels, settings, display = request
+            frame = None
+            try:
+                frame = np.ndarray(shape, np.uint8, shm.buf, slot * slot_bytes)
+                analyzer = None
+                if settings.incremental:
+                    analyzer = analyzers.get(display)
+                    if analyzer is None or analyzer.tile_size != settings.tile_size:
+                        analyzer = analyzers[display] = TileAnalyzer(settings.tile_size, pool=pool)
+                result = analyze_region(frame, channels, settings, analyzer, pool)
+                conn.send((sequence, result, None))
+            except Exception as e:
+                conn.send((sequence, None, str(e)))
+            finally:
+                frame = None  # Release the view so the segment can be closed
+    finally:
+        shm.close()
+
+
+class AnalysisProcess:
+    """
+    Runs frame analysis in a separate process so it uses another core.
+
+    Frames are copied into a shared memory ring of slots and only small
+    metadata tuples travel over the pipe, so pixels are never pickled.
+    Consecutive requests use different slots, so a slow worker still reading
+    a request that timed out is never handed a half-overwritten frame; its
+    late answer is discarded. If the worker dies, or misses so many requests
+    that the ring would wrap onto a slot it may still be reading, it is
+    restarted.
+    """
+
+    def __init__(self, slots: int = 3, timeout: float = 1.0, pool_bytes: int = DEFAULT_MAX_BYTES,
+                 start_timeout: float = 10.0):
+        """
+        Initialize the process handle; the worker starts on first use.
+
+        Args:
+            slots (int): Number of frame slots in the ring (at least 2)
+            timeout (float): Seconds to wait for a result before restarting the worker
+            pool_bytes (int): Memory ceiling of the worker's scratch buffer pool
+            start_timeout (float): Seconds to wait for a new worker to report
+                ready; spawning an interpreter and importing numpy is not
+                counted against timeout
+
+        Raises:
+            ValueError: If slots or a timeout is not positive
+        """
+        if slots < 2 or timeout <= 0 or start_timeout <= 0:
+            raise ValueError("Invalid analysis process settings. Must be: slots >= 2, timeout > 0, "
+                             "start_timeout > 0")
+        self.slots = slots
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.pool_bytes = pool_bytes
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")  # Never fork a threaded Qt process
+        self._process = None
+        self._conn = None
+        self._shm = None
+        self._slot_bytes = 0
+        self._next_slot = 0
+        self._sequence = 0
+        self._missed = 0  # Consecutive requests the worker did not answer in time
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _start(self, slot_bytes: int) -> None:
+        """
+        Create the shared ring, spawn a worker attached to it and wait until it is ready.
+
+        Raises:
+            RuntimeError: If the worker does not report ready within start_timeout
+        """
+        self._shutdown()
+        self._shm = shared_memory.SharedMemory(create=True, size=slot_bytes * self.slots)
+        self._slot_bytes = slot_bytes
+        self._conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main, args=(child_conn, self._shm.name, slot_bytes, self.pool_bytes),
+            name="glimmer-analysis", daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        try:
+            ready = self._conn.poll(self.start_timeout) and self._conn.recv() == READY
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            self._shutdown()
+            raise RuntimeError("analysis process did not start")
+
+    def analyze(self, frame: np.ndarray, channels: str, settings: AnalysisSettings,
+                display: Optional[int] = None) -> Tuple[float, bool, Optional[float]]:
+        """
+        Analyze a frame region in the worker process.
+
+        Args:
+            frame (np.ndarray): HxWxC uint8 region, need not be contiguous
+            channels (str): Channel order of the frame
+            settings (AnalysisSettings): Analysis settings
+            display (int, optional): Display the region belongs to, keys the
+                worker's incremental analyzers
+
+        Returns:
+            tuple: (average_brightness, changed, error_bound), see analyze_region()
+
+        Raises:
+            RuntimeError: If the analysis failed, the worker crashed, did not
+                start or did not answer within the timeout
+        """
+        if self._process is not None and not self._process.is_alive():
+            self._restart(f"exit code {self._process.exitcode}")
+        if self._shm is None or frame.nbytes > self._slot_bytes:
+            self._start(frame.nbytes)
+
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.slots
+        offset = slot * self._slot_bytes
+        target = np.ndarray(frame.shape, np.uint8, self._shm.buf, offset)
+        np.copyto(target, frame)
+        del target
+
+        self._sequence += 1
+        try:
+            self._conn.send((self._sequence, slot, frame.shape, channels, settings, display))
+            # Skip answers to requests abandoned after a timeout
+            while self._conn.poll(self.timeout):
+                sequence, result, error = self._conn.recv()
+                if sequence != self._sequence:
+                    continue
+                self._missed = 0
+                if error is not None:
+                    raise RuntimeError(f"analysis failed: {error}")
+                return result
+        except (EOFError, OSError) as e:
+            self._restart(str(e))
+            raise RuntimeError(f"analysis process died: {e}")
+        self._missed += 1
+        if self._missed >= self.slots - 1:
+            self._restart(f"{self._missed} requests timed out")
+        raise RuntimeError("analysis process timed out")
+
+    def _restart(self, reason: str) -> None:
+        print(f"Restarting analysis process: {reason}")
+        self.restarts += 1
+        self._missed = 0
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        """Stop the worker and release the shared ring."""
+        if self._process is not None:
+            try:
+                self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+            self._process.join(0.5)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+            self._slot_bytes = 0
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        self._shutdown()
@@ -0,0 +1,244 @@
+import os
+import time
+from typing import Callable, List, Optional
+
+SYSFS_BACKLIGHT = "/sys/class/backlight"
+# Interface types in the order the kernel documentation says to prefer them
+BACKLIGHT_TYPES = ("firmware", "platform", "raw")
+
+
+class BacklightDevice:
+    """One /sys/class/backlight entry with its brightness file kept open."""
+
+    def __init__(self, path: str):
+        """
+        Open a backlight device.
+
+        Args:
+            path (str): Device directory, e.g. /sys/class/backlight/intel_backlight
+
+        Raises:
+            OSError: If the device cannot be read or its brightness file is not writable
+            ValueError: If max_brightness is not a positive integer
+        """
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, "max_brightness")) as max_file:
+            self.max_brightness = int(max_file.read().strip())
+        if self.max_brightness <= 0:
+            raise ValueError(f"{self.name}: max_brightness must be positive")
+        try:
+            with open(os.path.join(path, "type")) as type_file:
+                self.type = type_file.read().strip()
+        except OSError:
+            self.type = "raw"
+        self.fd = os.open(os.path.join(path, "brightness"), os.O_RDWR)
+        self.last_written = None  # Raw value of our last write, to tell it apart from external changes
+        self._pending = None  # Raw value of a write in progress
+
+    def read_raw(self) -> int:
+        """Return the current brightness in device units (0-max_brightness)."""
+        return int(os.pread(self.fd, 32, 0).strip())
+
+    def read(self) -> int:
+        """Return the current brightness in percent (0-100)."""
+        return round(self.read_raw() * 100 / self.max_brightness)
+
+    def write(self, value: int) -> None:
+        """Set the brightness in percent (0-100)."""
+        raw = round(min(max(value, 0), 100) * self.max_brightness / 100)
+        self._pending = raw
+        try:
+            os.pwrite(self.fd, f"{raw}\n".encode(), 0)  # Trailing newline keeps fake sysfs files parseable
+            self.last_written = raw  # Only once the write went through; a failed one keeps the old value
+        finally:
+            self._pending = None
+
+    def is_own_write(self, raw: int) -> bool:
+        """Whether a raw level read back from the device was written by us, including a write in progress."""
+        return raw == self.last_written or raw == self._pending
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def discover_backlights(root: str = SYSFS_BACKLIGHT) -> List[BacklightDevice]:
+    """
+    Open the usable backlight devices under root, sorted by name.
+
+    A panel is often exposed through several interfaces, e.g. acpi_video0
+    (firmware) and intel_backlight (raw). Only devices of the most preferred
+    type present are kept, firmware over platform over raw, so each panel
+    is written once and indices match screen_brightness_control's order.
+    Devices that cannot be opened for writing (usually a permissions issue)
+    are skipped.
+
+    Args:
+        root (str): Directory to scan; override to use a fake sysfs tree
+
+    Returns:
+        list: Opened BacklightDevice objects, possibly empty
+    """
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return []
+    devices = []
+    for name in names:
+        try:
+            devices.append(BacklightDevice(os.path.join(root, name)))
+        except (OSError, ValueError):
+            continue
+    if not devices:
+        return devices
+
+    def rank(device):
+        return BACKLIGHT_TYPES.index(device.type) if device.type in BACKLIGHT_TYPES else len(BACKLIGHT_TYPES)
+
+    best = min(rank(device) for device in devices)
+    kept = [device for device in devices if rank(device) == best]
+    for device in devices:
+        if rank(device) != best:
+            device.close()
+    return kept
+
+
+class SysfsBacklightBackend:
+    """
+    Brightness backend writing internal panels through sysfs directly.
+
+    Devices are discovered once and their brightness files stay open, so a
+    write is a single pwrite() instead of a display enumeration. Backlight
+    devices take display indices 0..n-1, matching the order in which
+    screen_brightness_control lists laptop panels before external monitors.
+    Higher indices are forwarded to the fallback backend. The number of
+    external monitors is counted again every recount_interval seconds and
+    after a failed fallback call, so hotplugged monitors are picked up.
+
+    Implements the subset of the screen_brightness_control API used by
+    BrightnessController: set_brightness(value, display=None) and
+    get_brightness(display=None).
+    """
+
+    def __init__(self, root: str = SYSFS_BACKLIGHT, fallback: Optional[Callable[[], object]] = None,
+                 recount_interval: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Discover backlight devices.
+
+        Args:
+            root (str): sysfs backlight directory; override for a fake tree
+            fallback (callable, optional): Returns the backend for external
+                monitors (e.g. screen_brightness_control); called on first use
+                so the slow import is only paid when needed
+            recount_interval (float): Seconds after which external monitors
+                are counted again
+            clock (callable): Monotonic time source in seconds
+        """
+        self.devices = discover_backlights(root)
+        self._fallback_factory = fallback
+        self._fallback = None
+        self.recount_interval = recount_interval
+        self.clock = clock
+        self._external_count = None
+        self._counted_at = 0.0
+
+    @classmethod
+    def is_available(cls, root: str = SYSFS_BACKLIGHT) -> bool:
+        """Return True if at least one writable backlight device exists."""
+        devices = discover_backlights(root)
+        for device in devices:
+            device.close()
+        return bool(devices)
+
+    def _fallback_backend(self):
+        if self._fallback is None and self._fallback_factory is not None:
+            self._fallback = self._fallback_factory()
+        return self._fallback
+
+    def _external_indices(self) -> List[int]:
+        """Indices of the fallback's displays that are not backlight devices."""
+        fallback = self._fallback_backend()
+        if fallback is None:
+            return []
+        if self._external_count is None or self.clock() - self._counted_at >= self.recount_interval:
+            self._counted_at = self.clock()
+            try:
+                self._external_count = max(len(fallback.get_brightness()) - len(self.devices), 0)
+            except Exception as e:
+                print(f"Error listing external displays: {e}")
+                self._external_count = 0
+        return list(range(len(self.devices), len(self.devices) + self._external_count))
+
+    def set_brightness(self, value: int, display: Optional[int] = None) -> None:
+        """
+        Set the brightness of one display, or of all displays if display is None.
+
+        Raises:
+            ValueError: If display is out of range and there is no fallback
+        """
+        if display is None:
+            for device in self.devices:
+                device.write(value)
+            try:
+                for index in self._external_indices():
+                    self._fallback.set_brightness(value, display=index)
+            except Exception:
+                self._external_count = None  # A monitor may have been unplugged; count again
+                raise
+        elif display < len(self.devices):
+            self.devices[display].write(value)
+        else:
+            fallback = self._fallback_backend()
+            if fallback is None:
+                raise ValueError(f"No backlight device for display {display}")
+            fallback.set_brightness(value, display=display)
+
+    def get_brightness(self, display: Optional[int] = None) -> List[int]:
+        """
+        Return brightness values in percent.
+
+        Returns:
+            list: One value for a single display, or one per display if display is None
+
+        Raises:
+            ValueError: If display is out of range and there is no fallback
+        """
+        if display is None:
+            values = [device.read() for device in self.devices]
+            try:
+                for index in self._external_indices():
+                    values.extend(self._fallback.get_brightness(display=index))
+            except Exception:
+                self._external_count = None
+                raise
+            return values
+        if display < len(self.devices):
+            return [self.devices[display].read()]
+        fallback = self._fallback_backend()
+        if fallback is None:
+            raise ValueError(f"No backlight device for display {display}")
+        return fallback.get_brightness(display=display)
+
+    def close(self) -> None:
+        """Close the brightness files."""
+        for device in self.devices:
+            device.close()
+
+
+def probe_brightness_backend(root: str = SYSFS_BACKLIGHT, fallback: Optional[Callable[[], object]] = None):
+    """
+    Return the sysfs backend if a backlight is usable, else the fallback.
+
+    Args:
+        root (str): sysfs backlight directory
+        fallback (callable): Returns the generic backend (screen_brightness_control)
+
+    Returns:
+        object: Brightness backend with set_brightness() and get_brightness()
+    """
+    backend = SysfsBacklightBackend(root, fallback)
+    if backend.devices:
+        return backend
+    return fallback() if fallback is not None else None
@@ -1,9 +1,27 @@
-import cv2
-import numpy as np
-from PIL import ImageGrab
-import screen_brightness_control as sbc
-from typing import Tuple, Optional
+import threading
+import time
+from typing import Callable, Dict, List, Tuple, Optional
+from .analysis import AnalysisSettings, analyze_region
+from .backlight import SysfsBacklightBackend, probe_brightness_backend
+from .buffers import BufferPool
+from .capture import CaptureBackend, probe_capture_backend
+from .displays import Display
+from .health import OPEN, CircuitBreaker, CircuitOpenError, HealthTracker
+from .luminance import ESTIMATOR_MODES, METERING_MODES
+from .metrics import Metrics
+from .profiles import ProfileCache, default_profile_path
+from .regions import RegionSelector
+from .tiles import TileAnalyzer
+from .transition import EASINGS, TransitionEngine
+from .write_filter import RATE_LIMIT, WriteFilter
+from .writer import AsyncWriter
 
+
+def _sbc():
+    """Import screen_brightness_control on first use; it is slow to import."""
+    import screen_brightness_control
+    return screen_brightness_control
+    
 class BrightnessController:
     """
     Controller for managing screen brightness based on ambient light conditions.
@@ -13,14 +31,79 @@ class BrightnessController:
     and configurable limits.
     """
     
-    def __init__(self):
-        """Initialize the brightness controller with default settings."""
-        self.paused = False
+    def __init__(self, capture_backend: Optional[CaptureBackend] = None,
+                 brightness_backend=None):
+        """
+        Initialize the brightness controller with default settings.
+        
+        Args:
+            capture_backend (CaptureBackend, optional): Screen capture backend.
+                If omitted, the best available backend is probed at startup.
+            brightness_backend (optional): Object providing the
+                screen_brightness_control functions set_brightness(value, display=None)
+                and get_brightness(display=None). Defaults to the sysfs backlight
+                backend when a backlight is writable, else screen_brightness_control.
+        """
+        self.capture_backend = capture_backend or probe_capture_backend()
+        self.brightness_backend = brightness_backend
+        self._paused = False
+        self._pause_changed = threading.Condition()  # Notified when paused changes or on wake()
         self.max_brightness_limit = 80  # Default maximum brightness
         self.min_brightness_limit = 20  # Default minimum brightness
         self.current_manual_brightness = None  # Store manual brightness setting
-        self._last_captured_brightness = None  # Cache last captured brightness
+        self._last_captured_brightness = {}  # Cache last captured brightness per display
         self._capture_error_count = 0  # Track consecutive capture errors
+        self.estimator_mode = "strided"  # Luminance estimator ("exact" or "strided")
+        self.sampling_factor = 4  # Pixel stride used by the strided estimator
+        self.last_error_bound = 0.0  # Error bound of the last estimate vs the exact mean (None if unknown)
+        self.metering = "mean"  # How the luminance is derived, see set_metering()
+        self.metering_percentile = 50.0
+        self.metering_trim = 0.05
+        self.incremental = False  # Tile-based incremental analysis, see set_incremental()
+        self.tile_size = 128
+        self._tile_analyzers = {}  # Incremental analyzer per display
+        self.frame_changed = True  # Whether the last captured frame differed from the previous one
+        self._last_applied = {}  # (settings, result) of the last brightness write per display
+        # Guards the write filter, _last_applied and the lazily created writers and
+        # transition engines, which the tick, focus watcher, override detector and
+        # writer threads all touch
+        self._apply_lock = threading.RLock()
+        self.write_filter = WriteFilter()  # Dedup, hysteresis and rate cap for writes
+        self.transition_duration = 0.0  # Smooth ramp length, see set_transition()
+        self.transition_easing = "ease_in_out"
+        self.transitions = {}  # Transition engine per display
+        self.displays = []  # Per-display settings; empty controls all displays together
+        self.display_results = {}  # Last (average, target) per display index
+        self.async_writes = True  # Write from per-display threads so ticks never wait on a monitor
+        self.writers = {}  # Latest-wins writer per display
+        self.expected_tick_interval = None  # Seconds until the next tick, set by the scheduler's owner
+        self._last_tick_start = None
+        self.last_tick_failed = False  # Whether the last tick measured and applied nothing
+        self.recorder = None  # TraceRecorder while recording, see start_recording()
+        self.analysis_process = None  # Out-of-process analysis, see set_analysis_process()
+        self.region_selector = None  # Capture only parts of the desktop, see set_capture_region()
+        self._window_tracker = None
+        self.override_detector = None  # Manual override detection, see start_override_detection()
+        self.override_active = False  # Paused because the brightness was changed outside Glimmer
+        self.on_override_change = None  # Called with True/False when an override pauses/resumes
+        self.profiles = None  # Learned brightness per application, see start_app_profiles()
+        self.focus_watcher = None
+        self.active_app = None  # Key of the focused application while profiles are on
+        self._last_settings = None  # (sensitivity, max, min) of the last tick
+        self.buffer_pool = BufferPool()  # Reused analysis scratch buffers, see set_memory_ceiling()
+        self.bytes_allocated_per_tick = 0  # Scratch bytes the last tick had to allocate
+        self.tick_listeners = []  # Called with (average, target) after every tick, on the tick thread
+        self.health = HealthTracker()  # Circuit breakers for failing backends and displays, see set_backoff()
+        self.started_at = time.perf_counter()  # Reference for startup timings, see mark_startup()
+        self.startup_times = {}  # Milestone -> seconds after started_at
+        self.metrics = Metrics()  # Per-stage timings and failure counters
+        self.metrics.gauge("writes_issued", lambda: self.write_filter.writes_issued)
+        self.metrics.gauge("writes_suppressed", lambda: self.write_filter.total_suppressed)
+        self.metrics.gauge("analysis_restarts", lambda: self.analysis_process.restarts if self.analysis_process else 0)
+        self.metrics.gauge("writes_dropped", lambda: sum(writer.dropped for writer in list(self.writers.values())))
+        self.metrics.gauge("buffer_pool_bytes", lambda: self.buffer_pool.bytes_pooled)
+        self.metrics.gauge("buffer_bytes_allocated_per_tick", lambda: self.bytes_allocated_per_tick)
+        self.metrics.gauge("unhealthy_backends", lambda: len(self.health.unhealthy()))
         
     def set_brightness_limits(self, max_brightness: int, min_brightness: int) -> None:
         """
@@ -37,51 +120,748 @@ class BrightnessController:
             raise ValueError(
                 "Invalid brightness limits. Must be: 0 <= min <= max <= 100"
             )
-        
+            
         self.max_brightness_limit = max_brightness
         self.min_brightness_limit = min_brightness
         
+    def set_estimator(self, mode: str, sampling_factor: int = 4) -> None:
+        """
+        Select how the average screen luminance is computed.
+        
+        Args:
+            mode (str): "exact" for a full-resolution luma mean, or
+                "strided" to estimate luma from every n-th pixel of every n-th row
+            sampling_factor (int): Stride used by the strided estimator (>= 1)
+            
+        Raises:
+            ValueError: If the mode is unknown or the sampling factor is invalid
+        """
+        if mode not in ESTIMATOR_MODES:
+            raise ValueError(f"Invalid estimator mode. Must be one of: {', '.join(ESTIMATOR_MODES)}")
+        if sampling_factor < 1:
+            raise ValueError("Sampling factor must be at least 1")
+            
+        self.estimator_mode = mode
+        self.sampling_factor = sampling_factor
+        
+    def set_metering(self, mode: str, percentile: float = 50.0, trim: float = 0.05) -> None:
+        """
+        Select how the screen luminance is metered.
+        
+        "mean" averages gamma-encoded luma using the estimator and incremental
+        settings. The other modes build a 256-bin luma histogram from a strided
+        view of the frame and meter it in linear light through a precomputed
+        sRGB lookup table, so a few bright pixels no longer skew the target.
+        
+        Args:
+            mode (str): "mean", "linear" (linear-light mean), "percentile" or
+                "trimmed" (linear-light mean without the darkest and brightest pixels)
+            percentile (float): Percentile used by the "percentile" mode (0-100)
+            trim (float): Fraction trimmed from each end by the "trimmed" mode (0-0.5)
+            
+        Raises:
+            ValueError: If the mode is unknown or a parameter is out of range
+        """
+        if mode not in METERING_MODES:
+            raise ValueError(f"Invalid metering mode. Must be one of: {', '.join(METERING_MODES)}")
+        if not 0 <= percentile <= 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        if not 0 <= trim < 0.5:
+            raise ValueError("Trim fraction must be between 0 and 0.5")
+            
+        self.metering = mode
+        self.metering_percentile = percentile
+        self.metering_trim = trim
+        
+    def set_incremental(self, enabled: bool, tile_size: int = 128) -> None:
+        """
+        Enable or disable tile-based incremental analysis.
+        
+        When enabled, only screen tiles whose sampled pixels changed since the
+        previous tick are reduced, and ticks with an unchanged frame skip both
+        the reduction and the brightness write.
+        
+        Args:
+            enabled (bool): Whether to use the incremental analyzer
+            tile_size (int): Tile edge length in pixels (multiple of 16)
+            
+        Raises:
+            ValueError: If the tile size is invalid
+        """
+        if enabled:
+            TileAnalyzer(tile_size)  # Validate before changing any state
+        self.incremental = enabled
+        self.tile_size = tile_size
+        self._tile_analyzers = {}
+        self._last_applied = {}
+        self.frame_changed = True
+        
+    def set_transition(self, duration: float, easing: str = "ease_in_out") -> None:
+        """
+        Configure smooth brightness transitions.
+        
+        With a positive duration, new targets are handed to a background
+        transition engine per display that ramps it towards them, so the
+        control tick never waits for the intermediate writes.
+        
+        Args:
+            duration (float): Ramp duration in seconds; 0 applies targets immediately
+            easing (str): Easing curve ("linear", "ease_in", "ease_out" or "ease_in_out")
+            
+        Raises:
+            ValueError: If the duration is negative or the easing is unknown
+        """
+        if duration < 0:
+            raise ValueError("Transition duration must not be negative")
+        if easing not in EASINGS:
+            raise ValueError(f"Invalid easing. Must be one of: {', '.join(EASINGS)}")
+            
+        # Carry the on-screen values over to the new engines
+        current = {key: engine.current for key, engine in self.transitions.items()}
+        self._stop_transitions()
+        self.transition_duration = duration
+        self.transition_easing = easing
+        if duration > 0:
+            for key, value in current.items():
+                if value is not None:
+                    self._transition_for(key).sync(value)
+                    
+    def set_analysis_process(self, enabled: bool, timeout: float = 1.0) -> None:
+        """
+        Run frame analysis in a separate worker process.
+        
+        Frames are handed over through shared memory, so the reductions run
+        on another core without holding this process's GIL. This pays off for
+        large frames with exact, histogram or incremental analysis; for the
+        strided estimator the copy into shared memory can cost more than it saves.
+        
+        Args:
+            enabled (bool): Whether to use the worker process
+            timeout (float): Seconds to wait for a result before the tick falls
+                back to the last measured value
+                
+        Raises:
+            ValueError: If timeout is not positive
+        """
+        if self.analysis_process is not None:
+            self.analysis_process.close()
+            self.analysis_process = None
+        if enabled:
+            # multiprocessing and shared_memory are only needed once the worker is used
+            from .analysis_process import AnalysisProcess
+            self.analysis_process = AnalysisProcess(timeout=timeout, pool_bytes=self.buffer_pool.max_bytes)
+        self._tile_analyzers = {}
+        
+    def set_memory_ceiling(self, max_bytes: int) -> None:
+        """
+        Limit the memory held by reusable analysis buffers.
+        
+        Analysis reuses shape-keyed scratch buffers so steady-state ticks do
+        not allocate. Above the ceiling the least recently used buffers are
+        released, and a frame too large for the ceiling gets unpooled
+        temporaries, which shows up in bytes_allocated_per_tick.
+        
+        Args:
+            max_bytes (int): Ceiling in bytes; an analysis process started
+                afterwards uses the same ceiling for its own pool
+                
+        Raises:
+            ValueError: If max_bytes is negative
+        """
+        self.buffer_pool.set_max_bytes(max_bytes)
+        
+    def set_backoff(self, failure_threshold: int = 3, base_delay: float = 1.0,
+                    max_delay: float = 300.0) -> None:
+        """
+        Configure when failing backends and displays are skipped.
+        
+        After failure_threshold consecutive failures of the capture backend,
+        the brightness backend or one display, it is no longer called every
+        tick. A single probe call is made after base_delay seconds, and the
+        delay doubles after every failed probe, up to max_delay.
+        
+        Args:
+            failure_threshold (int): Consecutive failures before backing off
+            base_delay (float): Seconds before the first probe
+            max_delay (float): Longest delay between probes in seconds
+            
+        Raises:
+            ValueError: If the threshold or delays are invalid
+        """
+        self.health = HealthTracker(failure_threshold, base_delay, max_delay)
+        
+    def mark_startup(self, milestone: str) -> None:
+        """
+        Record the first time a startup milestone is reached.
+        
+        The time since started_at is exported as the startup_<milestone>_seconds
+        gauge. The first brightness write is recorded as "first_write".
+        
+        Args:
+            milestone (str): Milestone name, e.g. "tray"
+        """
+        if milestone in self.startup_times:
+            return
+        seconds = self.startup_times.setdefault(milestone, time.perf_counter() - self.started_at)
+        self.metrics.gauge(f"startup_{milestone}_seconds", lambda: seconds)
+        
+    def set_capture_region(self, mode: str, center_fraction: float = 0.5,
+                           rects: Optional[List[Tuple[int, int, int, int]]] = None) -> None:
+        """
+        Capture and meter only part of the desktop.
+        
+        Only the selected pixels are grabbed and reduced, so capture and
+        analysis cost shrink with the area. Applies when all displays are
+        controlled together; per-display control always captures each
+        display's full region.
+        
+        Args:
+            mode (str): "full", "center", "active_window" or "rects"
+            center_fraction (float): Size of the center crop relative to the screen (0-1]
+            rects (list, optional): (x, y, width, height) rectangles for "rects" mode,
+                metered by area
+                
+        Raises:
+            ValueError: If the settings are invalid, or active window tracking
+                is requested without an X11 display
+        """
+        tracker = None
+        if mode == "active_window":
+            from .windows import ActiveWindowTracker
+            tracker = ActiveWindowTracker()
+            if not tracker.available:
+                raise ValueError("Active window capture needs an X11 display")
+        try:
+            selector = RegionSelector(mode, center_fraction, rects, tracker and tracker.geometry)
+        except ValueError:
+            if tracker is not None:
+                tracker.close()
+            raise
+            
+        if self._window_tracker is not None:
+            self._window_tracker.close()
+        self._window_tracker = tracker
+        self.region_selector = None if mode == "full" else selector
+        self._tile_analyzers = {}
+        self._last_captured_brightness = {}
+        self._last_applied = {}
+        
+    def set_displays(self, displays: List[Display]) -> None:
+        """
+        Control displays individually.
+        
+        Each display is analyzed from its own capture region and gets its own
+        target, limits and write cache. Every display has its own writer
+        thread so a slow monitor does not hold up the others.
+        
+        Args:
+            displays (list): Display settings; an empty list controls all
+                displays together from the whole captured frame
+                
+        Raises:
+            ValueError: If two displays share the same index
+        """
+        indices = [display.index for display in displays]
+        if len(set(indices)) != len(indices):
+            raise ValueError("Display indices must be unique")
+            
+        self._stop_writers()
+        self._stop_transitions()
+        self.displays = list(displays)
+        self.display_results = {}
+        self._tile_analyzers = {}
+        self._last_applied = {}
+        self._last_captured_brightness = {}
+        self.health.reset()
+        
+    @property
+    def paused(self) -> bool:
+        """Whether automatic brightness adjustment is paused."""
+        return self._paused
+        
+    @paused.setter
+    def paused(self, paused: bool) -> None:
+        with self._pause_changed:
+            self._paused = paused
+            self._pause_changed.notify_all()
+            
+    def wait_while_paused(self, interrupted: Callable[[], bool] = lambda: False) -> None:
+        """
+        Block while paused, without polling.
+        
+        Args:
+            interrupted (callable): Also return once this is true; whoever
+                makes it true must call wake()
+        """
+        with self._pause_changed:
+            self._pause_changed.wait_for(lambda: not self._paused or interrupted())
+            
+    def wake(self) -> None:
+        """Wake wait_while_paused() callers so they re-check their interrupt condition."""
+        with self._pause_changed:
+            self._pause_changed.notify_all()
+            
     def pause(self) -> None:
         """Pause automatic brightness adjustment."""
         self.paused = True
+        self._end_override()  # An explicit pause is not resumed automatically
         
     def resume(self) -> None:
         """Resume automatic brightness adjustment."""
         self.paused = False
+        self._end_override()
         self.current_manual_brightness = None  # Clear any manual brightness setting
+        self._last_applied = {}  # Manual writes may have changed the screen brightness
+        self._last_tick_start = None  # The pause is not tick jitter
         
-    def get_average_brightness(self) -> Optional[float]:
+    def close(self) -> None:
+        """Stop background writers and release the capture backend."""
+        self._stop_transitions()
+        self.stop_recording()
+        self.stop_override_detection()
+        self._stop_writers()
+        if self._window_tracker is not None:
+            self._window_tracker.close()
+            self._window_tracker = None
+        self.stop_app_profiles()
+        self.set_analysis_process(False)
+        self.capture_backend.close()
+        if hasattr(self.brightness_backend, "close"):
+            self.brightness_backend.close()
+            
+    def start_override_detection(self, timeout: float = 300.0,
+                                 on_change=None) -> bool:
         """
-        Capture and calculate the average screen brightness.
+        Pause automatically when the brightness is changed outside Glimmer.
         
+        Changes are picked up from backlight events, so no work is added to
+        the tick. Automatic control resumes once no further manual change has
+        been seen for the timeout.
+        
+        Args:
+            timeout (float): Seconds after the last manual change before resuming
+            on_change (callable, optional): Called from the detector thread with
+                True when an override pauses control and False when it resumes
+                
         Returns:
-            float or None: Average brightness value (0-255) or None if capture fails
+            bool: False if the brightness backend has no watchable backlight
+            (only the sysfs backend is supported)
             
-        Notes:
-            Uses screen capture to determine ambient brightness.
-            Implements error handling and caching for reliability.
+        Raises:
+            ValueError: If the timeout is not positive
         """
+        self.stop_override_detection()
+        backend = self._backend()
+        if not isinstance(backend, SysfsBacklightBackend) or not backend.devices:
+            return False
+        from .override import OverrideDetector
         try:
-            screen = ImageGrab.grab()  # Capture the entire screen
-            screen_np = np.array(screen)
-            frame = cv2.cvtColor(screen_np, cv2.COLOR_RGB2BGR)
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            avg_brightness = gray_frame.mean()
+            self.override_detector = OverrideDetector(
+                backend, self._override_detected, self._override_expired, timeout
+            )
+        except OSError as e:
+            print(f"Error starting override detection: {e}")
+            return False
+        self.on_override_change = on_change
+        return True
+        
+    def stop_override_detection(self) -> None:
+        """Stop watching for manual brightness changes."""
+        if self.override_detector is not None:
+            self.override_detector.stop()
+            self.override_detector = None
             
-            self._last_captured_brightness = avg_brightness
-            self._capture_error_count = 0  # Reset error count on successful capture
-            return avg_brightness
+    def _override_detected(self, display: int, value: int) -> None:
+        """A backlight changed to a value Glimmer did not write."""
+        if self.paused and not self.override_active:
+            return  # Already paused by the user
+        started = not self.override_active
+        self.override_active = True
+        self.paused = True
+        self.current_manual_brightness = value
+        with self._apply_lock:
+            for writer in self.writers.values():
+                writer.cancel()  # Do not undo the user's change with a queued target
+            for key in (display, None):
+                self.write_filter.invalidate(key)  # The cached last write no longer matches the screen
+                engine = self.transitions.get(key)
+                if engine is not None:
+                    engine.sync(value)
+        if started and self.on_override_change is not None:
+            self.on_override_change(True)
+            
+    def _override_expired(self) -> None:
+        if self.override_active:
+            self.resume()
+            if self.on_override_change is not None:
+                self.on_override_change(False)
+                
+    def _end_override(self):
+        self.override_active = False
+        if self.override_detector is not None:
+            self.override_detector.cancel_timeout()
+            
+    def start_app_profiles(self, path: Optional[str] = None, capacity: int = 32) -> bool:
+        """
+        Learn the brightness of each application and apply it on focus changes.
+        
+        While an application has focus its measured luminance and target are
+        folded into its profile. When focus moves to an application with a
+        profile, its learned luminance is applied at once, through the same
+        limits, write filter and transition as a tick, instead of waiting for
+        the next tick; normal analysis then keeps refining it. Profiles only
+        apply while all displays are controlled together.
+        
+        Args:
+            path (str, optional): Profile file, default_profile_path() if omitted
+            capacity (int): Number of applications remembered
+            
+        Returns:
+            bool: False if focus changes cannot be watched (X11 only)
+            
+        Raises:
+            ValueError: If capacity is invalid
+        """
+        self.stop_app_profiles()
+        profiles = ProfileCache(path or default_profile_path(), capacity)
+        from .windows import FocusWatcher
+        try:
+            self.focus_watcher = FocusWatcher(self._focus_changed)
+        except OSError as e:
+            print(f"Error starting app profiles: {e}")
+            return False
+        self.profiles = profiles
+        self.active_app = self.focus_watcher.app
+        return True
+        
+    def stop_app_profiles(self) -> None:
+        """Stop following focus and save the learned profiles."""
+        if self.focus_watcher is not None:
+            self.focus_watcher.stop()
+            self.focus_watcher = None
+        if self.profiles is not None:
+            self.profiles.save()
+            self.profiles = None
+        self.active_app = None
+        
+    def _focus_changed(self, app: Optional[str]) -> None:
+        """Apply the learned brightness of a newly focused application (watcher thread)."""
+        self.active_app = app
+        profiles = self.profiles
+        profile = profiles.get(app) if profiles is not None and app is not None else None
+        if profile is None or self.paused or self.displays or self._last_settings is None:
+            return
+        self.metrics.increment("profile_hits")
+        # Treat the learned luminance as a fresh measurement under the current settings;
+        # _adjust_display() serializes this with the tick thread
+        self._adjust_display(None, profile.luminance, True, self._last_settings)
+        
+    def start_recording(self, path: str, thumbnail_size: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Append every measured tick to a trace file for later replay.
+        
+        Args:
+            path (str): Trace file path; an existing trace is appended to
+            thumbnail_size (tuple, optional): (width, height) of luma thumbnails
+                to store with each sample, allowing replays to re-run analysis
+                
+        Raises:
+            ValueError: If the file exists and is not a compatible trace
+        """
+        from .trace import TraceRecorder
+        self.stop_recording()
+        self.recorder = TraceRecorder(path, thumbnail_size)
+        
+    def stop_recording(self) -> None:
+        """Stop recording and close the trace file."""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+            
+    def _record(self, frame, avg_brightness: Optional[float], display: Optional[int],
+                settings: Tuple[float, int, int]) -> None:
+        """Append one sample to the trace, if recording."""
+        recorder = self.recorder
+        if recorder is None:
+            return
+        from .trace import make_thumbnail
+        if isinstance(frame, list):
+            frame = frame[0] if frame else None  # Thumbnail of the first capture region
+        thumbnail = None
+        if recorder.thumbnail_size[0] and frame is not None:
+            thumbnail = make_thumbnail(frame, recorder.thumbnail_size, self.capture_backend.channels)
+        try:
+            recorder.record(avg_brightness, *settings, display=display, thumbnail=thumbnail)
+        except (OSError, ValueError) as e:
+            print(f"Error recording trace: {e}")
+            self.stop_recording()
+            
+    def _stop_writers(self):
+        for writer in self.writers.values():
+            writer.stop()
+        self.writers = {}
+        
+    def _writer_for(self, display: Optional[int]) -> AsyncWriter:
+        """Return the writer thread of a display, creating it on first use."""
+        writer = self.writers.get(display)
+        if writer is None:
+            writer = AsyncWriter(
+                lambda value: self._write_brightness(value, display),
+                on_error=lambda value, e: self._write_failed(display, e),
+                name=f"brightness-writer-{'all' if display is None else display}"
+            )
+            self.writers[display] = writer
+        return writer
+        
+    def _write_failed(self, display: Optional[int], error: Exception) -> None:
+        """Forget what was applied to a display after an asynchronous write failed, so the next tick retries."""
+        if not isinstance(error, CircuitOpenError):
+            self._report_failure(self._display_health(display), f"Error setting brightness: {error}")
+        with self._apply_lock:
+            self.write_filter.invalidate(display)
+            self._last_applied.pop(display, None)
+            
+    def _stop_transitions(self):
+        for engine in self.transitions.values():
+            engine.stop()
+        self.transitions = {}
+        
+    def _transition_for(self, display: Optional[int]) -> TransitionEngine:
+        """Return the transition engine of a display, creating it on first use."""
+        engine = self.transitions.get(display)
+        if engine is None:
+            engine = TransitionEngine(
+                lambda value: self._write_brightness(value, display),
+                self.transition_duration, self.transition_easing,
+                read=lambda: self._read_brightness(display),
+                on_error=lambda value, e: self._write_failed(display, e)
+            )
+            self.transitions[display] = engine
+        return engine
+        
+    def _display_health(self, display: Optional[int]) -> CircuitBreaker:
+        """Return the circuit breaker of a display, or of the brightness backend if display is None."""
+        return self.health.breaker(("display", display), "brightness" if display is None else f"display {display}")
+        
+    def _report_failure(self, breaker: CircuitBreaker, message: str) -> None:
+        """Print a failure, noting when it stops further calls; repeats while backing off are not printed."""
+        if not breaker.should_report():
+            return
+        if breaker.state == OPEN:
+            message += f" ({breaker.name} unavailable, retrying in {round(breaker.retry_in(), 1):g} s)"
+        print(message)
+        
+    def _record_success(self, breaker: CircuitBreaker) -> None:
+        if breaker.success():
+            print(f"{breaker.name} recovered")
+            
+    def _write_brightness(self, value: int, display: Optional[int] = None) -> None:
+        """
+        Write a brightness value to one display, or to all if display is None.
+        
+        Raises:
+            CircuitOpenError: If the display is being skipped after repeated failures
+        """
+        breaker = self._display_health(display)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{breaker.name} unavailable")
+        try:
+            with self.metrics.timer("write"):
+                self._backend().set_brightness(value, display=display)
+        except Exception as e:
+            self.metrics.increment("write_failures")
+            breaker.failure(e)
+            raise
+        self._record_success(breaker)
+        self.metrics.increment("backend_writes")
+        if "first_write" not in self.startup_times:
+            self.mark_startup("first_write")
             
+    def _read_brightness(self, display: Optional[int] = None) -> int:
+        """
+        Read the brightness of one display, or of the first if display is None.
+        
+        Raises:
+            CircuitOpenError: If the display is being skipped after repeated failures
+        """
+        breaker = self._display_health(display)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{breaker.name} unavailable")
+        try:
+            value = self._backend().get_brightness(display=display)[0]
+        except Exception as e:
+            breaker.failure(e)
+            raise
+        self._record_success(breaker)
+        return value
+        
+    def _backend(self):
+        if self.brightness_backend is None:
+            # Native sysfs writes for internal panels, screen_brightness_control otherwise
+            self.brightness_backend = probe_brightness_backend(fallback=_sbc)
+        return self.brightness_backend
+        
+    def _grab_frame(self):
+        """
+        Capture a frame, counting consecutive failures. Returns None on error.
+        
+        With a capture region selected and no per-display control, returns a
+        list with one frame per region instead. While the capture backend is
+        backing off after repeated failures, returns None without capturing.
+        """
+        breaker = self.health.breaker("capture")
+        if not breaker.allow():
+            self.metrics.increment("captures_skipped")
+            return None
+        try:
+            with self.metrics.timer("capture"):
+                rects = None
+                if self.region_selector is not None and not self.displays:
+                    rects = self.region_selector.regions(self.capture_backend.screen_size())
+                if rects is None:
+                    frame = self.capture_backend.grab()
+                else:
+                    frame = [self.capture_backend.grab_region(*rect) for rect in rects]
+            self._capture_error_count = 0  # Reset error count on successful capture
+            self._record_success(breaker)
+            return frame
         except Exception as e:
             self._capture_error_count += 1
-            print(f"Error capturing screen (attempt {self._capture_error_count}): {e}")
+            self.metrics.increment("capture_failures")
+            breaker.failure(e)
+            self._report_failure(breaker, f"Error capturing screen (attempt {self._capture_error_count}): {e}")
+            return None
+            
+    def _crop_display(self, display: Display, frame):
+        """
+        Return a display's part of the frame, or None if there is none.
+        
+        A region outside the captured frame is reported once and tracked by
+        its own circuit breaker, so it is only checked again when a probe is due.
+        """
+        if frame is None:
+            return None
+        breaker = self.health.breaker(("region", display.index), f"{display.name} region")
+        if not breaker.allow():
+            return None
+        region = display.crop(frame)
+        if region.shape[0] and region.shape[1]:
+            self._record_success(breaker)
+            return region
+        breaker.failure(ValueError("outside the captured frame"))
+        if breaker.failures == 1:
+            print(f"Error capturing {display.name}: region {display.region} is outside the "
+                  f"captured {frame.shape[1]}x{frame.shape[0]} frame")
+        return None
+        
+    def display_count(self) -> Optional[int]:
+        """Return how many displays the brightness backend controls, or None if they cannot be listed."""
+        try:
+            return len(self._backend().get_brightness())
+        except Exception as e:
+            print(f"Error listing displays: {e}")
+            return None
+            
+    def _analyze(self, frame, display: Optional[int] = None) -> Tuple[float, bool]:
+        """
+        Compute the metered luma of a frame region.
+        
+        Returns:
+            tuple: (average_brightness, changed) where changed is False only
+            when incremental analysis found the region unchanged.
+        """
+        channels = self.capture_backend.channels
+        settings = AnalysisSettings(
+            self.estimator_mode, self.sampling_factor, self.metering, self.metering_percentile,
+            self.metering_trim, self.incremental, self.tile_size
+        )
+        if self.analysis_process is not None:
+            avg_brightness, changed, self.last_error_bound = self.analysis_process.analyze(
+                frame, channels, settings, display
+            )
+            return avg_brightness, changed
+            
+        analyzer = None
+        if self.incremental:
+            analyzer = self._tile_analyzers.get(display)
+            if analyzer is None:
+                analyzer = self._tile_analyzers[display] = TileAnalyzer(self.tile_size, pool=self.buffer_pool)
+        avg_brightness, changed, self.last_error_bound = analyze_region(
+            frame, channels, settings, analyzer, self.buffer_pool
+        )
+        return avg_brightness, changed
+        
+    def _measure(self, frame, display: Optional[int] = None) -> Tuple[Optional[float], bool]:
+        """Analyze a region, falling back to the last good value on errors."""
+        try:
+            if frame is None:
+                raise RuntimeError("no frame captured")
+            with self.metrics.timer("analyze"):
+                avg_brightness, changed = self._analyze(frame, display)
+            self._last_captured_brightness[display] = avg_brightness
+            return avg_brightness, changed
             
+        except Exception as e:
+            if frame is not None:
+                self.metrics.increment("analyze_failures")
+                print(f"Error analyzing screen: {e}")
+                
             # Return last known good value if available and not too many errors
-            if self._last_captured_brightness is not None and self._capture_error_count < 3:
-                return self._last_captured_brightness
+            last = self._last_captured_brightness.get(display)
+            if last is not None and self._capture_error_count < 3:
+                return last, False
                 
-            return None
+            return None, True
+            
+    def _measure_frame(self, frame) -> Tuple[Optional[float], bool]:
+        """Measure a whole frame, or the area-weighted mean of a list of region frames."""
+        if not isinstance(frame, list):
+            return self._measure(frame)
+        total = 0.0
+        area = 0
+        changed = False
+        for index, region in enumerate(frame):
+            avg_brightness, region_changed = self._measure(region, ("region", index))
+            if avg_brightness is None:
+                return None, True
+            pixels = region.shape[0] * region.shape[1]
+            total += avg_brightness * pixels
+            area += pixels
+            changed = changed or region_changed
+        if not area:
+            return None, True
+        return total / area, changed
+        
+    def get_average_brightness(self) -> Optional[float]:
+        """
+        Capture and calculate the average screen brightness.
+        
+        Returns:
+            float or None: Average brightness value (0-255) or None if capture fails
             
+        Notes:
+            Uses screen capture to determine ambient brightness.
+            Implements error handling and caching for reliability.
+            In "strided" mode the value is an estimate; its error bound
+            against the exact mean is stored in last_error_bound.
+        """
+        avg_brightness, self.frame_changed = self._measure_frame(self._grab_frame())
+        return avg_brightness
+        
+    def get_display_brightness(self) -> Dict[int, Optional[float]]:
+        """
+        Capture the screen once and calculate the average brightness per display.
+        
+        Returns:
+            dict: Display index -> average brightness (0-255), or None for
+            displays whose measurement failed
+        """
+        frame = self._grab_frame()
+        return {
+            display.index: self._measure(self._crop_display(display, frame), display.index)[0]
+            for display in self.displays
+        }
+        
     def calculate_target_brightness(self, avg_brightness: float, sensitivity: float) -> Optional[float]:
         """
         Calculate target brightness based on ambient light and sensitivity.
@@ -106,7 +886,7 @@ class BrightnessController:
             print(f"Error calculating target brightness: {e}")
             return None
             
-    def adjust_brightness(self, sensitivity: float, max_brightness: int, 
+    def adjust_brightness(self, sensitivity: float, max_brightness: int,
                          min_brightness: int) -> Tuple[float, float]:
         """
         Adjust screen brightness based on ambient light and constraints.
@@ -122,31 +902,167 @@ class BrightnessController:
             - target_brightness (float): Applied screen brightness
             
         Notes:
-            Returns (0, 0) if paused or if brightness adjustment fails.
+            Returns (0, 0) if paused or if brightness adjustment fails; a
+            failure also sets last_tick_failed, so schedulers can tell it
+            from a black screen.
+            With incremental analysis, an unchanged frame returns the previous
+            result without writing brightness again.
+            With per-display control the averages over all displays are
+            returned and per-display results are kept in display_results.
         """
         if self.paused:
             return 0, 0
-
-        # Get ambient brightness
-        avg_brightness = self.get_average_brightness()
-        if avg_brightness is None:
+            
+        started = time.perf_counter()
+        if self._last_tick_start is not None and self.expected_tick_interval is not None:
+            self.metrics.observe(
+                "tick_jitter", abs(started - self._last_tick_start - self.expected_tick_interval)
+            )
+        self._last_tick_start = started
+        allocated = self.buffer_pool.bytes_allocated
+        self.last_tick_failed = True  # Until _adjust() produces a result
+        try:
+            result = self._adjust(sensitivity, max_brightness, min_brightness)
+        finally:
+            self.metrics.observe("tick", time.perf_counter() - started)
+            self.bytes_allocated_per_tick = self.buffer_pool.bytes_allocated - allocated
+        for listener in list(self.tick_listeners):
+            try:
+                listener(*result)
+            except Exception as e:
+                print(f"Error notifying tick listener: {e}")
+        return result
+        
+    def _adjust(self, sensitivity: float, max_brightness: int,
+                min_brightness: int) -> Tuple[float, float]:
+        """Run one control tick for all displays; see adjust_brightness()."""
+        if not self.displays:
+            app = self.active_app  # Focus may change while this tick runs
+            frame = self._grab_frame()
+            avg_brightness, self.frame_changed = self._measure_frame(frame)
+            settings = (sensitivity, max_brightness, min_brightness)
+            self._last_settings = settings
+            self._record(frame, avg_brightness, None, settings)
+            result = self._adjust_display(None, avg_brightness, self.frame_changed, settings)
+            if result is not None and app is not None and self.profiles is not None:
+                self.profiles.learn(app, *result)
+            self.last_tick_failed = result is None
+            return result or (0, 0)
+            
+        # Analyze every display from one capture; writes go to per-display threads
+        frame = self._grab_frame()
+        results = {}
+        for display in self.displays:
+            region = self._crop_display(display, frame)
+            avg_brightness, changed = self._measure(region, display.index)
+            settings = display.settings(sensitivity, max_brightness, min_brightness)
+            self._record(region, avg_brightness, display.index, settings)
+            result = self._adjust_display(display.index, avg_brightness, changed, settings)
+            if result is not None:
+                results[display.index] = result
+        self.display_results = results
+        self.last_tick_failed = not results
+        if not results:
             return 0, 0
+        return (
+            sum(avg for avg, _ in results.values()) / len(results),
+            sum(target for _, target in results.values()) / len(results)
+        )
+        
+    def apply_luminance(self, avg_brightness: Optional[float], sensitivity: float,
+                        max_brightness: int, min_brightness: int,
+                        display: Optional[int] = None) -> Optional[Tuple[float, float]]:
+        """
+        Apply an already measured luminance, bypassing capture and analysis.
+        
+        Used to replay recorded traces through the same target calculation,
+        write filter and transition path as a live tick.
+        
+        Args:
+            avg_brightness (float or None): Measured luminance (0-255)
+            sensitivity (float): Adjustment sensitivity (1-10)
+            max_brightness (int): Maximum allowed brightness (0-100)
+            min_brightness (int): Minimum allowed brightness (0-100)
+            display (int, optional): Display index, None for all displays
+            
+        Returns:
+            tuple or None: (average_brightness, target_brightness), or None if
+            paused or the luminance could not be applied
+        """
+        if self.paused:
+            return None
+        return self._adjust_display(
+            display, avg_brightness, True, (sensitivity, max_brightness, min_brightness)
+        )
+        
+    def _adjust_display(self, display: Optional[int], avg_brightness: Optional[float],
+                        changed: bool, settings: Tuple[float, int, int]) -> Optional[Tuple[float, float]]:
+        """
+        Compute, filter and apply the target brightness of one display.
+        
+        Returns:
+            tuple or None: (average_brightness, target_brightness), or None on failure
+        """
+        if avg_brightness is None:
+            return None
+        with self._apply_lock:
+            return self._apply_display(display, avg_brightness, changed, settings)
             
+    def _apply_display(self, display: Optional[int], avg_brightness: float,
+                       changed: bool, settings: Tuple[float, int, int]) -> Optional[Tuple[float, float]]:
+        """Body of _adjust_display(); called with _apply_lock held."""
+        last_applied = self._last_applied.get(display)
+        if not changed and last_applied is not None and last_applied[0] == settings:
+            return last_applied[1]
+            
+        sensitivity, max_brightness, min_brightness = settings
+        
         # Calculate target brightness
         target_brightness = self.calculate_target_brightness(avg_brightness, sensitivity)
         if target_brightness is None:
-            return 0, 0
+            return None
             
         # Apply brightness limits
         target_brightness = min(max(target_brightness, min_brightness), max_brightness)
+        result = (avg_brightness, target_brightness)
         
+        if not self._display_health(display).available():
+            # Skip a failing display until its next probe is due
+            self.metrics.increment("writes_skipped")
+            return None
+            
+        value = int(target_brightness)
+        suppressed = self.write_filter.check(value, display)
+        if suppressed is not None:
+            # A rate-limited target has not been applied yet, so retry it next tick
+            if suppressed != RATE_LIMIT:
+                self._last_applied[display] = (settings, result)
+            return result
+            
+        if self.transition_duration > 0:
+            self._transition_for(display).set_target(value)
+            self.write_filter.record(value, display)
+            self._last_applied[display] = (settings, result)
+            return result
+            
+        if self.async_writes:
+            # Optimistically record the write; _write_failed() undoes this on error
+            self._writer_for(display).submit(value)
+            self.write_filter.record(value, display)
+            self._last_applied[display] = (settings, result)
+            return result
+            
         try:
-            sbc.set_brightness(int(target_brightness))
-            return avg_brightness, target_brightness
+            self._write_brightness(value, display)
+            self.write_filter.record(value, display)
+            self._last_applied[display] = (settings, result)
+            return result
             
+        except CircuitOpenError:
+            return None
         except Exception as e:
-            print(f"Error setting brightness: {e}")
-            return 0, 0
+            self._report_failure(self._display_health(display), f"Error setting brightness: {e}")
+            return None
             
     def set_manual_brightness(self, brightness: int) -> None:
         """
@@ -161,21 +1077,34 @@ class BrightnessController:
         if not 0 <= brightness <= 100:
             raise ValueError("Brightness must be between 0 and 100")
             
-        try:
-            sbc.set_brightness(brightness)
-            self.current_manual_brightness = brightness
-        except Exception as e:
-            print(f"Error setting manual brightness: {e}")
-            
-    def get_current_brightness(self) -> int:
+        with self._apply_lock:
+            try:
+                for writer in self.writers.values():
+                    writer.cancel()  # A pending automatic target must not override this
+                self._backend().set_brightness(brightness)
+                for engine in self.transitions.values():
+                    engine.sync(brightness)
+                for display in [None] + [display.index for display in self.displays]:
+                    self.write_filter.record(brightness, display)
+                self.current_manual_brightness = brightness
+                self._last_applied = {}
+            except Exception as e:
+                print(f"Error setting manual brightness: {e}")
+                
+    def get_current_brightness(self, display: Optional[int] = None) -> int:
         """
         Get the current screen brightness level.
         
+        Args:
+            display (int, optional): Display index; defaults to the first monitor
+            
         Returns:
             int: Current brightness level (0-100)
         """
         try:
-            return sbc.get_brightness()[0]  # Returns first monitor's brightness
+            return self._read_brightness(display)
+        except CircuitOpenError:
+            return 0
         except Exception as e:
-            print(f"Error getting current brightness: {e}")
-            return 0
\ No newline at end of file
+            self._report_failure(self._display_health(display), f"Error getting current brightness: {e}")
+            return 0
@@ -0,0 +1,89 @@
+import threading
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+
+class BrightnessWorker(QObject):
+    """
+    Runs brightness control ticks on a dedicated background thread.
+
+    Screen capture, analysis and the blocking brightness write all happen on
+    the worker thread. Results are delivered back to the GUI thread through
+    queued signals, and at most one tick is in flight at any time.
+    """
+
+    # (average, target, measured); measured is False when the tick failed
+    tick_finished = pyqtSignal(float, float, bool)
+    _tick_requested = pyqtSignal(int, int, int)
+    _manual_requested = pyqtSignal(int)
+
+    def __init__(self, controller):
+        """
+        Initialize the worker and start its thread.
+
+        Args:
+            controller (BrightnessController): Controller driven by the worker.
+        """
+        super().__init__()
+        self.controller = controller
+        self._in_flight = threading.Lock()
+
+        self.thread = QThread()
+        self.moveToThread(self.thread)
+        self._tick_requested.connect(self._run_tick)
+        self._manual_requested.connect(self._run_manual)
+        self.thread.start()
+
+    def request_tick(self, sensitivity: int, max_brightness: int, min_brightness: int) -> bool:
+        """
+        Schedule a control tick on the worker thread.
+
+        Args:
+            sensitivity (int): Adjustment sensitivity (1-10)
+            max_brightness (int): Maximum allowed brightness (0-100)
+            min_brightness (int): Minimum allowed brightness (0-100)
+
+        Returns:
+            bool: True if the tick was scheduled, False if one is still running.
+        """
+        if not self._in_flight.acquire(blocking=False):
+            return False
+        self._tick_requested.emit(sensitivity, max_brightness, min_brightness)
+        return True
+
+    def request_manual_brightness(self, brightness: int) -> None:
+        """
+        Apply a manual brightness value on the worker thread.
+
+        Args:
+            brightness (int): Target brightness level (0-100)
+        """
+        self._manual_requested.emit(brightness)
+
+    def stop(self) -> None:
+        """Stop the worker thread and wait for the running tick to finish."""
+        self.thread.quit()
+        self.thread.wait()
+
+    @pyqtSlot(int, int, int)
+    def _run_tick(self, sensitivity, max_brightness, min_brightness):
+        avg_brightness, target_brightness = 0, 0
+        measured = False
+        try:
+            avg_brightness, target_brightness = self.controller.adjust_brightness(
+                sensitivity=sensitivity,
+                max_brightness=max_brightness,
+                min_brightness=min_brightness
+            )
+            measured = not self.controller.last_tick_failed
+        except Exception as e:
+            print(f"Error running brightness tick: {e}")
+        finally:
+            self._in_flight.release()
+        self.tick_finished.emit(float(avg_brightness), float(target_brightness), measured)
+
+    @pyqtSlot(int)
+    def _run_manual(self, brightness):
+        try:
+            self.controller.set_manual_brightness(brightness)
+        except ValueError as e:
+            print(f"Error setting manual brightness: {e}")
@@ -0,0 +1,106 @@
+import numpy as np
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+# Default ceiling on pooled scratch memory; a 4K frame needs about 12 MB
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class BufferPool:
+    """
+    Reusable scratch arrays keyed by purpose, shape and dtype.
+
+    Analysis steps ask the pool for their temporaries instead of allocating
+    them, so a steady stream of same-sized frames settles into a fixed set
+    of buffers and stops allocating. A buffer is returned uninitialized and
+    stays valid only until the next get() with the same key, so the pool
+    must not be shared between threads.
+
+    When the pooled bytes would exceed max_bytes, the least recently used
+    buffers are released. A single request larger than the ceiling is
+    allocated without being pooled.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_bytes (int): Ceiling on the bytes held by pooled buffers
+
+        Raises:
+            ValueError: If max_bytes is negative
+        """
+        if max_bytes < 0:
+            raise ValueError("Invalid memory ceiling. Must be: max_bytes >= 0")
+        self.max_bytes = max_bytes
+        self._buffers = OrderedDict()  # (purpose, shape, dtype) -> array, oldest first
+        self.bytes_pooled = 0
+        self.bytes_allocated = 0  # Cumulative, including unpooled oversize buffers
+        self.allocations = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, purpose: Hashable, shape: Tuple[int, ...], dtype=np.float64) -> np.ndarray:
+        """
+        Return a scratch array, reusing a pooled one when possible.
+
+        Args:
+            purpose (hashable): Names the use of the buffer, so two temporaries
+                of the same shape needed at the same time do not collide
+            shape (tuple): Array shape
+            dtype: Array dtype
+
+        Returns:
+            np.ndarray: Uninitialized C-contiguous array
+        """
+        dtype = np.dtype(dtype)
+        key = (purpose, tuple(int(size) for size in shape), dtype)
+        buffer = self._buffers.get(key)
+        if buffer is not None:
+            self._buffers.move_to_end(key)
+            self.hits += 1
+            return buffer
+
+        buffer = np.empty(key[1], dtype)
+        self.allocations += 1
+        self.bytes_allocated += buffer.nbytes
+        if buffer.nbytes <= self.max_bytes:
+            self._evict(self.max_bytes - buffer.nbytes)
+            self._buffers[key] = buffer
+            self.bytes_pooled += buffer.nbytes
+        return buffer
+
+    def _evict(self, limit: int) -> None:
+        """Release least recently used buffers until at most limit bytes are pooled."""
+        while self._buffers and self.bytes_pooled > limit:
+            _, buffer = self._buffers.popitem(last=False)
+            self.bytes_pooled -= buffer.nbytes
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """
+        Change the ceiling, releasing buffers that no longer fit.
+
+        Raises:
+            ValueError: If max_bytes is negative
+        """
+        if max_bytes < 0:
+            raise ValueError("Invalid memory ceiling. Must be: max_bytes >= 0")
+        self.max_bytes = max_bytes
+        self._evict(max_bytes)
+
+    def clear(self) -> None:
+        """Release every pooled buffer."""
+        self._buffers.clear()
+        self.bytes_pooled = 0
+
+    def stats(self) -> dict:
+        return {
+            "bytes_pooled": self.bytes_pooled,
+            "max_bytes": self.max_bytes,
+            "bytes_allocated": self.bytes_allocated,
+            "allocations": self.allocations,
+            "hits": self.hits,
+            "evictions": self.evictions,
+        }
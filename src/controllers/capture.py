@@ -0,0 +1,337 @@
+import ctypes
+import numpy as np
+from typing import Iterable, Optional, Tuple
+from . import x11
+
+
+class CaptureBackend:
+    """
+    Base class for screen capture backends.
+
+    A backend returns the current screen contents as an HxWxC uint8 array.
+    The `channels` attribute describes the channel order of that array so
+    analysis code can pick the right luma weights without converting.
+    """
+
+    name = "base"
+    channels = "RGB"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Return True if the backend can be used on this system."""
+        return True
+
+    def grab(self) -> np.ndarray:
+        """
+        Capture the current screen contents.
+
+        Returns:
+            np.ndarray: HxWxC uint8 frame. Backends may return a view into a
+            buffer that is overwritten by the next call to grab().
+        """
+        raise NotImplementedError
+
+    def screen_size(self) -> Tuple[int, int]:
+        """
+        Return the (width, height) of the captured desktop.
+
+        The default grabs one frame the first time and caches its size.
+        """
+        size = getattr(self, "_screen_size", None)
+        if size is None:
+            frame = self.grab()
+            size = self._screen_size = (frame.shape[1], frame.shape[0])
+        return size
+
+    def grab_region(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Capture part of the screen.
+
+        The default crops a full capture; backends that can fetch a region
+        directly override this so only those pixels are transferred.
+
+        Args:
+            x (int): Left edge in desktop coordinates
+            y (int): Top edge in desktop coordinates
+            width (int): Region width in pixels
+            height (int): Region height in pixels
+
+        Returns:
+            np.ndarray: height x width x C uint8 frame, possibly a view into a
+            buffer that is overwritten by the next capture
+        """
+        return self.grab()[y:y + height, x:x + width]
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class PILCaptureBackend(CaptureBackend):
+    """Capture backend built on PIL.ImageGrab, available on every platform."""
+
+    name = "pil"
+    channels = "RGB"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            from PIL import ImageGrab  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def grab(self) -> np.ndarray:
+        from PIL import ImageGrab
+        try:
+            # The whole virtual desktop, so every display's region is in the frame;
+            # without all_screens only the primary screen is captured on Windows
+            screen = ImageGrab.grab(all_screens=True)
+        except TypeError:
+            screen = ImageGrab.grab()  # Pillow < 6.2
+        return np.asarray(screen)
+
+    def grab_region(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        from PIL import ImageGrab
+        return np.asarray(ImageGrab.grab(bbox=(x, y, x + width, y + height)))
+
+
+class SyntheticCaptureBackend(CaptureBackend):
+    """
+    In-memory frame source for tests, benchmarks and headless runs.
+
+    Cycles through the supplied frames, or returns a uniform gray frame.
+    """
+
+    name = "synthetic"
+    channels = "RGB"
+
+    def __init__(self, frames: Optional[Iterable[np.ndarray]] = None,
+                 width: int = 1920, height: int = 1080, value: int = 128):
+        """
+        Initialize the synthetic source.
+
+        Args:
+            frames (iterable, optional): HxWx3 uint8 RGB frames to cycle through
+            width (int): Width of the default uniform frame
+            height (int): Height of the default uniform frame
+            value (int): Gray level of the default uniform frame (0-255)
+        """
+        if frames is None:
+            frames = [np.full((height, width, 3), value, dtype=np.uint8)]
+        self.frames = list(frames)
+        if not self.frames:
+            raise ValueError("Synthetic capture needs at least one frame")
+        self._index = 0
+
+    def grab(self) -> np.ndarray:
+        frame = self.frames[self._index]
+        self._index = (self._index + 1) % len(self.frames)
+        return frame
+
+
+class _ShmImage:
+    """An XImage backed by a System V shared memory segment, exposed as a NumPy view."""
+
+    def __init__(self, display, screen: int, width: int, height: int):
+        """
+        Create and attach the image.
+
+        Raises:
+            RuntimeError: If the image or segment cannot be created or attached
+        """
+        self._xlib = x11.xlib()
+        self._xext = x11.xext()
+        self._libc = x11.libc()
+        self._display = display
+        self._image = None
+        self._shminfo = x11.XShmSegmentInfo(shmid=-1)
+        self._attached = False
+        try:
+            self._attach(screen, width, height)
+        except Exception:
+            self.close()
+            raise
+
+    def _attach(self, screen, width, height):
+        self._image = self._xext.XShmCreateImage(
+            self._display, self._xlib.XDefaultVisual(self._display, screen),
+            self._xlib.XDefaultDepth(self._display, screen), x11.ZPIXMAP,
+            None, ctypes.byref(self._shminfo), width, height
+        )
+        if not self._image:
+            raise RuntimeError("XShmCreateImage failed")
+        image = self._image.contents
+        if image.bits_per_pixel != 32:
+            raise RuntimeError(f"Unsupported pixel format: {image.bits_per_pixel} bpp")
+
+        size = image.bytes_per_line * image.height
+        self._shminfo.shmid = self._libc.shmget(x11.IPC_PRIVATE, size, x11.IPC_CREAT | 0o600)
+        if self._shminfo.shmid < 0:
+            raise RuntimeError("shmget failed")
+        address = self._libc.shmat(self._shminfo.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            raise RuntimeError("shmat failed")
+        self._shminfo.shmaddr = address
+        self._shminfo.readOnly = 0
+        image.data = address
+
+        errors = x11.error_count()
+        if not self._xext.XShmAttach(self._display, ctypes.byref(self._shminfo)):
+            raise RuntimeError("XShmAttach failed")
+        self._xlib.XSync(self._display, 0)
+        if x11.error_count() != errors:
+            raise RuntimeError("XShmAttach was rejected by the X server")
+        self._attached = True
+
+        # Mark the segment for removal once both sides have detached
+        self._libc.shmctl(self._shminfo.shmid, x11.IPC_RMID, None)
+
+        self.channels = x11.channel_order(image)
+        buffer = (ctypes.c_ubyte * size).from_address(address)
+        self.frame = np.ndarray(
+            (image.height, image.width, 4), dtype=np.uint8, buffer=buffer,
+            strides=(image.bytes_per_line, 4, 1)
+        )
+
+    def get(self, root: int, x: int, y: int) -> np.ndarray:
+        """Copy the root window area at (x, y) into the segment and return the view."""
+        if not self._xext.XShmGetImage(self._display, root, self._image, x, y, x11.ALL_PLANES):
+            raise RuntimeError("XShmGetImage failed")
+        return self.frame
+
+    def close(self) -> None:
+        if self._attached:
+            self._xext.XShmDetach(self._display, ctypes.byref(self._shminfo))
+            self._xlib.XSync(self._display, 0)
+            self._attached = False
+        if self._shminfo.shmaddr:
+            self._libc.shmdt(self._shminfo.shmaddr)
+            self._shminfo.shmaddr = None
+        if self._shminfo.shmid >= 0:
+            self._libc.shmctl(self._shminfo.shmid, x11.IPC_RMID, None)
+            self._shminfo.shmid = -1
+        if self._image:
+            self._xlib.XFree(self._image)
+            self._image = None
+
+
+class X11ShmCaptureBackend(CaptureBackend):
+    """
+    Zero-copy capture of the X11 root window through MIT-SHM.
+
+    The X server writes the framebuffer into a System V shared memory segment
+    and grab() returns a NumPy view of that segment, so no pixel data is
+    copied in Python. Regions are fetched into segments of their own size, so
+    the server only transfers the requested pixels.
+    """
+
+    name = "x11-shm"
+    MAX_REGION_IMAGES = 4  # Segments kept for recently used region sizes
+
+    @classmethod
+    def is_available(cls) -> bool:
+        if not x11.display_available() or x11.xext() is None or x11.libc() is None:
+            return False
+        display = x11.xlib().XOpenDisplay(None)
+        if not display:
+            return False
+        try:
+            return bool(x11.xext().XShmQueryExtension(display))
+        finally:
+            x11.xlib().XCloseDisplay(display)
+
+    def __init__(self):
+        """
+        Connect to the X server.
+
+        Raises:
+            RuntimeError: If the display, the extension or the segment is unavailable
+        """
+        self._xlib = x11.xlib()
+        self._full = None
+        self._region_images = {}  # (width, height) -> _ShmImage, oldest first
+
+        self._display = self._xlib.XOpenDisplay(None)
+        if not self._display:
+            raise RuntimeError("Cannot open X display")
+        x11.install_error_handler()
+        self._screen = self._xlib.XDefaultScreen(self._display)
+        self._root = self._xlib.XRootWindow(self._display, self._screen)
+        try:
+            self._full = _ShmImage(self._display, self._screen, *self.screen_size())
+        except Exception:
+            self.close()
+            raise
+        self.channels = self._full.channels
+
+    def screen_size(self) -> Tuple[int, int]:
+        return (
+            self._xlib.XDisplayWidth(self._display, self._screen),
+            self._xlib.XDisplayHeight(self._display, self._screen),
+        )
+
+    def grab(self) -> np.ndarray:
+        return self._full.get(self._root, 0, 0)
+
+    def grab_region(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        image = self._region_images.pop((width, height), None)
+        if image is None:
+            if len(self._region_images) >= self.MAX_REGION_IMAGES:
+                oldest = next(iter(self._region_images))
+                self._region_images.pop(oldest).close()
+            image = _ShmImage(self._display, self._screen, width, height)
+        self._region_images[(width, height)] = image  # Most recently used last
+        return image.get(self._root, x, y)
+
+    def close(self) -> None:
+        if self._display is None:
+            return
+        for image in self._region_images.values():
+            image.close()
+        self._region_images = {}
+        if self._full is not None:
+            self._full.close()
+            self._full = None
+        self._xlib.XCloseDisplay(self._display)
+        self._display = None
+
+
+CAPTURE_BACKENDS = {
+    backend.name: backend
+    for backend in (X11ShmCaptureBackend, PILCaptureBackend, SyntheticCaptureBackend)
+}
+
+# Backends tried in order when none is requested explicitly
+PROBE_ORDER = (X11ShmCaptureBackend, PILCaptureBackend)
+
+
+def probe_capture_backend(preferred: Optional[str] = None) -> CaptureBackend:
+    """
+    Create the best capture backend available on this system.
+
+    Args:
+        preferred (str, optional): Name of the backend to use, one of
+            "x11-shm", "pil" or "synthetic". Probing is skipped when given.
+
+    Returns:
+        CaptureBackend: The first backend that is available and initializes
+        successfully, falling back to the PIL backend.
+
+    Raises:
+        ValueError: If the preferred backend name is unknown
+    """
+    if preferred is not None:
+        if preferred not in CAPTURE_BACKENDS:
+            raise ValueError(
+                f"Unknown capture backend. Must be one of: {', '.join(CAPTURE_BACKENDS)}"
+            )
+        return CAPTURE_BACKENDS[preferred]()
+
+    for backend in PROBE_ORDER:
+        if not backend.is_available():
+            continue
+        try:
+            return backend()
+        except Exception as e:
+            print(f"Capture backend {backend.name} unavailable: {e}")
+    return PILCaptureBackend()
@@ -0,0 +1,357 @@
+"""
+Local control API: newline-delimited JSON over a Unix domain socket.
+
+Every request is one JSON object on its own line, e.g.
+
+    {"id": 1, "cmd": "set_limits", "max": 70, "min": 10}
+
+and is answered by one line carrying the same id:
+
+    {"id": 1, "ok": true, "result": null}
+
+or {"id": 1, "ok": false, "error": "..."}. Commands:
+
+    ping, get                      -> "pong", the full state
+    get_brightness [display]       -> current brightness (0-100)
+    set_brightness value           pause automatic control and set brightness
+    get_limits, set_limits max min
+    get_sensitivity, set_sensitivity value
+    get_paused, pause, resume
+    batch commands                 run a list of commands in order, without
+                                   other clients' commands in between;
+                                   returns one response per command
+    subscribe, unsubscribe         start or stop a stream of
+                                   {"event": "tick", "average": ..., "target": ...}
+                                   lines after every control tick
+
+Requests are answered in the order they arrive on a connection.
+"""
+import asyncio
+import concurrent.futures
+import json
+import os
+import socket
+import threading
+import time
+from typing import Optional
+
+STREAM_COMMANDS = ("subscribe", "unsubscribe")
+SUBSCRIBER_QUEUE = 64  # Tick events buffered per slow subscriber before the oldest are dropped
+
+
+def default_socket_path() -> str:
+    """Return $XDG_RUNTIME_DIR/glimmer.sock, or a per-user path in /tmp."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "glimmer.sock")
+    return os.path.join("/tmp", f"glimmer-{os.getuid()}.sock")
+
+
+class ControlHost:
+    """
+    Applies control commands to a running Glimmer.
+
+    The default implementation drives a BrightnessController and keeps the
+    sensitivity on the ControlLoop, as in headless mode. Commands run one at
+    a time on a private thread, so a slow brightness read never stalls the
+    socket. Hosts with their own state, such as the UI, override call() to
+    run commands on their own thread and the accessors to use that state.
+    """
+
+    def __init__(self, controller, loop=None):
+        """
+        Initialize the host.
+
+        Args:
+            controller (BrightnessController): Controller to drive
+            loop (ControlLoop, optional): Loop whose sensitivity is used
+        """
+        self.controller = controller
+        self.loop = loop
+        self._sensitivity = 7
+        self._executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="control-command")
+
+    def call(self, function, *args) -> concurrent.futures.Future:
+        """Run function(*args) on the host's command thread."""
+        return self._executor.submit(function, *args)
+
+    def brightness(self, display: Optional[int] = None) -> int:
+        return self.controller.get_current_brightness(display)
+
+    def set_brightness(self, value: int) -> None:
+        if not self.controller.paused:
+            self.controller.pause()
+        self.controller.set_manual_brightness(value)
+
+    def limits(self):
+        return self.controller.max_brightness_limit, self.controller.min_brightness_limit
+
+    def set_limits(self, max_brightness: int, min_brightness: int) -> None:
+        self.controller.set_brightness_limits(max_brightness, min_brightness)
+
+    def sensitivity(self) -> float:
+        return self.loop.sensitivity if self.loop is not None else self._sensitivity
+
+    def set_sensitivity(self, value: float) -> None:
+        if not 1 <= value <= 10:
+            raise ValueError("Invalid sensitivity. Must be: 1 <= sensitivity <= 10")
+        if self.loop is not None:
+            self.loop.sensitivity = value
+        else:
+            self._sensitivity = value
+
+    def paused(self) -> bool:
+        return self.controller.paused
+
+    def pause(self) -> None:
+        self.controller.pause()
+
+    def resume(self) -> None:
+        self.controller.resume()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def _number(request: dict, name: str, integer: bool = True):
+    """Return a numeric request argument."""
+    value = request.get(name)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Invalid {name}. Must be: a number")
+    if integer:
+        if value != int(value):
+            raise ValueError(f"Invalid {name}. Must be: an integer")
+        return int(value)
+    return value
+
+
+class ControlServer:
+    """
+    Serves the control API on a Unix socket from an asyncio loop in a
+    background thread.
+
+    Tick results reach subscribers through the controller's tick listeners.
+    The socket is created with owner-only permissions.
+    """
+
+    def __init__(self, host: ControlHost, path: Optional[str] = None):
+        """
+        Start serving.
+
+        Args:
+            host (ControlHost): Host that executes the commands
+            path (str, optional): Socket path, default_socket_path() if omitted
+
+        Raises:
+            OSError: If the socket cannot be created or another Glimmer is
+                already listening on it
+        """
+        self.host = host
+        self.path = path or default_socket_path()
+        self.clients = 0
+        self.events_dropped = 0
+        self._subscribers = set()  # asyncio.Queue per subscribed connection
+        self._server = None
+        self._error = None
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="control-api", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+        host.controller.tick_listeners.append(self._on_tick)
+
+    def _remove_stale_socket(self) -> None:
+        """Delete a socket file left behind by a process that is gone."""
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except ConnectionRefusedError:
+            os.unlink(self.path)
+            return
+        except OSError:
+            return  # Not a socket; binding will report it
+        finally:
+            probe.close()
+        raise OSError(f"Glimmer is already listening on {self.path}")
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._remove_stale_socket()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_unix_server(self._serve_client, self.path)
+            )
+            os.chmod(self.path, 0o600)
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            self._loop.close()
+            return
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    async def _serve_client(self, reader, writer):
+        self.clients += 1
+        queue = None
+        sender = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    self._send(writer, {"id": None, "ok": False, "error": f"Invalid request: {e}"})
+                    continue
+
+                command = request.get("cmd")
+                if command == "subscribe":
+                    if queue is None:
+                        queue = asyncio.Queue(SUBSCRIBER_QUEUE)
+                        self._subscribers.add(queue)
+                        sender = asyncio.ensure_future(self._stream(queue, writer))
+                    response = {"ok": True, "result": None}
+                elif command == "unsubscribe":
+                    if queue is not None:
+                        self._subscribers.discard(queue)
+                        sender.cancel()
+                        queue = sender = None
+                    response = {"ok": True, "result": None}
+                else:
+                    response = await asyncio.wrap_future(self.host.call(self._dispatch, request))
+                self._send(writer, {"id": request.get("id"), **response})
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # Client went away or sent an over-long line
+        except asyncio.CancelledError:
+            pass  # Server shutting down; end quietly instead of failing the connection callback
+        finally:
+            if queue is not None:
+                self._subscribers.discard(queue)
+                sender.cancel()
+            self.clients -= 1
+            writer.close()
+
+    @staticmethod
+    def _send(writer, message: dict) -> None:
+        writer.write(json.dumps(message).encode() + b"\n")
+
+    async def _stream(self, queue, writer):
+        """Forward tick events to one subscriber."""
+        while True:
+            event = await queue.get()
+            self._send(writer, event)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                return
+
+    def _dispatch(self, request: dict) -> dict:
+        """Execute one command on the host thread and build its response."""
+        try:
+            return {"ok": True, "result": self._execute(request)}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    def _execute(self, request: dict):
+        host = self.host
+        command = request.get("cmd")
+        if command == "ping":
+            return "pong"
+        if command == "get":
+            max_brightness, min_brightness = host.limits()
+            controller = host.controller
+            return {
+                "paused": host.paused(),
+                "override_active": controller.override_active,
+                "manual_brightness": controller.current_manual_brightness,
+                "sensitivity": host.sensitivity(),
+                "max_brightness": max_brightness,
+                "min_brightness": min_brightness,
+                "active_app": controller.active_app,
+            }
+        if command == "get_brightness":
+            display = request.get("display")
+            return host.brightness(None if display is None else _number(request, "display"))
+        if command == "set_brightness":
+            value = _number(request, "value")
+            if not 0 <= value <= 100:
+                raise ValueError("Invalid brightness. Must be: 0 <= value <= 100")
+            host.set_brightness(value)
+            return None
+        if command == "get_limits":
+            max_brightness, min_brightness = host.limits()
+            return {"max": max_brightness, "min": min_brightness}
+        if command == "set_limits":
+            host.set_limits(_number(request, "max"), _number(request, "min"))
+            return None
+        if command == "get_sensitivity":
+            return host.sensitivity()
+        if command == "set_sensitivity":
+            host.set_sensitivity(_number(request, "value", integer=False))
+            return None
+        if command == "get_paused":
+            return host.paused()
+        if command == "pause":
+            host.pause()
+            return None
+        if command == "resume":
+            host.resume()
+            return None
+        if command == "batch":
+            commands = request.get("commands")
+            if not isinstance(commands, list) or not all(isinstance(item, dict) for item in commands):
+                raise ValueError("Invalid commands. Must be: a list of command objects")
+            responses = []
+            for item in commands:
+                if item.get("cmd") in STREAM_COMMANDS + ("batch",):
+                    response = {"ok": False, "error": f"{item.get('cmd')} cannot be batched"}
+                else:
+                    response = self._dispatch(item)
+                responses.append({"id": item.get("id"), **response})
+            return responses
+        raise ValueError(f"Unknown command: {command}")
+
+    def _on_tick(self, avg_brightness: float, target_brightness: float) -> None:
+        """Tick listener; called on the tick thread."""
+        if self._subscribers:
+            event = {"event": "tick", "time": time.time(),
+                     "average": avg_brightness, "target": target_brightness}
+            self._loop.call_soon_threadsafe(self._publish, event)
+
+    def _publish(self, event: dict) -> None:
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()  # Live stream: drop the oldest event
+                self.events_dropped += 1
+            queue.put_nowait(event)
+
+    def close(self) -> None:
+        """Stop serving and remove the socket."""
+        listeners = self.host.controller.tick_listeners
+        if self._on_tick in listeners:
+            listeners.remove(self._on_tick)
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        self.host.close()
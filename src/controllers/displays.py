@@ -0,0 +1,79 @@
+from typing import Optional, Tuple
+
+
+class Display:
+    """
+    Per-display control settings.
+
+    Each display has a brightness backend index, an optional capture region
+    in frame coordinates, and optional limits and sensitivity that override
+    the global values passed to the controller.
+    """
+
+    def __init__(self, index: int, region: Optional[Tuple[int, int, int, int]] = None,
+                 max_brightness: Optional[int] = None, min_brightness: Optional[int] = None,
+                 sensitivity: Optional[float] = None, name: Optional[str] = None):
+        """
+        Initialize the display settings.
+
+        Args:
+            index (int): Display index understood by the brightness backend
+            region (tuple, optional): (x, y, width, height) of the display inside
+                the captured frame; None analyzes the whole frame
+            max_brightness (int, optional): Display-specific maximum brightness (0-100)
+            min_brightness (int, optional): Display-specific minimum brightness (0-100)
+            sensitivity (float, optional): Display-specific sensitivity (1-10)
+            name (str, optional): Human readable name for status output
+
+        Raises:
+            ValueError: If the region or limits are invalid
+        """
+        if region is not None and (region[2] <= 0 or region[3] <= 0):
+            raise ValueError("Display region must have a positive width and height")
+        if not 0 <= (min_brightness or 0) <= (100 if max_brightness is None else max_brightness) <= 100:
+            raise ValueError("Invalid brightness limits. Must be: 0 <= min <= max <= 100")
+
+        self.index = index
+        self.region = region
+        self.max_brightness = max_brightness
+        self.min_brightness = min_brightness
+        self.sensitivity = sensitivity
+        self.name = name or f"Display {index}"
+
+    def crop(self, frame):
+        """
+        Return the part of a captured frame that shows this display.
+
+        Args:
+            frame (np.ndarray): HxWxC frame of the whole desktop
+
+        Returns:
+            np.ndarray: View of the display's region, clipped to the frame;
+            empty if the region lies outside it
+        """
+        if self.region is None:
+            return frame
+        x, y, width, height = self.region
+        left, top = max(x, 0), max(y, 0)
+        right = min(x + width, frame.shape[1])
+        bottom = min(y + height, frame.shape[0])
+        return frame[top:max(bottom, top), left:max(right, left)]
+
+    def settings(self, sensitivity: float, max_brightness: int,
+                 min_brightness: int) -> Tuple[float, int, int]:
+        """
+        Resolve the effective settings from the global defaults.
+
+        Args:
+            sensitivity (float): Global sensitivity
+            max_brightness (int): Global maximum brightness
+            min_brightness (int): Global minimum brightness
+
+        Returns:
+            tuple: (sensitivity, max_brightness, min_brightness) for this display
+        """
+        return (
+            sensitivity if self.sensitivity is None else self.sensitivity,
+            max_brightness if self.max_brightness is None else self.max_brightness,
+            min_brightness if self.min_brightness is None else self.min_brightness,
+        )
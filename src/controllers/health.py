@@ -0,0 +1,188 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+CLOSED = "ok"  # Calls go through
+OPEN = "down"  # Calls are skipped until the backoff delay has passed
+HALF_OPEN = "probing"  # One trial call is in flight
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose circuit is open."""
+
+
+def _validate(failure_threshold: int, base_delay: float, max_delay: float) -> None:
+    if failure_threshold < 1 or base_delay <= 0 or max_delay < base_delay:
+        raise ValueError("Invalid circuit breaker settings. Must be: failure_threshold >= 1, "
+                         "0 < base_delay <= max_delay")
+
+
+class CircuitBreaker:
+    """
+    Health of one backend or display, with exponential backoff.
+
+    After failure_threshold consecutive failures the circuit opens and
+    calls are skipped for base_delay seconds. The first allowed call after
+    that is a probe: if it succeeds the circuit closes, if it fails the
+    delay doubles, up to max_delay. While open, allow() and available()
+    only compare timestamps, so a dead display costs the hot path nothing.
+
+    Callers report results with success() and failure(); the breaker may be
+    used from several threads.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            name (str): Name shown in status and log messages
+            failure_threshold (int): Consecutive failures that open the circuit
+            base_delay (float): Seconds before the first probe
+            max_delay (float): Upper bound of the probe delay in seconds
+            clock (callable): Monotonic time source in seconds
+
+        Raises:
+            ValueError: If the threshold or delays are invalid
+        """
+        _validate(failure_threshold, base_delay, max_delay)
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0  # Consecutive failures
+        self.trips = 0  # Times the circuit opened
+        self.last_error = None
+        self.delay = base_delay  # Current backoff delay in seconds
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether a call would be allowed now, without claiming the probe."""
+        with self._lock:
+            if self.state == OPEN:
+                return self.clock() >= self._retry_at
+            return self.state == CLOSED
+
+    def allow(self) -> bool:
+        """
+        Whether to make a call now.
+
+        Once the backoff delay has passed the first caller is let through as
+        the probe; others are refused until its result is reported.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() >= self._retry_at:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def success(self) -> bool:
+        """
+        Record a successful call.
+
+        Returns:
+            bool: True if this closed an open circuit
+        """
+        with self._lock:
+            recovered = self.state != CLOSED
+            self.state = CLOSED
+            self.failures = 0
+            self.delay = self.base_delay
+            return recovered
+
+    def failure(self, error: Exception) -> None:
+        """Record a failed call, opening the circuit or backing off further."""
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == HALF_OPEN:
+                self.delay = min(self.delay * 2, self.max_delay)
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.delay = self.base_delay
+                self.trips += 1
+            else:
+                return
+            self.state = OPEN
+            self._retry_at = self.clock() + self.delay
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe; 0 unless the circuit is open."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(self._retry_at - self.clock(), 0.0)
+
+    def should_report(self) -> bool:
+        """Whether the latest failure is worth logging; repeats after the circuit opened are not."""
+        return self.failures <= self.failure_threshold
+
+    def describe(self) -> str:
+        if self.state == CLOSED:
+            return f"{self.name}: {CLOSED}"
+        if self.state == HALF_OPEN:
+            return f"{self.name}: {HALF_OPEN}"
+        return f"{self.name}: {OPEN}, retry in {round(self.retry_in(), 1):g} s"
+
+
+class HealthTracker:
+    """
+    Circuit breakers for the capture backend, the brightness backend and
+    individual displays, created on first use.
+    """
+
+    def __init__(self, failure_threshold: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the tracker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open a circuit
+            base_delay (float): Seconds before the first probe
+            max_delay (float): Upper bound of the probe delay in seconds
+            clock (callable): Monotonic time source in seconds
+
+        Raises:
+            ValueError: If the threshold or delays are invalid
+        """
+        _validate(failure_threshold, base_delay, max_delay)
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.breakers: Dict[Hashable, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, key: Hashable, name: Optional[str] = None) -> CircuitBreaker:
+        """Return the breaker for key, creating it with the given display name."""
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self.breakers.get(key)
+                if breaker is None:
+                    breaker = CircuitBreaker(
+                        name or str(key), self.failure_threshold, self.base_delay,
+                        self.max_delay, self.clock
+                    )
+                    self.breakers[key] = breaker
+        return breaker
+
+    def reset(self) -> None:
+        """Forget all health state, e.g. after the displays changed."""
+        with self._lock:
+            self.breakers = {}
+
+    def unhealthy(self) -> List[CircuitBreaker]:
+        return [breaker for breaker in list(self.breakers.values()) if breaker.state != CLOSED]
+
+    def summary(self) -> str:
+        """One line describing every unhealthy breaker, or that all are healthy."""
+        unhealthy = self.unhealthy()
+        if not unhealthy:
+            return f"all {CLOSED}"
+        return "; ".join(breaker.describe() for breaker in unhealthy)
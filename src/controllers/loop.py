@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Callable, Optional, Tuple
+from .power import LOCKED, PowerMonitor
+from .scheduler import AdaptiveScheduler
+
+
+class ControlLoop:
+    """
+    Plain-Python control loop that drives a BrightnessController.
+
+    Runs ticks on the calling thread and waits between them for the interval
+    chosen by an AdaptiveScheduler, stretched by an optional PowerMonitor
+    while the user is idle, the screen is locked or the system is on battery.
+    No Qt event loop is involved, so this is what headless mode and load
+    tests use.
+    """
+
+    def __init__(self, controller, scheduler: Optional[AdaptiveScheduler] = None,
+                 sensitivity: float = 7, max_brightness: int = 80, min_brightness: int = 20,
+                 on_tick: Optional[Callable[[float, float, int], None]] = None,
+                 power: Optional[PowerMonitor] = None):
+        """
+        Initialize the control loop.
+
+        Args:
+            controller (BrightnessController): Controller to drive
+            scheduler (AdaptiveScheduler, optional): Polling scheduler; a default
+                one is created if omitted
+            sensitivity (float): Adjustment sensitivity (1-10)
+            max_brightness (int): Maximum allowed brightness (0-100)
+            min_brightness (int): Minimum allowed brightness (0-100)
+            on_tick (callable, optional): Called after every tick with
+                (average_brightness, target_brightness, next_interval_ms)
+            power (PowerMonitor, optional): Idle, lock and battery awareness
+
+        Raises:
+            ValueError: If the brightness limits are invalid
+        """
+        controller.set_brightness_limits(max_brightness, min_brightness)
+        self.controller = controller
+        self.scheduler = scheduler or AdaptiveScheduler()
+        self.sensitivity = sensitivity
+        self.on_tick = on_tick
+        self.power = power
+        self.interval_ms = self.scheduler.interval_ms  # Wait before the next tick
+        self.ticks = 0
+        self._stop_event = threading.Event()
+
+    def tick(self) -> Tuple[float, float]:
+        """
+        Run one control tick and update the polling interval.
+
+        Returns:
+            tuple: (average_brightness, target_brightness) from the controller,
+            or (0, 0) if the tick was skipped because control is paused or
+            the screen is locked
+        """
+        if self.controller.paused:
+            return 0, 0  # Paused through the control API; keep the interval
+        state = self.power.state() if self.power is not None else None
+        if state == LOCKED:
+            # Nothing to meter behind a locker; only check again later
+            self.interval_ms = self.power.schedule(self.scheduler, None, state)
+            self.controller.expected_tick_interval = None
+            return 0, 0
+
+        avg_brightness, target_brightness = self.controller.adjust_brightness(
+            sensitivity=self.sensitivity,
+            max_brightness=self.controller.max_brightness_limit,
+            min_brightness=self.controller.min_brightness_limit
+        )
+        # A failed tick is no measurement, not a jump to black
+        luminance = None if self.controller.last_tick_failed else avg_brightness
+        if self.power is not None:
+            interval = self.power.schedule(self.scheduler, luminance, state)
+        else:
+            interval = self.scheduler.update(luminance)
+        self.interval_ms = interval
+        self.controller.expected_tick_interval = interval / 1000
+        self.ticks += 1
+        if self.on_tick is not None:
+            self.on_tick(avg_brightness, target_brightness, interval)
+        return avg_brightness, target_brightness
+
+    def run(self, max_ticks: Optional[int] = None) -> int:
+        """
+        Run ticks until stop() is called or max_ticks ticks have run.
+
+        While the controller is paused the loop sleeps until it is resumed
+        or stopped, instead of waking every interval.
+
+        Args:
+            max_ticks (int, optional): Number of ticks after which to return
+
+        Returns:
+            int: Number of ticks run by this call
+        """
+        start = self.ticks
+        while not self._stop_event.is_set():
+            if self.controller.paused:
+                self.controller.wait_while_paused(self._stop_event.is_set)
+                continue
+            started = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Error running brightness tick: {e}")
+            if max_ticks is not None and self.ticks - start >= max_ticks:
+                break
+            # Wait for the rest of the interval; stop() wakes the loop early
+            elapsed = time.monotonic() - started
+            self._stop_event.wait(max(self.interval_ms / 1000 - elapsed, 0))
+        return self.ticks - start
+
+    def stop(self) -> None:
+        """Ask a running loop to return after the current tick."""
+        self._stop_event.set()
+        self.controller.wake()  # A paused loop is waiting on the controller
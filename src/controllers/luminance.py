@@ -0,0 +1,220 @@
+import numpy as np
+from typing import Optional, Tuple
+from .buffers import BufferPool
+
+# ITU-R BT.601 luma weights, the same ones used by OpenCV's RGB2GRAY conversion
+LUMA_WEIGHTS = {"R": 0.299, "G": 0.587, "B": 0.114}
+
+ESTIMATOR_MODES = ("exact", "strided")
+
+METERING_MODES = ("mean", "linear", "percentile", "trimmed")
+
+# Integer BT.601 weights summing to 256, so luma = (77 R + 150 G + 29 B) >> 8
+INTEGER_LUMA_WEIGHTS = {"R": 77, "G": 150, "B": 29}
+
+
+def _srgb_to_linear(encoded):
+    return np.where(encoded <= 0.04045, encoded / 12.92, ((encoded + 0.055) / 1.055) ** 2.4)
+
+
+# Linear light (0-1) of every 8-bit sRGB-encoded level
+SRGB_TO_LINEAR = _srgb_to_linear(np.arange(256) / 255.0)
+
+
+def luma_weights(channels: str = "RGB") -> np.ndarray:
+    """
+    Build the per-channel luma weight vector for a pixel layout.
+
+    Args:
+        channels (str): Channel order of the frame, e.g. "RGB" or "BGRA".
+            Channels other than R, G and B get a weight of zero.
+
+    Returns:
+        np.ndarray: Weight vector with one entry per channel.
+    """
+    return np.array([LUMA_WEIGHTS.get(c, 0.0) for c in channels], dtype=np.float64)
+
+
+def _scratch(pool: Optional[BufferPool], purpose: str, shape, dtype) -> np.ndarray:
+    """Scratch array from the pool, or a fresh one when there is no pool."""
+    return np.empty(shape, dtype) if pool is None else pool.get(purpose, shape, dtype)
+
+
+def _weighted_channel_mean(frame: np.ndarray, weights: np.ndarray) -> float:
+    """Mean luma computed from per-channel integer sums, without a gray copy."""
+    pixels = frame.shape[0] * frame.shape[1]
+    if pixels == 0:
+        raise ValueError("Cannot compute luminance of an empty frame")
+    total = 0.0
+    for index, weight in enumerate(weights):
+        if weight:
+            total += weight * int(frame[..., index].sum(dtype=np.uint64))
+    return total / pixels
+
+
+def strided_luma_mean(frame: np.ndarray, sampling_factor: int, channels: str = "RGB",
+                      pool: Optional[BufferPool] = None) -> Tuple[float, float]:
+    """
+    Estimate mean luma from every n-th pixel of every n-th row.
+
+    Args:
+        frame (np.ndarray): HxWxC uint8 frame
+        sampling_factor (int): Stride along both axes
+        channels (str): Channel order of the frame
+        pool (BufferPool, optional): Source of scratch buffers
+
+    Returns:
+        tuple: (estimated_mean, error_bound)
+        - estimated_mean (float): Mean luma of the sampled pixels (0-255)
+        - error_bound (float): 99.7% confidence bound on the difference
+          between the estimate and the exact full-frame mean
+    """
+    sample = frame[::sampling_factor, ::sampling_factor]
+    samples = sample.shape[0] * sample.shape[1]
+    if samples == 0:
+        raise ValueError("Cannot compute luminance of an empty frame")
+
+    # Weight the channels into float buffers, without a float copy of the whole sample
+    shape = sample.shape[:2]
+    luma = _scratch(pool, "luma", shape, np.float64)
+    product = _scratch(pool, "luma_product", shape, np.float64)
+    luma.fill(0)
+    for index, weight in enumerate(luma_weights(channels)):
+        if weight:
+            np.multiply(sample[..., index], weight, out=product)
+            luma += product
+    luma = luma.reshape(-1)
+    mean = float(luma.sum()) / samples
+
+    population = frame.shape[0] * frame.shape[1]
+    if samples >= population:
+        return mean, 0.0
+
+    # Standard error of the mean with the finite population correction; the
+    # variance comes from the sum of squares to avoid std()'s temporaries
+    variance = max(float(np.dot(luma, luma)) / samples - mean * mean, 0.0)
+    correction = np.sqrt(1.0 - samples / population)
+    error_bound = 3.0 * np.sqrt(variance) / np.sqrt(samples) * correction
+    return mean, float(error_bound)
+
+
+def estimate_luma_mean(frame: np.ndarray, mode: str = "strided", sampling_factor: int = 4,
+                       channels: str = "RGB", pool: Optional[BufferPool] = None) -> Tuple[float, float]:
+    """
+    Compute the mean luma of a frame with the selected estimator.
+
+    Args:
+        frame (np.ndarray): HxWxC uint8 frame
+        mode (str): One of "exact" or "strided"
+        sampling_factor (int): Stride used by the subsampled mode
+        channels (str): Channel order of the frame
+        pool (BufferPool, optional): Source of scratch buffers
+
+    Returns:
+        tuple: (mean_luma, error_bound)
+
+    Raises:
+        ValueError: If the mode is unknown or the frame is empty
+    """
+    if mode == "exact" or sampling_factor == 1:
+        return _weighted_channel_mean(frame, luma_weights(channels)), 0.0
+    if mode == "strided":
+        return strided_luma_mean(frame, sampling_factor, channels, pool)
+    raise ValueError(f"Unknown estimator mode: {mode}")
+
+
+def linear_to_srgb(linear: float) -> float:
+    """
+    Encode a linear-light value (0-1) back to the 8-bit sRGB scale (0-255).
+
+    Args:
+        linear (float): Linear light between 0 and 1
+
+    Returns:
+        float: Gamma-encoded level between 0 and 255
+    """
+    linear = min(max(linear, 0.0), 1.0)
+    if linear <= 0.0031308:
+        encoded = linear * 12.92
+    else:
+        encoded = 1.055 * linear ** (1 / 2.4) - 0.055
+    return encoded * 255.0
+
+
+def luma_histogram(frame: np.ndarray, sampling_factor: int = 4, channels: str = "RGB",
+                   pool: Optional[BufferPool] = None) -> np.ndarray:
+    """
+    Build a 256-bin histogram of 8-bit luma from a strided view of a frame.
+
+    Args:
+        frame (np.ndarray): HxWxC uint8 frame
+        sampling_factor (int): Stride along both axes
+        channels (str): Channel order of the frame
+        pool (BufferPool, optional): Source of scratch buffers
+
+    Returns:
+        np.ndarray: Pixel counts per luma level (length 256)
+
+    Raises:
+        ValueError: If the frame is empty
+    """
+    sample = frame[::sampling_factor, ::sampling_factor]
+    if sample.shape[0] == 0 or sample.shape[1] == 0:
+        raise ValueError("Cannot compute luminance of an empty frame")
+
+    shape = sample.shape[:2]
+    luma = _scratch(pool, "luma16", shape, np.uint16)
+    product = _scratch(pool, "luma16_product", shape, np.uint16)
+    luma.fill(0)
+    for index, channel in enumerate(channels):
+        weight = INTEGER_LUMA_WEIGHTS.get(channel)
+        if weight:
+            np.multiply(sample[..., index], weight, out=product, dtype=np.uint16)
+            luma += product
+    # Shift straight into the index type bincount() works on, so it does not copy
+    levels = np.right_shift(luma, 8, out=_scratch(pool, "luma_levels", shape, np.intp))
+    return np.bincount(levels.reshape(-1), minlength=256)
+
+
+def histogram_luminance(histogram: np.ndarray, metering: str = "linear",
+                        percentile: float = 50.0, trim: float = 0.05) -> float:
+    """
+    Meter a luma histogram into a single luminance value.
+
+    Args:
+        histogram (np.ndarray): Pixel counts per luma level (length 256)
+        metering (str): "mean" for the mean of gamma-encoded levels,
+            "linear" for the mean in linear light, "percentile" for the level
+            below which the given percentage of pixels lie, or "trimmed" for
+            the linear-light mean after discarding the darkest and brightest
+            `trim` fraction of pixels
+        percentile (float): Percentile used by the "percentile" mode (0-100)
+        trim (float): Fraction trimmed from each end by the "trimmed" mode (0-0.5)
+
+    Returns:
+        float: Luminance on the gamma-encoded 0-255 scale
+
+    Raises:
+        ValueError: If the mode is unknown or the histogram is empty
+    """
+    total = int(histogram.sum())
+    if total == 0:
+        raise ValueError("Cannot meter an empty histogram")
+
+    if metering == "mean":
+        return float(histogram @ np.arange(256)) / total
+    if metering == "linear":
+        return linear_to_srgb(float(histogram @ SRGB_TO_LINEAR) / total)
+    if metering == "percentile":
+        rank = percentile / 100.0 * total
+        return float(min(np.searchsorted(np.cumsum(histogram), rank), 255))
+    if metering == "trimmed":
+        # Remove `trim` of the pixels from both ends of the cumulative histogram
+        low, high = trim * total, (1.0 - trim) * total
+        cumulative = np.cumsum(histogram)
+        previous = cumulative - histogram
+        kept = np.clip(np.minimum(cumulative, high) - np.maximum(previous, low), 0, None)
+        if not kept.sum():
+            return float(min(np.searchsorted(cumulative, total / 2), 255))
+        return linear_to_srgb(float(kept @ SRGB_TO_LINEAR) / float(kept.sum()))
+    raise ValueError(f"Unknown metering mode: {metering}")
@@ -0,0 +1,259 @@
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Sequence
+
+# Upper bounds in seconds, from sub-millisecond reductions to slow DDC/CI writes
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and two additions."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float or None: Estimated value in seconds, None if nothing was observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        return {
+            "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], self.counts)),
+            "sum": self.sum,
+            "count": self.count,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+def _finite(value):
+    """Replace non-finite floats with None, recursively; JSON has no Infinity or NaN."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def _prometheus_value(value) -> str:
+    """Format a sample value the way the Prometheus text format spells infinities and NaN."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return "NaN" if math.isnan(value) else ("+Inf" if value > 0 else "-Inf")
+    return str(value)
+
+
+class Metrics:
+    """
+    Thread-safe registry of stage histograms, counters and gauges.
+
+    Histograms hold durations in seconds. Gauges are callables evaluated at
+    export time, so values kept elsewhere (such as write filter counters)
+    are not copied on the hot path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration in the named histogram."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Add to the named counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Register a callable that reports the current value of a gauge."""
+        self.gauges[name] = read
+
+    @contextmanager
+    def timer(self, name: str):
+        """Context manager that records the duration of its block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def quantile(self, name: str, q: float) -> Optional[float]:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            return histogram.quantile(q) if histogram else None
+
+    def snapshot(self) -> dict:
+        """Return all metrics as plain data."""
+        with self._lock:
+            histograms = {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+            counters = dict(self.counters)
+        gauges = {}
+        for name, read in list(self.gauges.items()):
+            try:
+                gauges[name] = read()
+            except Exception:
+                gauges[name] = None
+        return {"histograms": histograms, "counters": counters, "gauges": gauges}
+
+    def to_json(self) -> str:
+        """Render all metrics as strict JSON; non-finite values become null."""
+        return json.dumps(_finite(self.snapshot()), indent=2, allow_nan=False)
+
+    def to_prometheus(self, prefix: str = "glimmer_") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, histogram in sorted(snapshot["histograms"].items()):
+            metric = f"{prefix}{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum {_prometheus_value(histogram['sum'])}")
+            lines.append(f"{metric}_count {histogram['count']}")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {prefix}{name}_total counter")
+            lines.append(f"{prefix}{name}_total {value}")
+        for name, value in sorted(snapshot["gauges"].items()):
+            if value is not None:
+                lines.append(f"# TYPE {prefix}{name} gauge")
+                lines.append(f"{prefix}{name} {_prometheus_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Publishes a Metrics registry on localhost HTTP and/or to a file.
+
+    The HTTP server answers /metrics with Prometheus text and /metrics.json
+    with JSON. The file is rewritten atomically at a fixed interval; a
+    ".json" extension selects JSON, anything else Prometheus text.
+    """
+
+    def __init__(self, metrics: Metrics, port: Optional[int] = None,
+                 path: Optional[str] = None, interval: float = 10.0):
+        """
+        Initialize the exporter and start its background threads.
+
+        Args:
+            metrics (Metrics): Registry to export
+            port (int, optional): Port to serve on 127.0.0.1
+            path (str, optional): File to write metrics to
+            interval (float): Seconds between file writes
+
+        Raises:
+            OSError: If the port cannot be bound
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._server = None
+        self._threads = []
+
+        if port is not None:
+            # Only the exporter needs an HTTP server; importing it here keeps it off the startup path
+            from http.server import ThreadingHTTPServer
+            self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+            self.port = self._server.server_address[1]
+            self._start(self._server.serve_forever, "metrics-http")
+        if path is not None:
+            self._start(self._write_loop, "metrics-file")
+
+    def _start(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _handler(self):
+        from http.server import BaseHTTPRequestHandler
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = metrics.to_json(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes are frequent; keep stderr quiet
+
+        return Handler
+
+    def write_file(self) -> None:
+        """Write the current metrics to the export file."""
+        body = self.metrics.to_json() if self.path.endswith(".json") else self.metrics.to_prometheus()
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as metrics_file:
+            metrics_file.write(body)
+        os.replace(temporary, self.path)
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write_file()
+            except OSError as e:
+                print(f"Error writing metrics: {e}")
+
+    def close(self) -> None:
+        """Stop serving and write the file one last time."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self.path is not None:
+            try:
+                self.write_file()
+            except OSError as e:
+                print(f"Error writing metrics: {e}")
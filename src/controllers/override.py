@@ -0,0 +1,185 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+from typing import Callable, Optional
+from .backlight import SysfsBacklightBackend
+
+IN_MODIFY = 0x00000002
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+_libc = None
+
+
+def _inotify():
+    """Return libc with the inotify calls declared, or None if unavailable."""
+    global _libc
+    if _libc is None:
+        path = ctypes.util.find_library("c")
+        lib = ctypes.CDLL(path, use_errno=True) if path else None
+        if lib is None or not hasattr(lib, "inotify_init1"):
+            return None
+        lib.inotify_init1.argtypes = [ctypes.c_int]
+        lib.inotify_init1.restype = ctypes.c_int
+        lib.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        lib.inotify_add_watch.restype = ctypes.c_int
+        _libc = lib
+    return _libc
+
+
+class OverrideDetector:
+    """
+    Detects brightness changes made outside Glimmer, without polling.
+
+    A background thread sleeps in poll() on two event sources per backlight
+    device: inotify IN_MODIFY on the brightness file, which fires when a
+    desktop environment or brightness key daemon writes it, and the sysfs
+    notification on actual_brightness, which fires when the firmware changes
+    the level itself. On an event the brightness is compared with the raw
+    value of Glimmer's own last write; a mismatch is a manual override.
+
+    After the last override, on_timeout is called once no further override
+    has been seen for timeout seconds.
+    """
+
+    def __init__(self, backend: SysfsBacklightBackend,
+                 on_override: Callable[[int, int], None],
+                 on_timeout: Optional[Callable[[], None]] = None,
+                 timeout: float = 300.0):
+        """
+        Start watching the backend's backlight devices.
+
+        Args:
+            backend (SysfsBacklightBackend): Backend whose devices are watched
+            on_override (callable): Called with (display index, brightness percent)
+                for every external change
+            on_timeout (callable, optional): Called once timeout seconds after
+                the last override
+            timeout (float): Quiet period in seconds before on_timeout
+
+        Raises:
+            ValueError: If the timeout is not positive
+            OSError: If inotify is unavailable or no device could be watched
+        """
+        if timeout <= 0:
+            raise ValueError("Override timeout must be positive")
+        libc = _inotify()
+        if libc is None:
+            raise OSError("inotify is not available")
+
+        self.backend = backend
+        self.on_override = on_override
+        self.on_timeout = on_timeout
+        self.timeout = timeout
+        self.overrides = 0
+        self._timer = None
+        self._timer_lock = threading.Lock()
+
+        self._inotify_fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._inotify_fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._poll = select.poll()
+        self._poll.register(self._inotify_fd, select.POLLIN)
+        self._watches = {}  # inotify watch descriptor -> display index
+        self._notify_fds = {}  # actual_brightness fd -> display index
+        for index, device in enumerate(backend.devices):
+            path = os.path.join(device.path, "brightness").encode()
+            wd = libc.inotify_add_watch(self._inotify_fd, path, IN_MODIFY)
+            if wd >= 0:
+                self._watches[wd] = index
+            try:
+                fd = os.open(os.path.join(device.path, "actual_brightness"), os.O_RDONLY)
+            except OSError:
+                continue
+            os.pread(fd, 32, 0)  # sysfs_notify() only wakes readers that have read once
+            self._poll.register(fd, select.POLLPRI | select.POLLERR)
+            self._notify_fds[fd] = index
+        if not self._watches and not self._notify_fds:
+            os.close(self._inotify_fd)
+            raise OSError("no backlight device could be watched")
+
+        self._wake_read, self._wake_write = os.pipe()
+        self._poll.register(self._wake_read, select.POLLIN)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="override-detector", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            events = self._poll.poll()
+            if self._stopped:
+                return
+            changed = set()
+            for fd, _ in events:
+                if fd == self._inotify_fd:
+                    changed.update(self._read_inotify())
+                elif fd in self._notify_fds:
+                    os.pread(fd, 32, 0)  # Re-arm the notification
+                    changed.add(self._notify_fds[fd])
+            for index in sorted(changed):
+                self._check(index)
+
+    def _read_inotify(self):
+        """Drain the inotify queue; return the display indices that were modified."""
+        indices = set()
+        try:
+            data = os.read(self._inotify_fd, 4096)
+        except BlockingIOError:
+            return indices
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size + length
+            if wd in self._watches:
+                indices.add(self._watches[wd])
+        return indices
+
+    def _check(self, index: int) -> None:
+        """Compare a device's level with Glimmer's own last write."""
+        device = self.backend.devices[index]
+        try:
+            raw = device.read_raw()
+        except (OSError, ValueError) as e:
+            print(f"Error reading brightness for override detection: {e}")
+            return
+        if device.is_own_write(raw):
+            return  # Our own write
+        self.overrides += 1
+        self.on_override(index, round(raw * 100 / device.max_brightness))
+        self._restart_timer()
+
+    def _restart_timer(self):
+        if self.on_timeout is None:
+            return
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.timeout, self._expired)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _expired(self):
+        with self._timer_lock:
+            self._timer = None
+        self.on_timeout()
+
+    def cancel_timeout(self) -> None:
+        """Forget a pending timeout, e.g. because the user resumed by hand."""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def stop(self) -> None:
+        """Stop watching and release the file descriptors."""
+        self.cancel_timeout()
+        self._stopped = True
+        os.write(self._wake_write, b"\0")
+        self._thread.join()
+        for fd in [self._inotify_fd, self._wake_read, self._wake_write, *self._notify_fds]:
+            os.close(fd)
+        self._notify_fds = {}
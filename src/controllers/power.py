@@ -0,0 +1,189 @@
+import ctypes
+import os
+import time
+from typing import Callable, Optional, Tuple
+from . import x11
+from .scheduler import AdaptiveScheduler
+
+POWER_SUPPLY = "/sys/class/power_supply"
+
+ACTIVE = "active"
+IDLE = "idle"
+LOCKED = "locked"
+
+
+class IdleDetector:
+    """Reads user idle time and screen saver state through MIT-SCREEN-SAVER."""
+
+    def __init__(self):
+        self._display = None
+        self._info = None
+        self._root = None
+        if not x11.display_available() or x11.xss() is None:
+            return
+        xlib = x11.xlib()
+        display = xlib.XOpenDisplay(None)
+        if not display:
+            return
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not x11.xss().XScreenSaverQueryExtension(
+                display, ctypes.byref(event_base), ctypes.byref(error_base)):
+            xlib.XCloseDisplay(display)
+            return
+        self._display = display
+        self._root = xlib.XRootWindow(display, xlib.XDefaultScreen(display))
+        self._info = x11.xss().XScreenSaverAllocInfo()
+
+    @property
+    def available(self) -> bool:
+        return self._display is not None
+
+    def query(self) -> Optional[Tuple[float, bool]]:
+        """Return (idle_seconds, screen_saver_active), or None if unavailable."""
+        if self._display is None:
+            return None
+        if not x11.xss().XScreenSaverQueryInfo(self._display, self._root, self._info):
+            return None
+        info = self._info.contents
+        return info.idle / 1000, info.state == x11.SCREEN_SAVER_ON
+
+    def close(self) -> None:
+        if self._display is not None:
+            x11.xlib().XFree(self._info)
+            x11.xlib().XCloseDisplay(self._display)
+            self._display = None
+
+
+def on_battery(root: str = POWER_SUPPLY) -> bool:
+    """
+    Return True if the system is running on battery.
+
+    Args:
+        root (str): power_supply directory; override to use a fake sysfs tree
+
+    Returns:
+        bool: False if any mains adapter is online or no battery is discharging
+    """
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return False
+    discharging = False
+    for name in names:
+        path = os.path.join(root, name)
+        try:
+            with open(os.path.join(path, "type")) as type_file:
+                supply_type = type_file.read().strip()
+            if supply_type == "Mains":
+                with open(os.path.join(path, "online")) as online_file:
+                    if online_file.read().strip() == "1":
+                        return False
+            elif supply_type == "Battery":
+                with open(os.path.join(path, "status")) as status_file:
+                    discharging |= status_file.read().strip() == "Discharging"
+        except OSError:
+            continue
+    return discharging
+
+
+class PowerMonitor:
+    """
+    Stretches the polling schedule when nothing on screen can change usefully.
+
+    While the user is idle the interval grows to idle_interval_ms, and while
+    the screen saver or locker is active ticks are skipped and checked only
+    every locked_interval_ms. On battery the scheduler's limits are
+    multiplied by low_power_factor.
+    """
+
+    def __init__(self, idle_threshold: float = 120.0, idle_interval_ms: int = 30000,
+                 locked_interval_ms: int = 60000, low_power_factor: float = 4.0,
+                 power_supply_root: str = POWER_SUPPLY, battery_check_interval: float = 60.0,
+                 idle_detector: Optional[IdleDetector] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the monitor.
+
+        Args:
+            idle_threshold (float): Seconds without input after which the user is idle
+            idle_interval_ms (int): Polling interval while idle
+            locked_interval_ms (int): Interval between lock checks while locked
+            low_power_factor (float): Multiplier for the scheduler limits on battery
+            power_supply_root (str): power_supply directory to read the battery state from
+            battery_check_interval (float): Seconds between battery state reads
+            idle_detector (IdleDetector, optional): Idle source; one is created
+                if omitted, and idle detection is off where X11 is unavailable
+            clock (callable): Monotonic time source in seconds
+
+        Raises:
+            ValueError: If a threshold, interval or factor is invalid
+        """
+        if idle_threshold <= 0 or idle_interval_ms <= 0 or locked_interval_ms <= 0 or low_power_factor < 1:
+            raise ValueError("Invalid power settings. Must be: thresholds and intervals > 0, factor >= 1")
+        self.idle_threshold = idle_threshold
+        self.idle_interval_ms = idle_interval_ms
+        self.locked_interval_ms = locked_interval_ms
+        self.low_power_factor = low_power_factor
+        self.power_supply_root = power_supply_root
+        self.battery_check_interval = battery_check_interval
+        self.idle_detector = idle_detector or IdleDetector()
+        self.clock = clock
+
+        self.battery = False
+        self._battery_checked = None
+        self._base_limits = None  # Scheduler limits before the low-power profile
+
+    def state(self) -> str:
+        """Return ACTIVE, IDLE or LOCKED."""
+        sample = self.idle_detector.query()
+        if sample is None:
+            return ACTIVE
+        idle_seconds, screen_saver_active = sample
+        if screen_saver_active:
+            return LOCKED
+        return IDLE if idle_seconds >= self.idle_threshold else ACTIVE
+
+    def _update_battery(self, scheduler: AdaptiveScheduler) -> None:
+        """Re-read the battery state now and then; switch the scheduler's limits on change."""
+        now = self.clock()
+        if self._battery_checked is not None and now - self._battery_checked < self.battery_check_interval:
+            return
+        self._battery_checked = now
+        battery = on_battery(self.power_supply_root)
+        if battery == self.battery:
+            return
+        self.battery = battery
+        if battery:
+            self._base_limits = (scheduler.min_interval_ms, scheduler.max_interval_ms)
+            scheduler.set_interval_limits(
+                int(scheduler.min_interval_ms * self.low_power_factor),
+                int(scheduler.max_interval_ms * self.low_power_factor)
+            )
+        elif self._base_limits is not None:
+            scheduler.set_interval_limits(*self._base_limits)
+            self._base_limits = None
+
+    def schedule(self, scheduler: AdaptiveScheduler, luminance: Optional[float],
+                 state: Optional[str] = None) -> int:
+        """
+        Feed a tick result to the scheduler and return the power-adjusted interval.
+
+        Args:
+            scheduler (AdaptiveScheduler): Scheduler driving the polling
+            luminance (float or None): Measured luminance, None if the tick was skipped
+            state (str, optional): State from state(), queried if omitted
+
+        Returns:
+            int: Milliseconds until the next tick
+        """
+        self._update_battery(scheduler)
+        interval = scheduler.update(luminance)
+        state = state or self.state()
+        if state == LOCKED:
+            return self.locked_interval_ms
+        if state == IDLE:
+            return max(interval, self.idle_interval_ms)
+        return interval
+
+    def close(self) -> None:
+        self.idle_detector.close()
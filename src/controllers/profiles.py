@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Callable, Optional
+
+PROFILE_VERSION = 1
+
+# Learned brightness of one application
+AppProfile = namedtuple("AppProfile", "luminance variance target samples")
+
+
+def default_profile_path() -> str:
+    """Return the profile file under $XDG_CONFIG_HOME (~/.config by default)."""
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(config_home, "glimmer", "app_profiles.json")
+
+
+class ProfileCache:
+    """
+    Least recently used map from application to its learned brightness.
+
+    Each profile keeps exponential moving averages of the measured luminance,
+    its variance and the applied target, so it follows slow changes such as
+    a switch between light and dark documents in the same application.
+    Profiles are persisted as JSON, written atomically and at most every
+    save_interval seconds.
+
+    Lookups and updates may come from different threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 32, smoothing: float = 0.2,
+                 min_samples: int = 3, save_interval: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache, loading the profile file if it exists.
+
+        Args:
+            path (str, optional): Profile file; None keeps profiles in memory only
+            capacity (int): Number of applications remembered
+            smoothing (float): Weight of a new sample in the moving averages (0-1]
+            min_samples (int): Samples needed before a profile is returned by get()
+            save_interval (float): Minimum seconds between writes of the profile file
+            clock (callable): Monotonic time source in seconds
+
+        Raises:
+            ValueError: If capacity, smoothing or min_samples is invalid
+        """
+        if capacity < 1 or not 0 < smoothing <= 1 or min_samples < 1:
+            raise ValueError("Invalid profile cache settings. Must be: capacity >= 1, "
+                             "0 < smoothing <= 1, min_samples >= 1")
+        self.path = path
+        self.capacity = capacity
+        self.smoothing = smoothing
+        self.min_samples = min_samples
+        self.save_interval = save_interval
+        self.clock = clock
+        self.profiles = OrderedDict()  # Application key -> AppProfile, least recently used first
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved = clock()
+        if path:
+            self.load()
+
+    def get(self, app: str) -> Optional[AppProfile]:
+        """Return an application's profile once it has enough samples, marking it recently used."""
+        with self._lock:
+            profile = self.profiles.get(app)
+            if profile is None or profile.samples < self.min_samples:
+                return None
+            self.profiles.move_to_end(app)
+            return profile
+
+    def learn(self, app: str, luminance: float, target: float) -> AppProfile:
+        """
+        Fold a measurement of the focused application into its profile.
+
+        Args:
+            app (str): Application key
+            luminance (float): Measured luminance (0-255)
+            target (float): Target brightness applied for it (0-100)
+
+        Returns:
+            AppProfile: The updated profile
+        """
+        with self._lock:
+            previous = self.profiles.pop(app, None)
+            if previous is None:
+                profile = AppProfile(luminance, 0.0, target, 1)
+            else:
+                alpha = self.smoothing
+                delta = luminance - previous.luminance
+                profile = AppProfile(
+                    previous.luminance + alpha * delta,
+                    (1 - alpha) * (previous.variance + alpha * delta * delta),
+                    previous.target + alpha * (target - previous.target),
+                    previous.samples + 1,
+                )
+            self.profiles[app] = profile
+            while len(self.profiles) > self.capacity:
+                self.profiles.popitem(last=False)
+            self._dirty = True
+        if self.path and self.clock() - self._saved >= self.save_interval:
+            self.save()
+        return profile
+
+    def forget(self, app: Optional[str] = None) -> None:
+        """Drop one application's profile, or all of them."""
+        with self._lock:
+            if app is None:
+                self.profiles.clear()
+            else:
+                self.profiles.pop(app, None)
+            self._dirty = True
+
+    def load(self) -> None:
+        """Replace the profiles with those in the profile file; a missing or invalid file is ignored."""
+        try:
+            with open(self.path) as profile_file:
+                data = json.load(profile_file)
+            if data.get("version") != PROFILE_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')}")
+            profiles = OrderedDict(
+                (str(app), AppProfile(float(luminance), float(variance), float(target), int(samples)))
+                for app, luminance, variance, target, samples in data["profiles"]
+            )
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error loading app profiles: {e}")
+            return
+        with self._lock:
+            self.profiles = profiles
+            while len(self.profiles) > self.capacity:
+                self.profiles.popitem(last=False)
+            self._dirty = False
+
+    def save(self) -> None:
+        """Write the profiles if they changed since the last save."""
+        with self._lock:
+            self._saved = self.clock()
+            if not self.path or not self._dirty:
+                return
+            rows = [[app, *profile] for app, profile in self.profiles.items()]
+            self._dirty = False
+        temporary = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(temporary, "w") as profile_file:
+                json.dump({"version": PROFILE_VERSION, "profiles": rows}, profile_file)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            self._dirty = True
+            print(f"Error saving app profiles: {e}")
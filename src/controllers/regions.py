@@ -0,0 +1,96 @@
+from typing import Callable, List, Optional, Sequence, Tuple
+
+Rect = Tuple[int, int, int, int]  # (x, y, width, height)
+
+REGION_MODES = ("full", "center", "active_window", "rects")
+
+
+def clip_rect(rect: Rect, screen_size: Tuple[int, int]) -> Optional[Rect]:
+    """
+    Clip a rectangle to the screen.
+
+    Args:
+        rect (tuple): (x, y, width, height)
+        screen_size (tuple): (width, height) of the captured desktop
+
+    Returns:
+        tuple or None: The clipped rectangle, or None if nothing is left
+    """
+    screen_width, screen_height = screen_size
+    x, y, width, height = rect
+    left, top = max(x, 0), max(y, 0)
+    right, bottom = min(x + width, screen_width), min(y + height, screen_height)
+    if right <= left or bottom <= top:
+        return None
+    return left, top, right - left, bottom - top
+
+
+class RegionSelector:
+    """
+    Chooses which parts of the desktop are captured and metered.
+
+    "full" captures everything. "center" captures a centered rectangle
+    covering center_fraction of each screen dimension. "active_window" follows
+    the focused window, falling back to the center crop when there is none.
+    "rects" captures a fixed list of rectangles, metered by area.
+    """
+
+    def __init__(self, mode: str = "full", center_fraction: float = 0.5,
+                 rects: Optional[Sequence[Rect]] = None,
+                 window_geometry: Optional[Callable[[], Optional[Rect]]] = None):
+        """
+        Initialize the selector.
+
+        Args:
+            mode (str): One of REGION_MODES
+            center_fraction (float): Size of the center crop relative to the screen (0-1]
+            rects (list, optional): (x, y, width, height) rectangles for "rects" mode
+            window_geometry (callable, optional): Returns the focused window's
+                rectangle or None; required for "active_window" mode
+
+        Raises:
+            ValueError: If the mode, fraction or rectangles are invalid
+        """
+        if mode not in REGION_MODES:
+            raise ValueError(f"Invalid region mode. Must be one of: {', '.join(REGION_MODES)}")
+        if not 0 < center_fraction <= 1:
+            raise ValueError("Invalid center fraction. Must be: 0 < fraction <= 1")
+        if mode == "rects" and not rects:
+            raise ValueError("Region mode 'rects' needs at least one rectangle")
+        if any(rect[2] <= 0 or rect[3] <= 0 for rect in rects or ()):
+            raise ValueError("Regions must have a positive width and height")
+        if mode == "active_window" and window_geometry is None:
+            raise ValueError("Region mode 'active_window' needs a window geometry source")
+
+        self.mode = mode
+        self.center_fraction = center_fraction
+        self.rects = [tuple(rect) for rect in rects or ()]
+        self.window_geometry = window_geometry
+
+    def center(self, screen_size: Tuple[int, int]) -> Rect:
+        screen_width, screen_height = screen_size
+        width = max(int(screen_width * self.center_fraction), 1)
+        height = max(int(screen_height * self.center_fraction), 1)
+        return (screen_width - width) // 2, (screen_height - height) // 2, width, height
+
+    def regions(self, screen_size: Tuple[int, int]) -> Optional[List[Rect]]:
+        """
+        Return the rectangles to capture on a screen of the given size.
+
+        Args:
+            screen_size (tuple): (width, height) of the captured desktop
+
+        Returns:
+            list or None: Clipped rectangles, or None to capture the whole desktop
+        """
+        if self.mode == "full":
+            return None
+        if self.mode == "center":
+            rects = [self.center(screen_size)]
+        elif self.mode == "active_window":
+            window = self.window_geometry()
+            rects = [window if window is not None else self.center(screen_size)]
+        else:
+            rects = self.rects
+        clipped = [rect for rect in (clip_rect(rect, screen_size) for rect in rects) if rect is not None]
+        return clipped or None
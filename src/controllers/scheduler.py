@@ -0,0 +1,86 @@
+from typing import Optional
+
+
+class AdaptiveScheduler:
+    """
+    Polling interval scheduler driven by how fast screen luminance changes.
+
+    A luminance jump drops the interval straight to the floor so busy
+    desktops react quickly. While luminance stays stable the interval grows
+    geometrically up to the ceiling, cutting idle CPU use and wakeups.
+    """
+
+    def __init__(self, min_interval_ms: int = 150, max_interval_ms: int = 4000,
+                 change_threshold: float = 4.0, backoff: float = 1.5):
+        """
+        Initialize the scheduler.
+
+        Args:
+            min_interval_ms (int): Floor interval used while luminance changes quickly
+            max_interval_ms (int): Ceiling interval used while luminance is stable
+            change_threshold (float): Luminance delta (0-255 scale) between two
+                samples that counts as a fast change
+            backoff (float): Factor the interval grows by per stable sample
+
+        Raises:
+            ValueError: If the limits or backoff factor are invalid
+        """
+        if backoff <= 1:
+            raise ValueError("Backoff factor must be greater than 1")
+        self.change_threshold = change_threshold
+        self.backoff = backoff
+        self.set_interval_limits(min_interval_ms, max_interval_ms)
+        self._last_luminance = None
+
+    def set_interval_limits(self, min_interval_ms: int, max_interval_ms: int) -> None:
+        """
+        Set the floor and ceiling polling intervals.
+
+        Args:
+            min_interval_ms (int): Floor interval in milliseconds (> 0)
+            max_interval_ms (int): Ceiling interval in milliseconds (>= floor)
+
+        Raises:
+            ValueError: If the limits are invalid or min > max
+        """
+        if not 0 < min_interval_ms <= max_interval_ms:
+            raise ValueError("Invalid polling limits. Must be: 0 < min <= max")
+
+        self.min_interval_ms = min_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.interval_ms = min_interval_ms
+
+    def update(self, luminance: Optional[float]) -> int:
+        """
+        Feed a new luminance sample and compute the next polling interval.
+
+        Args:
+            luminance (float or None): Measured average luminance (0-255), or
+                None if the measurement failed
+
+        Returns:
+            int: Interval in milliseconds until the next sample
+        """
+        if luminance is None:
+            return self.interval_ms
+
+        if self._last_luminance is not None:
+            delta = abs(luminance - self._last_luminance)
+            if delta >= self.change_threshold:
+                self.interval_ms = self.min_interval_ms
+            elif delta < self.change_threshold / 2:
+                self.interval_ms = min(int(self.interval_ms * self.backoff + 0.5), self.max_interval_ms)
+            # Moderate changes keep the current interval
+
+        self._last_luminance = luminance
+        return self.interval_ms
+
+    def reset(self) -> None:
+        """Return to the floor interval and forget the last sample."""
+        self.interval_ms = self.min_interval_ms
+        self._last_luminance = None
+
+    @property
+    def rate_hz(self) -> float:
+        """Current sampling rate in ticks per second."""
+        return 1000.0 / self.interval_ms
@@ -0,0 +1,174 @@
+import time
+import numpy as np
+from typing import Callable, Optional, Tuple
+from .buffers import BufferPool
+from .luminance import luma_weights
+
+
+class TileAnalyzer:
+    """
+    Incremental mean-luma analyzer that only re-reduces changed screen tiles.
+
+    The frame is split into square tiles and the luma sum of every tile is
+    cached. Each call compares a sparse grid of sample pixels with the
+    previous frame to find changed tiles, recomputes only those, and derives
+    the global mean from the cached sums.
+
+    Reductions write into scratch buffers from a BufferPool, so analyzing
+    same-sized frames allocates nothing but a few tile-sized arrays.
+    """
+
+    def __init__(self, tile_size: int = 128, sample_stride: int = 16,
+                 full_refresh_seconds: float = 5.0, pool: Optional[BufferPool] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the analyzer.
+
+        Args:
+            tile_size (int): Tile edge length in pixels
+            sample_stride (int): Spacing of the fingerprint sample grid; must
+                divide tile_size so every tile owns the same sample positions
+            full_refresh_seconds (float): Recompute every tile when this many
+                seconds have passed since the last full pass, bounding how long
+                a change between sample points can go unnoticed however slowly
+                frames arrive (0 disables the refresh)
+            pool (BufferPool, optional): Source of scratch buffers; may be
+                shared with other analyzers used from the same thread
+            clock (callable): Monotonic time source in seconds
+
+        Raises:
+            ValueError: If the tile size or sample stride is invalid
+        """
+        if tile_size < 1 or sample_stride < 1 or tile_size % sample_stride:
+            raise ValueError("Sample stride must be a positive divisor of the tile size")
+
+        self.tile_size = tile_size
+        self.sample_stride = sample_stride
+        self.full_refresh_seconds = full_refresh_seconds
+        self.clock = clock
+        self.pool = pool if pool is not None else BufferPool()
+        # Per-tile channel sums fit in 32 bits unless tiles are huge
+        self._sum_dtype = np.uint32 if tile_size * tile_size * 255 < 2 ** 32 else np.uint64
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all cached tile sums so the next frame is fully analyzed."""
+        self._layout = None
+        self._tile_sums = None
+        self._samples = None
+        self._refreshed_at = None  # clock() at the last full pass
+        self.mean = None
+
+    def _prepare(self, frame: np.ndarray, channels: str):
+        height, width = frame.shape[:2]
+        self._layout = (frame.shape, channels)
+        self._weights = luma_weights(channels)
+        self._row_starts = np.arange(0, height, self.tile_size)
+        self._col_starts = np.arange(0, width, self.tile_size)
+        # NaN so the first full pass counts every tile as changed, even all-black ones
+        self._tile_sums = np.full((len(self._row_starts), len(self._col_starts)), np.nan)
+        self._pixels = height * width
+
+        # Sample positions relative to the tile grid
+        samples_per_tile = self.tile_size // self.sample_stride
+        offset = self.sample_stride // 2
+        self._sample_rows = slice(offset, None, self.sample_stride)
+        self._sample_cols = slice(offset, None, self.sample_stride)
+        sampled_height = len(range(height)[self._sample_rows])
+        sampled_width = len(range(width)[self._sample_cols])
+        self._sample_row_starts = np.arange(0, sampled_height, samples_per_tile)
+        self._sample_col_starts = np.arange(0, sampled_width, samples_per_tile)
+        # Private copy of the sample grid; the frame may be reused
+        self._samples = np.empty((sampled_height, sampled_width, frame.shape[2]), dtype=frame.dtype)
+
+    def _changed_tiles(self, samples: np.ndarray) -> np.ndarray:
+        """Boolean tile mask of tiles whose sample pixels differ from the last frame."""
+        if samples.shape[0] == 0 or samples.shape[1] == 0:
+            return np.zeros(self._tile_sums.shape, dtype=bool)
+        pool = self.pool
+        differs = np.not_equal(samples, self._samples, out=pool.get("tiles_differs", samples.shape, bool))
+        changed = np.any(differs, axis=2, out=pool.get("tiles_changed", samples.shape[:2], bool))
+        per_row = np.add.reduceat(
+            changed, self._sample_row_starts, axis=0, dtype=np.uint32,
+            out=pool.get("tiles_changed_rows", (len(self._sample_row_starts), changed.shape[1]), np.uint32)
+        )
+        per_tile = np.add.reduceat(
+            per_row, self._sample_col_starts, axis=1,
+            out=pool.get("tiles_changed_tiles", (per_row.shape[0], len(self._sample_col_starts)), np.uint32)
+        )
+        mask = np.zeros(self._tile_sums.shape, dtype=bool)
+        mask[:per_tile.shape[0], :per_tile.shape[1]] = per_tile > 0
+        return mask
+
+    def _reduce_all(self, frame: np.ndarray) -> int:
+        """Recompute every tile sum and return how many of them changed."""
+        shape = self._tile_sums.shape
+        channels = frame.shape[2]
+        # Sum every band of tile rows down its columns, then the columns of every
+        # tile; reduceat over the frame itself would first widen a full copy of it
+        columns = self.pool.get("tiles_columns", (shape[0], frame.shape[1], channels), np.uint32)
+        for band, start in enumerate(self._row_starts):
+            np.sum(frame[start:start + self.tile_size], axis=0, dtype=np.uint32, out=columns[band])
+        tiles = np.add.reduceat(
+            columns, self._col_starts, axis=1, dtype=self._sum_dtype,
+            out=self.pool.get("tiles_channels", shape + (channels,), self._sum_dtype)
+        )
+        sums = np.dot(tiles, self._weights, out=self.pool.get("tiles_sums", shape, np.float64))
+        changed_count = int(np.count_nonzero(sums != self._tile_sums))
+        np.copyto(self._tile_sums, sums)
+        return changed_count
+
+    def _reduce_tile(self, frame: np.ndarray, row: int, col: int) -> None:
+        y, x = row * self.tile_size, col * self.tile_size
+        tile = frame[y:y + self.tile_size, x:x + self.tile_size]
+        total = 0.0
+        for index, weight in enumerate(self._weights):
+            if weight:
+                total += weight * int(tile[..., index].sum(dtype=np.uint64))
+        self._tile_sums[row, col] = total
+
+    def analyze(self, frame: np.ndarray, channels: str = "RGB") -> Tuple[float, int]:
+        """
+        Update the cached tile sums from a new frame.
+
+        Args:
+            frame (np.ndarray): HxWxC uint8 frame
+            channels (str): Channel order of the frame
+
+        Returns:
+            tuple: (mean_luma, changed_tiles)
+            - mean_luma (float): Mean luma of the whole frame (0-255)
+            - changed_tiles (int): Number of tiles that were recomputed;
+              zero means the frame was unchanged and no reduction ran
+        """
+        if frame.shape[0] == 0 or frame.shape[1] == 0:
+            raise ValueError("Cannot compute luminance of an empty frame")
+
+        if self._layout != (frame.shape, channels):
+            self._prepare(frame, channels)
+            self.mean = None
+            full_refresh = True
+        else:
+            full_refresh = bool(self.full_refresh_seconds
+                                and self.clock() - self._refreshed_at >= self.full_refresh_seconds)
+
+        samples = frame[self._sample_rows, self._sample_cols]
+        changed = None if full_refresh else self._changed_tiles(samples)
+
+        if changed is None:
+            changed_count = self._reduce_all(frame)
+            self._refreshed_at = self.clock()
+        else:
+            changed_count = int(changed.sum())
+            if changed_count > changed.size // 4:
+                # Vectorized reduction is cheaper than many small slices
+                self._reduce_all(frame)
+                self._refreshed_at = self.clock()
+            else:
+                for row, col in zip(*np.nonzero(changed)):
+                    self._reduce_tile(frame, row, col)
+
+        np.copyto(self._samples, samples)
+        if changed_count or self.mean is None:
+            self.mean = float(self._tile_sums.sum()) / self._pixels
+        return self.mean, changed_count
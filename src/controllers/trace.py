@@ -0,0 +1,354 @@
+import mmap
+import os
+import struct
+import time
+import numpy as np
+from collections import namedtuple
+from typing import Callable, Optional, Tuple
+from .capture import CaptureBackend, SyntheticCaptureBackend
+from .luminance import INTEGER_LUMA_WEIGHTS
+
+# File layout: a 16 byte header followed by fixed-size little-endian records,
+# so a trace can be appended to cheaply and indexed directly through mmap.
+MAGIC = b"GLMTRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sHHH2x")  # magic, version, thumbnail width, thumbnail height
+RECORD = struct.Struct("<dfBBBBBxxx")  # timestamp, luminance, sensitivity, max, min, display, flags
+ALL_DISPLAYS = 255
+HAS_THUMBNAIL = 1
+
+TraceSample = namedtuple(
+    "TraceSample",
+    "timestamp luminance sensitivity max_brightness min_brightness display thumbnail"
+)
+
+
+def make_thumbnail(frame: np.ndarray, size: Tuple[int, int], channels: str = "RGB") -> np.ndarray:
+    """
+    Downsample a frame to a small 8-bit luma thumbnail by striding.
+
+    Args:
+        frame (np.ndarray): HxWxC uint8 frame
+        size (tuple): (width, height) of the thumbnail
+        channels (str): Channel order of the frame
+
+    Returns:
+        np.ndarray: height x width uint8 luma, zero-padded if the frame is smaller
+    """
+    width, height = size
+    step_y = max(frame.shape[0] // height, 1)
+    step_x = max(frame.shape[1] // width, 1)
+    sample = frame[::step_y, ::step_x][:height, :width]
+
+    luma = np.zeros(sample.shape[:2], dtype=np.uint16)
+    for index, channel in enumerate(channels):
+        weight = INTEGER_LUMA_WEIGHTS.get(channel)
+        if weight:
+            luma += sample[..., index].astype(np.uint16) * weight
+    thumbnail = np.zeros((height, width), dtype=np.uint8)
+    thumbnail[:luma.shape[0], :luma.shape[1]] = luma >> 8
+    return thumbnail
+
+
+class TraceRecorder:
+    """Appends per-tick control samples to a compact binary trace file."""
+
+    def __init__(self, path: str, thumbnail_size: Optional[Tuple[int, int]] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Open a trace file for appending, creating it if needed.
+
+        Args:
+            path (str): Trace file path
+            thumbnail_size (tuple, optional): (width, height) of the luma
+                thumbnails stored with every sample; None stores none
+            clock (callable): Time source for sample timestamps
+
+        Raises:
+            ValueError: If an existing file is not a trace or uses another thumbnail size
+        """
+        self.thumbnail_size = tuple(thumbnail_size) if thumbnail_size else (0, 0)
+        self.clock = clock
+        self.samples = 0
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, "rb") as trace_file:
+                _, width, height = _read_header(trace_file.read(HEADER.size))
+            if (width, height) != self.thumbnail_size:
+                raise ValueError(f"{path} stores {width}x{height} thumbnails")
+            # Drop a torn last record so appended samples stay aligned
+            record_size = RECORD.size + width * height
+            size = os.path.getsize(path)
+            torn = (size - HEADER.size) % record_size
+            if torn:
+                os.truncate(path, size - torn)
+        self._file = open(path, "ab")
+        if not exists:
+            self._file.write(HEADER.pack(MAGIC, VERSION, *self.thumbnail_size))
+
+    def record(self, luminance: Optional[float], sensitivity: float, max_brightness: int,
+               min_brightness: int, display: Optional[int] = None,
+               thumbnail: Optional[np.ndarray] = None) -> None:
+        """
+        Append one sample.
+
+        Args:
+            luminance (float or None): Measured luminance (0-255); None if capture failed
+            sensitivity (float): Sensitivity in effect (1-10)
+            max_brightness (int): Maximum brightness limit (0-100)
+            min_brightness (int): Minimum brightness limit (0-100)
+            display (int, optional): Display index, None for all displays
+            thumbnail (np.ndarray, optional): Luma thumbnail of the configured size
+        """
+        width, height = self.thumbnail_size
+        flags = HAS_THUMBNAIL if thumbnail is not None and width else 0
+        self._file.write(RECORD.pack(
+            self.clock(), float("nan") if luminance is None else luminance,
+            int(round(sensitivity)), max_brightness, min_brightness,
+            ALL_DISPLAYS if display is None else display, flags
+        ))
+        if width:
+            if flags:
+                self._file.write(np.ascontiguousarray(thumbnail, dtype=np.uint8).tobytes())
+            else:
+                self._file.write(bytes(width * height))
+        self.samples += 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _read_header(data: bytes) -> Tuple[int, int, int]:
+    if len(data) < HEADER.size:
+        raise ValueError("Not a Glimmer trace: file too short")
+    magic, version, width, height = HEADER.unpack(data[:HEADER.size])
+    if magic != MAGIC:
+        raise ValueError("Not a Glimmer trace: bad magic")
+    if version != VERSION:
+        raise ValueError(f"Unsupported trace version {version}")
+    return version, width, height
+
+
+class TraceReader:
+    """
+    Memory-mapped, random-access view of a trace file.
+
+    Samples are exposed through a NumPy structured array over the mapping,
+    so even long traces are read without loading them into memory.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map a trace file.
+
+        Args:
+            path (str): Trace file path
+
+        Raises:
+            ValueError: If the file is not a valid trace
+        """
+        self._file = open(path, "rb")
+        _, width, height = _read_header(self._file.read(HEADER.size))
+        self.thumbnail_size = (width, height)
+
+        fields = [
+            ("timestamp", "<f8"), ("luminance", "<f4"), ("sensitivity", "u1"),
+            ("max_brightness", "u1"), ("min_brightness", "u1"), ("display", "u1"),
+            ("flags", "u1"), ("pad", "V3"),
+        ]
+        if width:
+            fields.append(("thumbnail", "u1", (height, width)))
+        self.dtype = np.dtype(fields)
+
+        size = os.fstat(self._file.fileno()).st_size
+        count = (size - HEADER.size) // self.dtype.itemsize  # Ignore a torn last record
+        self._mmap = None
+        if count:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.records = np.frombuffer(self._mmap, self.dtype, count, HEADER.size)
+        else:
+            self.records = np.zeros(0, self.dtype)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> TraceSample:
+        record = self.records[index]
+        luminance = float(record["luminance"])
+        thumbnail = None
+        if self.thumbnail_size[0] and record["flags"] & HAS_THUMBNAIL:
+            thumbnail = record["thumbnail"]
+        return TraceSample(
+            float(record["timestamp"]), None if luminance != luminance else luminance,
+            int(record["sensitivity"]), int(record["max_brightness"]), int(record["min_brightness"]),
+            None if record["display"] == ALL_DISPLAYS else int(record["display"]), thumbnail
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self) -> None:
+        """
+        Release the mapping.
+
+        Thumbnails returned by indexing are views into the mapping; if any
+        are still referenced, the mapping is freed once they are dropped.
+        """
+        self.records = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+        self._file.close()
+
+
+class FakeClock:
+    """Manually advanced clock for deterministic replays."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance_to(self, timestamp: float) -> None:
+        self.now = max(self.now, timestamp)
+
+
+class RecordingBrightnessBackend:
+    """Brightness backend that records writes against a clock instead of touching hardware."""
+
+    def __init__(self, clock: Callable[[], float], initial: int = 50):
+        self.clock = clock
+        self.values = {None: initial}
+        self.writes = []  # (timestamp, display, value)
+
+    def set_brightness(self, value, display=None):
+        self.writes.append((self.clock(), display, value))
+        if display is None:
+            for key in self.values:
+                self.values[key] = value
+        self.values[display] = value
+
+    def get_brightness(self, display=None):
+        return [self.values.get(display, self.values[None])]
+
+
+class ThumbnailCaptureBackend(CaptureBackend):
+    """Capture backend that replays trace thumbnails as gray RGB frames."""
+
+    name = "trace"
+    channels = "RGB"
+
+    def __init__(self):
+        self.thumbnail = None
+
+    def grab(self) -> np.ndarray:
+        if self.thumbnail is None:
+            raise RuntimeError("sample has no thumbnail")
+        return np.repeat(self.thumbnail[..., None], 3, axis=2)
+
+
+def replay(reader: TraceReader, configure: Optional[Callable] = None,
+           reanalyze: bool = False) -> dict:
+    """
+    Feed a trace through a fresh BrightnessController as fast as possible.
+
+    Time is driven by a fake clock that jumps to each sample's timestamp, so
+    the write filter's rate cap behaves exactly as it did live. Transitions
+    and writer threads are disabled so every target is applied synchronously.
+
+    Args:
+        reader (TraceReader): Trace to replay
+        configure (callable, optional): Called with the controller before the
+            replay to apply the settings under test
+        reanalyze (bool): Re-run analysis on the stored thumbnails instead of
+            using the recorded luminance (requires a trace with thumbnails);
+            incremental analysis is turned off for this
+
+    Returns:
+        dict: Replay statistics: samples, writes issued and suppressed,
+        brightness direction reversals (pumping), mean absolute error between
+        the ideal and applied brightness, and the mean time for the applied
+        brightness to settle after the ideal target moved.
+    """
+    from .brightness_controller import BrightnessController
+
+    clock = FakeClock(reader[0].timestamp if len(reader) else 0.0)
+    backend = RecordingBrightnessBackend(clock)
+    capture = ThumbnailCaptureBackend() if reanalyze else SyntheticCaptureBackend(width=1, height=1)
+    controller = BrightnessController(capture, backend)
+    controller.write_filter.clock = clock
+    if configure is not None:
+        configure(controller)
+    if reanalyze:
+        # Thumbnails are smaller than one sample stride, so tiles would never
+        # see a change, and their refresh interval runs on the wall clock
+        controller.set_incremental(False)
+    controller.set_transition(0)
+    controller.async_writes = False
+
+    errors = []
+    settle_times = []
+    pending_since = None
+    last_written = backend.values[None]
+    last_direction = 0
+    reversals = 0
+    started = time.perf_counter()
+    for sample in reader:
+        clock.advance_to(sample.timestamp)
+        writes_before = len(backend.writes)
+        if reanalyze:
+            capture.thumbnail = sample.thumbnail
+            luminance = controller.adjust_brightness(
+                sample.sensitivity, sample.max_brightness, sample.min_brightness
+            )[0] if sample.thumbnail is not None else None
+        else:
+            luminance = sample.luminance
+            controller.apply_luminance(
+                luminance, sample.sensitivity, sample.max_brightness,
+                sample.min_brightness, sample.display
+            )
+        if luminance is None:
+            continue
+
+        ideal = controller.calculate_target_brightness(luminance, sample.sensitivity)
+        ideal = min(max(ideal, sample.min_brightness), sample.max_brightness)
+        applied = backend.get_brightness(sample.display)[0]
+        error = abs(ideal - applied)
+        errors.append(error)
+
+        for _, _, value in backend.writes[writes_before:]:
+            direction = (value > last_written) - (value < last_written)
+            if direction and last_direction and direction != last_direction:
+                reversals += 1
+            if direction:
+                last_direction = direction
+            last_written = value
+
+        # Settling: time from the ideal target moving away until it is matched again
+        if error > controller.write_filter.hysteresis:
+            if pending_since is None:
+                pending_since = sample.timestamp
+        elif pending_since is not None:
+            settle_times.append(sample.timestamp - pending_since)
+            pending_since = None
+
+    controller.close()
+    return {
+        "samples": len(reader),
+        "replay_seconds": round(time.perf_counter() - started, 4),
+        "trace_seconds": round(reader[-1].timestamp - reader[0].timestamp, 3) if len(reader) else 0.0,
+        "writes_issued": controller.write_filter.writes_issued,
+        "writes_suppressed": dict(controller.write_filter.writes_suppressed),
+        "reversals": reversals,
+        "mean_abs_error": round(sum(errors) / len(errors), 3) if errors else None,
+        "mean_settle_seconds": round(sum(settle_times) / len(settle_times), 3) if settle_times else 0.0,
+        "unsettled": pending_since is not None,
+    }
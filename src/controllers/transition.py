@@ -0,0 +1,151 @@
+import threading
+import time
+from typing import Callable, Optional
+
+EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1 - (1 - t) * (1 - t),
+    "ease_in_out": lambda t: t * t * (3 - 2 * t),
+}
+
+
+class TransitionEngine:
+    """
+    Ramps display brightness towards a target on a background thread.
+
+    set_target() returns immediately. A new target arriving mid-ramp starts
+    a fresh ramp from the value currently on screen, so targets are never
+    queued. Steps are paced by the measured write latency: fast backlight
+    writes give fine steps, and slow DDC/CI monitors get fewer, larger ones.
+    """
+
+    def __init__(self, write: Callable[[int], None], duration: float = 0.6,
+                 easing: str = "ease_in_out", read: Optional[Callable[[], int]] = None,
+                 min_step_interval: float = 1 / 60, clock: Callable[[], float] = time.monotonic,
+                 on_error: Optional[Callable[[int, Exception], None]] = None):
+        """
+        Initialize the transition engine and start its thread.
+
+        Args:
+            write (callable): Writes one brightness value (0-100) to the display
+            duration (float): Length of a full ramp in seconds
+            easing (str): Easing curve name, one of EASINGS
+            read (callable, optional): Reads the current brightness, used once
+                to find the starting point of the first ramp
+            min_step_interval (float): Shortest time between two steps in seconds
+            clock (callable): Monotonic time source in seconds
+            on_error (callable, optional): Called with the value and exception
+                when a step fails and the ramp is abandoned; errors are
+                printed if omitted
+
+        Raises:
+            ValueError: If the duration is negative or the easing is unknown
+        """
+        if duration < 0:
+            raise ValueError("Transition duration must not be negative")
+        if easing not in EASINGS:
+            raise ValueError(f"Invalid easing. Must be one of: {', '.join(EASINGS)}")
+
+        self.write = write
+        self.read = read
+        self.on_error = on_error
+        self.duration = duration
+        self.easing = easing
+        self.min_step_interval = min_step_interval
+        self.clock = clock
+
+        self.current = None  # Value last written to the display
+        self.target = None
+        self.steps_written = 0
+        self.write_latency = 0.0  # Moving average of write duration in seconds
+
+        self._start_value = None
+        self._start_time = 0.0
+        self._synced = 0  # Bumped by sync() so an in-flight step does not clobber it
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="brightness-transition", daemon=True)
+        self._thread.start()
+
+    def set_target(self, target: int) -> None:
+        """
+        Start ramping towards a new target, replacing any ramp in progress.
+
+        Args:
+            target (int): Target brightness (0-100)
+        """
+        with self._condition:
+            if self.current is None and self.read is not None:
+                try:
+                    self.current = self.read()
+                except Exception as e:
+                    print(f"Error reading brightness for transition: {e}")
+            self.target = target
+            self._start_value = self.current
+            self._start_time = self.clock()
+            self._condition.notify()
+
+    def sync(self, value: int) -> None:
+        """
+        Cancel any ramp and record a value written to the display elsewhere.
+
+        Args:
+            value (int): Brightness now shown on the display (0-100)
+        """
+        with self._condition:
+            self.current = value
+            self.target = value
+            self._start_value = value
+            self._synced += 1
+
+    def stop(self) -> None:
+        """Stop the transition thread, leaving the display at its current value."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _next_value(self, now: float) -> int:
+        """Value on the ramp at the given time."""
+        if self._start_value is None or self.duration == 0:
+            return self.target
+        progress = min((now - self._start_time) / self.duration, 1.0)
+        eased = EASINGS[self.easing](progress)
+        return round(self._start_value + (self.target - self._start_value) * eased)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped and (self.target is None or self.target == self.current):
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                value = self._next_value(self.clock())
+                synced = self._synced
+
+            if value != self.current:
+                started = time.perf_counter()
+                try:
+                    self.write(value)
+                except Exception as e:
+                    with self._condition:
+                        # Give up on this ramp; the next target starts a new one
+                        self.target = self.current
+                    if self.on_error is not None:
+                        self.on_error(value, e)
+                    else:
+                        print(f"Error during brightness transition: {e}")
+                    continue
+                elapsed = time.perf_counter() - started
+                self.write_latency = elapsed if not self.steps_written else \
+                    0.8 * self.write_latency + 0.2 * elapsed
+                with self._condition:
+                    if synced == self._synced:
+                        self.current = value
+                self.steps_written += 1
+
+            # Pace steps by how fast the backend accepts writes
+            with self._condition:
+                if not self._stopped and self.target != self.current:
+                    self._condition.wait(max(self.min_step_interval, self.write_latency))
@@ -0,0 +1,182 @@
+import ctypes
+import os
+import select
+import threading
+from typing import Callable, Optional, Tuple
+from . import x11
+
+
+class ActiveWindowTracker:
+    """
+    Looks up the focused window through the EWMH _NET_ACTIVE_WINDOW property.
+
+    Uses its own X connection, so it can be queried from any single thread.
+    On systems without X11 every query returns None.
+    """
+
+    def __init__(self):
+        self._display = None
+        if not x11.display_available():
+            return
+        self._xlib = x11.xlib()
+        display = self._xlib.XOpenDisplay(None)
+        if not display:
+            return
+        x11.install_error_handler()
+        self._display = display
+        self._root = self._xlib.XRootWindow(display, self._xlib.XDefaultScreen(display))
+        self._active_atom = self._xlib.XInternAtom(display, b"_NET_ACTIVE_WINDOW", 0)
+        self._name_atom = self._xlib.XInternAtom(display, b"_NET_WM_NAME", 0)
+        self._utf8_atom = self._xlib.XInternAtom(display, b"UTF8_STRING", 0)
+
+    @property
+    def available(self) -> bool:
+        return self._display is not None
+
+    def active_window(self) -> Optional[int]:
+        """Return the X id of the focused window, or None."""
+        if self._display is None:
+            return None
+        prop = x11.get_property(self._display, self._root, self._active_atom, x11.XA_WINDOW, 1)
+        if prop is None:
+            return None
+        window = ctypes.c_ulong.from_buffer_copy(prop[2]).value
+        return window or None
+
+    def geometry(self) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Return the focused window's (x, y, width, height) in root coordinates.
+
+        Returns:
+            tuple or None: Geometry, or None if there is no focused window or it
+            disappeared while being queried
+        """
+        window = self.active_window()
+        if window is None:
+            return None
+        errors = x11.error_count()
+        root = ctypes.c_ulong()
+        x, y = ctypes.c_int(), ctypes.c_int()
+        width, height, border, depth = ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint()
+        if not self._xlib.XGetGeometry(
+                self._display, window, ctypes.byref(root), ctypes.byref(x), ctypes.byref(y),
+                ctypes.byref(width), ctypes.byref(height), ctypes.byref(border), ctypes.byref(depth)):
+            return None
+        root_x, root_y, child = ctypes.c_int(), ctypes.c_int(), ctypes.c_ulong()
+        if not self._xlib.XTranslateCoordinates(
+                self._display, window, self._root, 0, 0,
+                ctypes.byref(root_x), ctypes.byref(root_y), ctypes.byref(child)):
+            return None
+        if x11.error_count() != errors:
+            return None
+        return root_x.value, root_y.value, width.value, height.value
+
+    def identity(self, window: Optional[int] = None) -> Optional[Tuple[str, str]]:
+        """
+        Return the (class, title) of a window, by default the focused one.
+
+        The class is the second WM_CLASS string, e.g. "firefox"; the title
+        comes from _NET_WM_NAME, falling back to WM_NAME. Either may be "".
+
+        Returns:
+            tuple or None: (class, title), or None if there is no such window
+        """
+        window = window or self.active_window()
+        if window is None:
+            return None
+        errors = x11.error_count()
+        wm_class = x11.get_property(self._display, window, x11.XA_WM_CLASS, x11.XA_STRING, 64)
+        title = (x11.get_property(self._display, window, self._name_atom, self._utf8_atom, 256)
+                 or x11.get_property(self._display, window, x11.XA_WM_NAME, x11.XA_STRING, 256))
+        if x11.error_count() != errors:
+            return None
+        names = wm_class[2].split(b"\0") if wm_class else []
+        class_name = names[1] if len(names) > 1 else b""
+        return (class_name.decode("utf-8", "replace"),
+                title[2].decode("utf-8", "replace") if title else "")
+
+    def close(self) -> None:
+        if self._display is not None:
+            self._xlib.XCloseDisplay(self._display)
+            self._display = None
+
+
+class FocusWatcher:
+    """
+    Reports focus changes between applications as they happen.
+
+    A background thread selects PropertyNotify on the root window and sleeps
+    in poll() on the X connection, waking when the window manager updates
+    _NET_ACTIVE_WINDOW. Applications are identified by their window class,
+    or by their title if they set no class; on_change is only called when
+    the identity differs from the previous one.
+    """
+
+    def __init__(self, on_change: Callable[[Optional[str]], None]):
+        """
+        Start watching.
+
+        Args:
+            on_change (callable): Called from the watcher thread with the new
+                application key, or None when no window has focus
+
+        Raises:
+            OSError: If X11 is unavailable
+        """
+        self.tracker = ActiveWindowTracker()
+        if not self.tracker.available:
+            raise OSError("X11 display is not available")
+        self.on_change = on_change
+        self.app = self._current_app()
+
+        xlib, display = self.tracker._xlib, self.tracker._display
+        xlib.XSelectInput(display, self.tracker._root, x11.PROPERTY_CHANGE_MASK)
+        xlib.XSync(display, 0)
+        self._wake_read, self._wake_write = os.pipe()
+        self._poll = select.poll()
+        self._poll.register(xlib.XConnectionNumber(display), select.POLLIN)
+        self._poll.register(self._wake_read, select.POLLIN)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="focus-watcher", daemon=True)
+        self._thread.start()
+
+    def _current_app(self) -> Optional[str]:
+        identity = self.tracker.identity()
+        if identity is None:
+            return None
+        class_name, title = identity
+        return class_name or title or None
+
+    def _run(self):
+        xlib, display = self.tracker._xlib, self.tracker._display
+        event = x11.XEvent()
+        while True:
+            focus_changed = False
+            # Drain everything Xlib has queued; poll() only sees unread socket data
+            while xlib.XPending(display):
+                xlib.XNextEvent(display, ctypes.byref(event))
+                if (event.type == x11.PROPERTY_NOTIFY
+                        and event.xproperty.atom == self.tracker._active_atom):
+                    focus_changed = True
+            if focus_changed:
+                try:
+                    app = self._current_app()
+                    if app != self.app:
+                        self.app = app
+                        self.on_change(app)
+                except Exception as e:
+                    # Keep tracking focus; one bad event must not end the watcher
+                    print(f"Error handling focus change: {e}")
+                continue
+            self._poll.poll()
+            if self._stopped:
+                return
+
+    def stop(self) -> None:
+        """Stop watching and close the X connection."""
+        self._stopped = True
+        os.write(self._wake_write, b"\0")
+        self._thread.join()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+        self.tracker.close()
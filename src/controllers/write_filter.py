@@ -0,0 +1,108 @@
+import time
+from collections import deque
+from typing import Callable, Hashable, Optional
+
+DUPLICATE = "duplicate"
+HYSTERESIS = "hysteresis"
+RATE_LIMIT = "rate_limit"
+
+
+class WriteFilter:
+    """
+    Decides which brightness writes actually reach the display.
+
+    Every display has its own cache of the last applied value. A write is
+    suppressed if it repeats that value, moves less than the hysteresis band,
+    or would exceed the per-minute write cap. Counters record writes issued
+    and writes suppressed, grouped by reason.
+    """
+
+    def __init__(self, hysteresis: int = 2, max_writes_per_minute: int = 30,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the write filter.
+
+        Args:
+            hysteresis (int): Minimum change in percentage points before a new
+                value is written (values of 0 and 1 only suppress duplicates)
+            max_writes_per_minute (int): Cap on writes per display in any
+                60 second window (0 disables the cap)
+            clock (callable): Monotonic time source in seconds
+
+        Raises:
+            ValueError: If the hysteresis or rate cap is negative
+        """
+        if hysteresis < 0 or max_writes_per_minute < 0:
+            raise ValueError("Hysteresis and write rate cap must not be negative")
+
+        self.hysteresis = hysteresis
+        self.max_writes_per_minute = max_writes_per_minute
+        self.clock = clock
+        self._last_values = {}
+        self._write_times = {}
+        self.writes_issued = 0
+        self.writes_suppressed = {DUPLICATE: 0, HYSTERESIS: 0, RATE_LIMIT: 0}
+
+    def check(self, value: int, display: Hashable = None) -> Optional[str]:
+        """
+        Decide whether a value should be written to a display.
+
+        Args:
+            value (int): Brightness value about to be written (0-100)
+            display (hashable, optional): Display identifier, None for all displays
+
+        Returns:
+            str or None: None if the write should go ahead, otherwise the
+            suppression reason ("duplicate", "hysteresis" or "rate_limit").
+            Suppressions are counted; allowed writes are counted by record().
+        """
+        reason = None
+        last = self._last_values.get(display)
+        if last is not None:
+            if value == last:
+                reason = DUPLICATE
+            elif abs(value - last) < self.hysteresis:
+                reason = HYSTERESIS
+
+        if reason is None and self.max_writes_per_minute:
+            times = self._write_times.get(display)
+            if times:
+                cutoff = self.clock() - 60.0
+                while times and times[0] <= cutoff:
+                    times.popleft()
+                if len(times) >= self.max_writes_per_minute:
+                    reason = RATE_LIMIT
+
+        if reason is not None:
+            self.writes_suppressed[reason] += 1
+        return reason
+
+    def record(self, value: int, display: Hashable = None) -> None:
+        """
+        Record a value that was written to a display.
+
+        Args:
+            value (int): Brightness value written (0-100)
+            display (hashable, optional): Display identifier, None for all displays
+        """
+        self._last_values[display] = value
+        self._write_times.setdefault(display, deque()).append(self.clock())
+        self.writes_issued += 1
+
+    def invalidate(self, display: Hashable = None) -> None:
+        """
+        Forget the cached value of a display so the next write always goes out.
+
+        Args:
+            display (hashable, optional): Display identifier, None for all displays
+        """
+        self._last_values.pop(display, None)
+
+    def last_value(self, display: Hashable = None) -> Optional[int]:
+        """Return the last value written to a display, or None if unknown."""
+        return self._last_values.get(display)
+
+    @property
+    def total_suppressed(self) -> int:
+        """Number of writes suppressed for any reason."""
+        return sum(self.writes_suppressed.values())
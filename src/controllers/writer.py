@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class AsyncWriter:
+    """
+    Writes brightness to one display on a background thread, latest value wins.
+
+    submit() drops the value into a single-slot mailbox and returns at once.
+    If the previous value has not been picked up yet it is replaced and
+    counted as dropped, so a slow DDC/CI monitor only ever receives the
+    newest target instead of working through a backlog.
+    """
+
+    def __init__(self, write: Callable[[int], None],
+                 on_error: Optional[Callable[[int, Exception], None]] = None,
+                 name: str = "brightness-writer"):
+        """
+        Initialize the writer and start its thread.
+
+        Args:
+            write (callable): Writes one brightness value (0-100) to the display
+            on_error (callable, optional): Called with the value and exception
+                when a write fails
+            name (str): Thread name
+        """
+        self.write = write
+        self.on_error = on_error
+
+        self.writes = 0  # Completed writes
+        self.dropped = 0  # Values replaced before they were written
+        self.failures = 0
+        self.last_latency = 0.0  # Duration of the last write in seconds
+        self.write_latency = 0.0  # Moving average of write duration in seconds
+
+        self._pending = None
+        self._busy = False
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, value: int) -> None:
+        """
+        Queue a value for writing, replacing any value not yet written.
+
+        Args:
+            value (int): Brightness (0-100)
+        """
+        with self._condition:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = value
+            self._condition.notify()
+
+    def cancel(self) -> None:
+        """Discard the pending value, e.g. after a manual write."""
+        with self._condition:
+            self._pending = None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the pending value, if any, has been written.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait
+
+        Returns:
+            bool: True if the writer is idle
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._busy, timeout
+            )
+
+    def stop(self) -> None:
+        """Stop the writer thread after any write in progress; pending values are dropped."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped and self._pending is None:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                value, self._pending = self._pending, None
+                self._busy = True
+
+            started = time.perf_counter()
+            try:
+                self.write(value)
+            except Exception as e:
+                self.failures += 1
+                if self.on_error is not None:
+                    self.on_error(value, e)
+            else:
+                elapsed = time.perf_counter() - started
+                self.last_latency = elapsed
+                self.write_latency = elapsed if not self.writes else \
+                    0.8 * self.write_latency + 0.2 * elapsed
+                self.writes += 1
+
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
@@ -0,0 +1,328 @@
+"""
+Minimal ctypes bindings for the parts of Xlib and MIT-SHM used by Glimmer.
+
+Only the handful of calls needed for shared-memory screen capture, idle
+detection (MIT-SCREEN-SAVER) and following the active window are bound.
+All loading happens lazily, so importing this module never fails on systems
+without X11.
+"""
+import ctypes
+import ctypes.util
+import os
+
+ZPIXMAP = 2
+ALL_PLANES = ctypes.c_ulong(-1).value
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+LSB_FIRST = 0
+XA_STRING = 31
+XA_WM_NAME = 39
+XA_WINDOW = 33
+XA_WM_CLASS = 67
+PROPERTY_NOTIFY = 28
+PROPERTY_CHANGE_MASK = 1 << 22
+SUCCESS = 0
+SCREEN_SAVER_ON = 1  # XScreenSaverInfo.state while the screen saver or locker is active
+
+
+class XImage(ctypes.Structure):
+    """Leading fields of Xlib's XImage structure."""
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+    ]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    """Xlib's XShmSegmentInfo structure."""
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class XScreenSaverInfo(ctypes.Structure):
+    """libXss's XScreenSaverInfo structure."""
+    _fields_ = [
+        ("window", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+        ("kind", ctypes.c_int),
+        ("til_or_since", ctypes.c_ulong),
+        ("idle", ctypes.c_ulong),
+        ("eventMask", ctypes.c_ulong),
+    ]
+
+
+class XPropertyEvent(ctypes.Structure):
+    """Xlib's XPropertyEvent structure."""
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("window", ctypes.c_ulong),
+        ("atom", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+    ]
+
+
+class XEvent(ctypes.Union):
+    """Xlib's XEvent union, padded to its full size."""
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("xproperty", XPropertyEvent),
+        ("pad", ctypes.c_long * 24),
+    ]
+
+
+X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+_libs = {}
+
+
+def _load(name: str):
+    """Load and cache a shared library by its short name, or return None."""
+    if name not in _libs:
+        path = ctypes.util.find_library(name)
+        try:
+            _libs[name] = ctypes.CDLL(path, use_errno=True) if path else None
+        except OSError:
+            _libs[name] = None
+    return _libs[name]
+
+
+def xlib():
+    """
+    Return libX11 with argument and return types declared.
+
+    Returns:
+        ctypes.CDLL or None: The library, or None if it is not installed.
+    """
+    lib = _load("X11")
+    if lib is None or getattr(lib, "_glimmer_ready", False):
+        return lib
+
+    lib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    lib.XOpenDisplay.restype = ctypes.c_void_p
+    lib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    lib.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    lib.XDefaultScreen.restype = ctypes.c_int
+    lib.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XRootWindow.restype = ctypes.c_ulong
+    lib.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XDefaultVisual.restype = ctypes.c_void_p
+    lib.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XDefaultDepth.restype = ctypes.c_int
+    lib.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XDisplayWidth.restype = ctypes.c_int
+    lib.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XDisplayHeight.restype = ctypes.c_int
+    lib.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.XFree.argtypes = [ctypes.c_void_p]
+    lib.XSetErrorHandler.argtypes = [X_ERROR_HANDLER]
+    lib.XSetErrorHandler.restype = ctypes.c_void_p
+    lib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+    lib.XInternAtom.restype = ctypes.c_ulong
+    lib.XGetWindowProperty.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_long, ctypes.c_long,
+        ctypes.c_int, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_void_p),
+    ]
+    lib.XGetWindowProperty.restype = ctypes.c_int
+    lib.XGetGeometry.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_uint), ctypes.POINTER(ctypes.c_uint),
+        ctypes.POINTER(ctypes.c_uint), ctypes.POINTER(ctypes.c_uint),
+    ]
+    lib.XGetGeometry.restype = ctypes.c_int
+    lib.XTranslateCoordinates.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong),
+    ]
+    lib.XTranslateCoordinates.restype = ctypes.c_int
+    lib.XSelectInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_long]
+    lib.XPending.argtypes = [ctypes.c_void_p]
+    lib.XPending.restype = ctypes.c_int
+    lib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.POINTER(XEvent)]
+    lib.XConnectionNumber.argtypes = [ctypes.c_void_p]
+    lib.XConnectionNumber.restype = ctypes.c_int
+    lib._glimmer_ready = True
+    return lib
+
+
+def xext():
+    """
+    Return libXext with the MIT-SHM entry points declared.
+
+    Returns:
+        ctypes.CDLL or None: The library, or None if it is not installed.
+    """
+    lib = _load("Xext")
+    if lib is None or getattr(lib, "_glimmer_ready", False):
+        return lib
+
+    lib.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+    lib.XShmQueryExtension.restype = ctypes.c_int
+    lib.XShmCreateImage.argtypes = [
+        ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+        ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint,
+    ]
+    lib.XShmCreateImage.restype = ctypes.POINTER(XImage)
+    lib.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+    lib.XShmAttach.restype = ctypes.c_int
+    lib.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+    lib.XShmDetach.restype = ctypes.c_int
+    lib.XShmGetImage.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XImage),
+        ctypes.c_int, ctypes.c_int, ctypes.c_ulong,
+    ]
+    lib.XShmGetImage.restype = ctypes.c_int
+    lib._glimmer_ready = True
+    return lib
+
+
+def xss():
+    """
+    Return libXss with the MIT-SCREEN-SAVER query declared.
+
+    Returns:
+        ctypes.CDLL or None: The library, or None if it is not installed.
+    """
+    lib = _load("Xss")
+    if lib is None or getattr(lib, "_glimmer_ready", False):
+        return lib
+
+    lib.XScreenSaverQueryExtension.argtypes = [
+        ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+    ]
+    lib.XScreenSaverQueryExtension.restype = ctypes.c_int
+    lib.XScreenSaverAllocInfo.argtypes = []
+    lib.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+    lib.XScreenSaverQueryInfo.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo),
+    ]
+    lib.XScreenSaverQueryInfo.restype = ctypes.c_int
+    lib._glimmer_ready = True
+    return lib
+
+
+def libc():
+    """
+    Return libc with the System V shared memory calls declared.
+
+    Returns:
+        ctypes.CDLL or None: The library, or None if it cannot be loaded.
+    """
+    lib = _load("c")
+    if lib is None or getattr(lib, "_glimmer_ready", False):
+        return lib
+
+    lib.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+    lib.shmget.restype = ctypes.c_int
+    lib.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    lib.shmat.restype = ctypes.c_void_p
+    lib.shmdt.argtypes = [ctypes.c_void_p]
+    lib.shmdt.restype = ctypes.c_int
+    lib.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+    lib.shmctl.restype = ctypes.c_int
+    lib._glimmer_ready = True
+    return lib
+
+
+_error_state = {"count": 0}
+
+
+@X_ERROR_HANDLER
+def _record_error(display, event):
+    # Xlib's default handler terminates the process; count the error instead
+    _error_state["count"] += 1
+    return 0
+
+
+def install_error_handler() -> None:
+    """Replace Xlib's fatal default error handler with a counting one."""
+    xlib().XSetErrorHandler(_record_error)
+
+
+def error_count() -> int:
+    """Return the number of X protocol errors seen since startup."""
+    return _error_state["count"]
+
+
+def display_available() -> bool:
+    """Return True if an X display is configured and libX11 can be loaded."""
+    return bool(os.environ.get("DISPLAY")) and xlib() is not None
+
+
+def get_property(display, window: int, atom: int, req_type: int, length: int = 1024):
+    """
+    Read a window property.
+
+    Args:
+        display: X display connection
+        window (int): Window to read from
+        atom (int): Property atom
+        req_type (int): Expected type atom
+        length (int): Maximum length in 32-bit units
+
+    Returns:
+        tuple or None: (format, item count, bytes) or None if the property is missing.
+        Format-32 items are C longs, as in Xlib.
+    """
+    lib = xlib()
+    actual_type = ctypes.c_ulong()
+    actual_format = ctypes.c_int()
+    count = ctypes.c_ulong()
+    remaining = ctypes.c_ulong()
+    data = ctypes.c_void_p()
+    status = lib.XGetWindowProperty(
+        display, window, atom, 0, length, 0, req_type, ctypes.byref(actual_type),
+        ctypes.byref(actual_format), ctypes.byref(count), ctypes.byref(remaining), ctypes.byref(data)
+    )
+    if status != SUCCESS or not data.value:
+        return None
+    try:
+        if not count.value:
+            return None
+        unit = {8: 1, 16: ctypes.sizeof(ctypes.c_short), 32: ctypes.sizeof(ctypes.c_long)}[actual_format.value]
+        return actual_format.value, count.value, ctypes.string_at(data.value, count.value * unit)
+    finally:
+        lib.XFree(data)
+
+
+def channel_order(image: XImage) -> str:
+    """
+    Derive the byte order of a 32-bit pixel from an XImage's colour masks.
+
+    Args:
+        image (XImage): Image returned by the X server
+
+    Returns:
+        str: Four-character channel string such as "BGRX".
+    """
+    channels = ["X"] * 4
+    for name, mask in (("R", image.red_mask), ("G", image.green_mask), ("B", image.blue_mask)):
+        byte = (mask.bit_length() - 8) // 8
+        if image.byte_order != LSB_FIRST:
+            byte = 3 - byte
+        channels[byte] = name
+    return "".join(channels)
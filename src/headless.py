@@ -0,0 +1,293 @@
+# headless.py
+"""
+Headless Glimmer: runs the brightness control loop without PyQt5.
+
+Usage:
+    python src/headless.py [--config glimmer.json] [options]
+    python -m src [--config glimmer.json] [options]
+    python src/headless.py --replay trace.glt [options]
+
+Settings are read from an optional JSON config file and overridden by
+command line options. Keys in the config file use the option names with
+underscores, e.g. {"sensitivity": 6, "max_interval_ms": 8000}. Displays can
+be listed as {"displays": [{"index": 0, "region": [0, 0, 1920, 1080]}]}, and
+capture rectangles for --capture-region rects as {"capture_rects": [[x, y, w, h]]}.
+
+With --record every tick is appended to a binary trace. --replay feeds a
+trace through the configured controller against a fake clock and display,
+then prints write counts and stability statistics as JSON.
+"""
+import argparse
+import json
+import signal
+import sys
+from controllers.brightness_controller import BrightnessController
+from controllers.capture import CAPTURE_BACKENDS, probe_capture_backend
+from controllers.displays import Display
+from controllers.loop import ControlLoop
+from controllers.metrics import MetricsExporter
+from controllers.power import PowerMonitor
+from controllers.scheduler import AdaptiveScheduler
+
+DEFAULTS = {
+    "sensitivity": 7,
+    "max_brightness": 80,
+    "min_brightness": 20,
+    "capture_backend": None,
+    "capture_region": "full",
+    "center_fraction": 0.5,
+    "capture_rects": [],
+    "estimator": "strided",
+    "sampling_factor": 4,
+    "metering": "mean",
+    "percentile": 50.0,
+    "trim": 0.05,
+    "incremental": True,
+    "analysis_process": False,
+    "memory_ceiling_mb": 64,
+    "transition": 0.6,
+    "max_backoff": 300.0,
+    "min_interval_ms": 150,
+    "max_interval_ms": 4000,
+    "power_aware": True,
+    "idle_threshold": 120.0,
+    "override_timeout": 300.0,
+    "app_profiles": True,
+    "app_profiles_file": None,
+    "control_api": True,
+    "control_socket": None,
+    "ticks": None,
+    "verbose": False,
+    "displays": [],
+    "metrics_port": None,
+    "metrics_file": None,
+    "record": None,
+    "record_thumbnail": None,
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run Glimmer's automatic brightness control without a UI."
+    )
+    parser.add_argument("--config", help="JSON file with settings (command line options take precedence)")
+    parser.add_argument("--sensitivity", type=float, help="adjustment sensitivity (1-10)")
+    parser.add_argument("--max-brightness", type=int, help="maximum brightness (0-100)")
+    parser.add_argument("--min-brightness", type=int, help="minimum brightness (0-100)")
+    parser.add_argument("--capture-backend", choices=sorted(CAPTURE_BACKENDS),
+                        help="screen capture backend (probed if omitted)")
+    parser.add_argument("--capture-region", choices=["full", "center", "active_window", "rects"],
+                        help="part of the desktop to capture and meter")
+    parser.add_argument("--center-fraction", type=float,
+                        help="size of the center crop relative to the screen (0-1]")
+    parser.add_argument("--estimator", choices=["exact", "strided"], help="luminance estimator")
+    parser.add_argument("--sampling-factor", type=int, help="pixel stride of the strided estimator")
+    parser.add_argument("--metering", choices=["mean", "linear", "percentile", "trimmed"],
+                        help="how luminance is derived from the frame")
+    parser.add_argument("--percentile", type=float, help="percentile used by --metering percentile")
+    parser.add_argument("--trim", type=float, help="fraction trimmed from each end by --metering trimmed")
+    parser.add_argument("--incremental", action=argparse.BooleanOptionalAction,
+                        help="only re-analyze screen tiles that changed")
+    parser.add_argument("--analysis-process", action=argparse.BooleanOptionalAction,
+                        help="analyze frames in a separate process over shared memory")
+    parser.add_argument("--memory-ceiling-mb", type=float,
+                        help="ceiling on memory held by reusable analysis buffers")
+    parser.add_argument("--transition", type=float, help="brightness ramp duration in seconds (0 to jump)")
+    parser.add_argument("--max-backoff", type=float,
+                        help="longest wait in seconds before retrying a failing capture backend or display")
+    parser.add_argument("--min-interval-ms", type=int, help="fastest polling interval")
+    parser.add_argument("--max-interval-ms", type=int, help="slowest polling interval")
+    parser.add_argument("--power-aware", action=argparse.BooleanOptionalAction,
+                        help="poll less while idle, locked or on battery")
+    parser.add_argument("--idle-threshold", type=float, help="seconds without input before backing off")
+    parser.add_argument("--override-timeout", type=float,
+                        help="pause after a manual brightness change for this many seconds (0 disables)")
+    parser.add_argument("--app-profiles", action=argparse.BooleanOptionalAction,
+                        help="learn each application's brightness and apply it on focus changes (X11)")
+    parser.add_argument("--app-profiles-file",
+                        help="where learned app profiles are kept (default ~/.config/glimmer/app_profiles.json)")
+    parser.add_argument("--control-api", action=argparse.BooleanOptionalAction,
+                        help="accept commands on a local Unix socket")
+    parser.add_argument("--control-socket",
+                        help="control socket path (default $XDG_RUNTIME_DIR/glimmer.sock)")
+    parser.add_argument("--metrics-port", type=int, help="serve metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", help="write metrics to this file (.json for JSON, else Prometheus text)")
+    parser.add_argument("--record", help="append every tick to this trace file")
+    parser.add_argument("--record-thumbnail", metavar="WxH",
+                        help="store WxH luma thumbnails in the trace, e.g. 32x18")
+    parser.add_argument("--replay", metavar="TRACE", help="replay a trace offline and print statistics")
+    parser.add_argument("--reanalyze", action="store_true",
+                        help="with --replay, re-run analysis on the trace thumbnails")
+    parser.add_argument("--ticks", type=int, help="exit after this many ticks")
+    parser.add_argument("--verbose", action=argparse.BooleanOptionalAction, help="print every tick")
+    return parser.parse_args(argv)
+
+
+def load_settings(args):
+    """Merge defaults, the config file and command line options."""
+    settings = dict(DEFAULTS)
+    if args.config:
+        with open(args.config) as config_file:
+            config = json.load(config_file)
+        unknown = set(config) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown settings in {args.config}: {', '.join(sorted(unknown))}")
+        settings.update(config)
+    for key, value in vars(args).items():
+        if key not in ("config", "replay", "reanalyze") and value is not None:
+            settings[key] = value
+    return settings
+
+
+def parse_size(text):
+    """Parse a "WxH" size."""
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid size {text!r}. Must be: WIDTHxHEIGHT")
+    if not (0 < width <= 255 and 0 < height <= 255):
+        raise ValueError(f"Invalid size {text!r}. Must be: 1-255 x 1-255")
+    return width, height
+
+
+def configure_controller(controller, settings):
+    """Apply analysis, transition and display settings to a controller."""
+    controller.set_estimator(settings["estimator"], settings["sampling_factor"])
+    controller.set_metering(settings["metering"], settings["percentile"], settings["trim"])
+    controller.set_incremental(settings["incremental"])
+    controller.set_capture_region(
+        settings["capture_region"], settings["center_fraction"],
+        [tuple(rect) for rect in settings["capture_rects"]]
+    )
+    controller.set_memory_ceiling(int(settings["memory_ceiling_mb"] * 1024 * 1024))
+    controller.set_analysis_process(settings["analysis_process"])
+    controller.set_transition(settings["transition"])
+    controller.set_backoff(max_delay=settings["max_backoff"])
+    controller.set_displays([
+        Display(
+            display["index"],
+            region=tuple(display["region"]) if display.get("region") else None,
+            max_brightness=display.get("max_brightness"),
+            min_brightness=display.get("min_brightness"),
+            sensitivity=display.get("sensitivity"),
+            name=display.get("name"),
+        )
+        for display in settings["displays"]
+    ])
+
+
+def build_controller(settings):
+    """Create a BrightnessController configured from settings."""
+    controller = BrightnessController(probe_capture_backend(settings["capture_backend"]))
+    configure_controller(controller, settings)
+    if settings["override_timeout"]:
+        try:
+            controller.start_override_detection(settings["override_timeout"])
+        except ValueError:
+            controller.close()
+            raise
+        except Exception as e:
+            # Probing the brightness backend can fail; control works without override detection
+            print(f"glimmer: override detection disabled: {e}", file=sys.stderr)
+    if settings["app_profiles"]:
+        controller.start_app_profiles(settings["app_profiles_file"])
+    if settings["record"]:
+        thumbnail = settings["record_thumbnail"]
+        try:
+            controller.start_recording(settings["record"], parse_size(thumbnail) if thumbnail else None)
+        except (OSError, ValueError):
+            controller.close()
+            raise
+    return controller
+
+
+def replay_trace(path, settings, reanalyze=False):
+    """Replay a trace with the configured analysis and write settings; print the statistics."""
+    from controllers.trace import TraceReader, replay
+    reader = TraceReader(path)
+    try:
+        if not len(reader):
+            raise ValueError(f"{path} contains no samples")
+        if reanalyze and not reader.thumbnail_size[0]:
+            raise ValueError(f"{path} has no thumbnails to re-analyze")
+        stats = replay(reader, lambda controller: configure_controller(controller, settings), reanalyze)
+    finally:
+        reader.close()
+    print(json.dumps(stats, indent=2))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.replay:
+        try:
+            replay_trace(args.replay, load_settings(args), args.reanalyze)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"glimmer: {e}", file=sys.stderr)
+            return 2
+        return 0
+
+    try:
+        settings = load_settings(args)
+        controller = build_controller(settings)
+        scheduler = AdaptiveScheduler(settings["min_interval_ms"], settings["max_interval_ms"])
+        power = PowerMonitor(settings["idle_threshold"]) if settings["power_aware"] else None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"glimmer: {e}", file=sys.stderr)
+        return 2
+
+    def report(avg_brightness, target_brightness, interval):
+        print(
+            f"Average Brightness: {avg_brightness:.2f}  "
+            f"Adjusted Brightness: {target_brightness:.2f}%  "
+            f"Next tick: {interval} ms"
+            + (f"  Health: {controller.health.summary()}" if controller.health.unhealthy() else ""),
+            flush=True
+        )
+
+    try:
+        loop = ControlLoop(
+            controller, scheduler, settings["sensitivity"],
+            settings["max_brightness"], settings["min_brightness"],
+            on_tick=report if settings["verbose"] else None, power=power
+        )
+    except ValueError as e:
+        controller.close()
+        print(f"glimmer: {e}", file=sys.stderr)
+        return 2
+
+    exporter = None
+    if settings["metrics_port"] is not None or settings["metrics_file"]:
+        try:
+            exporter = MetricsExporter(
+                controller.metrics, settings["metrics_port"], settings["metrics_file"]
+            )
+        except OSError as e:
+            controller.close()
+            print(f"glimmer: cannot export metrics: {e}", file=sys.stderr)
+            return 2
+
+    server = None
+    if settings["control_api"]:
+        from controllers.control_api import ControlHost, ControlServer
+        try:
+            server = ControlServer(ControlHost(controller, loop), settings["control_socket"])
+        except OSError as e:
+            print(f"glimmer: control API disabled: {e}", file=sys.stderr)
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: loop.stop())
+    try:
+        loop.run(settings["ticks"])
+    finally:
+        if server is not None:
+            server.close()
+        if exporter is not None:
+            exporter.close()
+        if power is not None:
+            power.close()
+        controller.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,21 @@
 # main.py
+import time
+STARTED = time.perf_counter()  # Startup timings are measured from here, before the Qt imports
+
+import argparse
 from PyQt5.QtWidgets import QApplication
 import sys
 from ui import UI
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    main_window = UI()
-    main_window.show()
+    parser = argparse.ArgumentParser(description="Glimmer automatic brightness control.")
+    parser.add_argument("--minimized", action="store_true",
+                        help="start in the system tray; the window is built when first opened")
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    main_window = UI(started=STARTED)
+    if args.minimized:
+        main_window.show_in_tray()
+    else:
+        main_window.show()
     sys.exit(app.exec_())
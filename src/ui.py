@@ -1,25 +1,116 @@
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QDesktopWidget, QSystemTrayIcon, QMessageBox
-from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QDesktopWidget, QSystemTrayIcon, QMessageBox
+from PyQt5.QtCore import QTimer, pyqtSignal
+import concurrent.futures
+import os
 import sys
 from PyQt5.QtCore import Qt
 from controllers.brightness_controller import BrightnessController
+from controllers.brightness_worker import BrightnessWorker
+from controllers.control_api import ControlHost, ControlServer
+from controllers.displays import Display
+from controllers.metrics import MetricsExporter
+from controllers.power import LOCKED, PowerMonitor
+from controllers.scheduler import AdaptiveScheduler
 from components import TitleSection, ButtonSection, SliderSection, StatusSection
 from utils.window_manager import WindowManager
 from utils.styles import StyleManager
 
+class UIControlHost(ControlHost):
+    """Runs control API commands on the GUI thread against the window's settings."""
+
+    def __init__(self, ui):
+        super().__init__(ui.brightness_controller)
+        self.ui = ui
+
+    def call(self, function, *args):
+        future = concurrent.futures.Future()
+
+        def run():
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function(*args))
+                except Exception as e:
+                    future.set_exception(e)
+
+        self.ui.control_requested.emit(run)
+        return future
+
+    def set_brightness(self, value):
+        if not self.ui.brightness_controller.paused:
+            self.ui.pause_automatic_control()
+        self.ui.set_manual_brightness(value)
+        self.ui.sync_widgets()
+
+    def limits(self):
+        return self.ui.max_brightness, self.ui.min_brightness
+
+    def set_limits(self, max_brightness, min_brightness):
+        self.ui.set_limits(max_brightness, min_brightness)
+
+    def sensitivity(self):
+        return self.ui.sensitivity
+
+    def set_sensitivity(self, value):
+        super().set_sensitivity(value)
+        self.ui.sensitivity = round(value)
+        self.ui.sync_widgets()
+
+    def pause(self):
+        if not self.ui.brightness_controller.paused:
+            self.ui.pause_automatic_control()
+
+    def resume(self):
+        if self.ui.brightness_controller.paused:
+            self.ui.resume_automatic_control()
+
+
 class UI(QMainWindow):
     THEMES = {
         "Outdoor": (100, 50),
         "Indoor": (50, 10)
     }
+    OVERRIDE_TIMEOUT = 300  # Seconds after a manual brightness change before auto mode resumes
+
+    # Emitted from the override detector thread; delivered on the GUI thread
+    override_changed = pyqtSignal(bool)
+    # Control API commands, queued from the server thread to the GUI thread
+    control_requested = pyqtSignal(object)
+
+    def __init__(self, started=None):
+        """
+        Start brightness control and the tray icon; the window's widgets are
+        built the first time it is shown.
 
-    def __init__(self):
+        Args:
+            started (float, optional): time.perf_counter() at process start,
+                the reference for the startup timings
+        """
         super().__init__()
+        self.central_widget = None  # Built by init_ui() on first show
         self.setWindowTitle("Glimmer")
         self.setFixedSize(500, 600)
         self.center()
         self.theme = "Indoor"
+        # Settings shown by the sliders, kept here so ticks run without them
+        self.sensitivity = 7
+        self.max_brightness = 80
+        self.min_brightness = 20
+        self.manual_brightness = 80
         self.brightness_controller = BrightnessController()
+        if started is not None:
+            self.brightness_controller.started_at = started
+        self.brightness_controller.set_incremental(True)
+        self.brightness_controller.set_transition(0.6)
+        self.brightness_controller.set_displays(self.detect_displays())
+        self.scheduler = AdaptiveScheduler()
+        self.power_monitor = PowerMonitor()
+        self.power_state = None
+        self.last_tick = None  # (average, target, interval) shown when the window is restored
+        self.brightness_worker = BrightnessWorker(self.brightness_controller)
+        QApplication.instance().aboutToQuit.connect(self.brightness_worker.stop)
+        QApplication.instance().aboutToQuit.connect(self.brightness_controller.close)
+        QApplication.instance().aboutToQuit.connect(self.power_monitor.close)
+        self.metrics_exporter = self.start_metrics_export()
         
         # Check if system tray is available
         if not QSystemTrayIcon.isSystemTrayAvailable():
@@ -30,17 +121,106 @@ class UI(QMainWindow):
         # Initialize window manager before UI components
         self.window_manager = WindowManager(self)
         
-        self.init_ui()
+        # Deliver tick results from the worker thread to the GUI thread
+        self.brightness_worker.tick_finished.connect(
+            self.on_tick_finished, Qt.QueuedConnection
+        )
+
+        # Set up timer; the scheduler adapts its interval after every tick.
+        # The first tick runs as soon as the event loop starts.
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.update_brightness)
+        self.timer.start(self.scheduler.interval_ms)
+        QTimer.singleShot(0, self.update_brightness)
+        
+        # Pause when brightness keys or another tool change the backlight.
+        # Deferred so probing the brightness backend does not delay the window.
+        self.override_changed.connect(self.on_override_changed)
+        QTimer.singleShot(0, lambda: self.brightness_controller.start_override_detection(
+            self.OVERRIDE_TIMEOUT, self.override_changed.emit
+        ))
+        # Apply each application's learned brightness as soon as it gets focus
+        QTimer.singleShot(0, self.brightness_controller.start_app_profiles)
+        self.control_server = None
+        self.control_requested.connect(lambda run: run())
+        QTimer.singleShot(0, self.start_control_api)
         
         # Set window flags to keep it above others when restored
         self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
 
+    def detect_displays(self):
+        # Control each monitor separately when more than one is connected.
+        # Screens are matched to brightness backend indices by their order,
+        # which is only trusted when both list the same number of displays.
+        screens = QApplication.screens()
+        if len(screens) < 2:
+            return []
+        backend_count = self.brightness_controller.display_count()
+        if backend_count != len(screens):
+            print(f"Controlling all displays together: {len(screens)} screens but "
+                  f"{'unknown' if backend_count is None else backend_count} brightness controls")
+            return []
+        origin_x = min(screen.geometry().x() for screen in screens)
+        origin_y = min(screen.geometry().y() for screen in screens)
+        displays = []
+        for index, screen in enumerate(screens):
+            geometry = screen.geometry()
+            ratio = screen.devicePixelRatio()
+            displays.append(Display(
+                index,
+                region=(
+                    int((geometry.x() - origin_x) * ratio), int((geometry.y() - origin_y) * ratio),
+                    int(geometry.width() * ratio), int(geometry.height() * ratio)
+                ),
+                name=screen.name()
+            ))
+        for display in displays:
+            print(f"{display.name} {display.region} -> brightness display {display.index}")
+        return displays
+
+    def start_metrics_export(self):
+        # Optional fleet scraping: GLIMMER_METRICS_PORT serves on localhost,
+        # GLIMMER_METRICS_FILE writes JSON (.json) or Prometheus text.
+        port = os.environ.get("GLIMMER_METRICS_PORT")
+        path = os.environ.get("GLIMMER_METRICS_FILE")
+        if not port and not path:
+            return None
+        try:
+            exporter = MetricsExporter(
+                self.brightness_controller.metrics, int(port) if port else None, path
+            )
+        except (OSError, ValueError) as e:
+            print(f"Error starting metrics export: {e}")
+            return None
+        QApplication.instance().aboutToQuit.connect(exporter.close)
+        return exporter
+
+    def start_control_api(self):
+        # Let scripts and hotkey daemons drive this instance over a local socket
+        try:
+            self.control_server = ControlServer(UIControlHost(self))
+        except OSError as e:
+            print(f"Error starting control API: {e}")
+            return
+        QApplication.instance().aboutToQuit.connect(self.control_server.close)
+
     def center(self):
         qr = self.frameGeometry()
         cp = QDesktopWidget().availableGeometry().center()
         qr.moveCenter(cp)
         self.move(qr.topLeft())
 
+    def setVisible(self, visible):
+        # Tray-first startup: only build the widgets once they are needed
+        if visible and self.central_widget is None:
+            self.init_ui()
+        super().setVisible(visible)
+
+    def show_in_tray(self):
+        # Start without the window; it is built on the first restore
+        self.window_manager.show_tray()
+        self.brightness_controller.mark_startup("tray")
+
     def init_ui(self):
         # Set up main layout
         self.central_widget = QWidget()
@@ -59,13 +239,40 @@ class UI(QMainWindow):
         self.layout.addLayout(self.slider_section.layout)
         self.layout.addLayout(self.status_section.layout)
 
-        # Set up timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_brightness)
-        self.timer.start(1000)
-
         # Apply styles
         self.setStyleSheet(StyleManager.get_theme_styles())
+        self.sync_widgets()
+
+    def sync_widgets(self):
+        # Show the current settings and pause state, if the widgets exist yet
+        if self.central_widget is None:
+            return
+        sliders = self.slider_section
+        for slider, value in (
+            (sliders.sensitivity_slider, self.sensitivity),
+            (sliders.max_brightness_slider, self.max_brightness),
+            (sliders.min_brightness_slider, self.min_brightness),
+            (sliders.manual_brightness_slider, self.manual_brightness),
+        ):
+            slider.blockSignals(True)  # Reflect the value without writing it back
+            slider.setValue(value)
+            slider.blockSignals(False)
+        paused = self.brightness_controller.paused
+        self.button_section.pause_button.setText("Resume" if paused else "Pause")
+        self._toggle_slider_visibility(not paused)
+
+    def on_settings_changed(self, _value=None):
+        sliders = self.slider_section
+        self.sensitivity = sliders.sensitivity_slider.value()
+        self.max_brightness = sliders.max_brightness_slider.value()
+        self.min_brightness = sliders.min_brightness_slider.value()
+
+    def showEvent(self, event):
+        # Status is not updated while hidden; catch up with the latest tick
+        super().showEvent(event)
+        self.brightness_controller.mark_startup("window")
+        if self.last_tick is not None:
+            self.refresh_status(*self.last_tick)
 
     def closeEvent(self, event):
         event.ignore()
@@ -73,21 +280,49 @@ class UI(QMainWindow):
 
     def set_theme(self, theme):
         self.theme = theme
-        max_brightness, min_brightness = self.THEMES[theme]
-        self.slider_section.max_brightness_slider.setValue(max_brightness)
-        self.slider_section.min_brightness_slider.setValue(min_brightness)
+        self.set_limits(*self.THEMES[theme])
+
+    def set_limits(self, max_brightness, min_brightness):
         self.brightness_controller.set_brightness_limits(max_brightness, min_brightness)
+        self.max_brightness = max_brightness
+        self.min_brightness = min_brightness
+        self.sync_widgets()
 
     def update_brightness(self):
-        avg_brightness, target_brightness = self.brightness_controller.adjust_brightness(
-            sensitivity=self.slider_section.sensitivity_slider.value(),
-            max_brightness=self.slider_section.max_brightness_slider.value(),
-            min_brightness=self.slider_section.min_brightness_slider.value()
+        # Capture, analysis and the brightness write run on the worker thread;
+        # a tick is skipped if the previous one is still in flight.
+        self.power_state = self.power_monitor.state()
+        if self.power_state == LOCKED:
+            # Nothing to meter behind a locker; only check again later
+            self.timer.setInterval(self.power_monitor.schedule(self.scheduler, None, LOCKED))
+            self.brightness_controller.expected_tick_interval = None
+            return
+        self.brightness_worker.request_tick(
+            self.sensitivity, self.max_brightness, self.min_brightness
         )
-        self.status_section.status_label.setText(
-            f"Average Brightness: {avg_brightness:.2f}\n"
-            f"Adjusted Brightness: {target_brightness:.2f}%"
+
+    def on_tick_finished(self, avg_brightness, target_brightness, measured):
+        if self.brightness_controller.paused:
+            return  # A tick that was in flight when pausing
+        # A failed tick keeps the polling rate instead of reading as a black screen
+        interval = self.power_monitor.schedule(
+            self.scheduler, avg_brightness if measured else None, self.power_state
         )
+        if interval != self.timer.interval():
+            self.timer.setInterval(interval)
+        self.brightness_controller.expected_tick_interval = interval / 1000
+        if measured or self.last_tick is None:
+            self.last_tick = (avg_brightness, target_brightness, interval)
+        else:
+            self.last_tick = self.last_tick[:2] + (interval,)
+        if self.isVisible():
+            self.refresh_status(*self.last_tick)
+
+    def refresh_status(self, avg_brightness, target_brightness, interval):
+        self.status_section.update_status(avg_brightness, target_brightness)
+        self.status_section.update_polling(interval, self.scheduler.rate_hz)
+        self.status_section.update_metrics(self.brightness_controller.metrics)
+        self.status_section.update_health(self.brightness_controller.health)
 
     def toggle_pause(self):
         if self.brightness_controller.paused:
@@ -95,15 +330,28 @@ class UI(QMainWindow):
         else:
             self.pause_automatic_control()
 
+    def on_override_changed(self, active):
+        if active:
+            self.timer.stop()
+            brightness = self.brightness_controller.current_manual_brightness
+            if brightness is not None:
+                self.manual_brightness = brightness
+        else:
+            self.scheduler.reset()
+            self.timer.start(self.scheduler.interval_ms)
+        self.sync_widgets()
+
     def resume_automatic_control(self):
         self.brightness_controller.resume()
-        self.button_section.pause_button.setText("Pause")
-        self._toggle_slider_visibility(True)
+        self.scheduler.reset()
+        self.timer.start(self.scheduler.interval_ms)
+        self.sync_widgets()
 
     def pause_automatic_control(self):
+        # Stop ticking entirely instead of running no-op ticks while paused
+        self.timer.stop()
         self.brightness_controller.pause()
-        self.button_section.pause_button.setText("Resume")
-        self._toggle_slider_visibility(False)
+        self.sync_widgets()
 
     def _toggle_slider_visibility(self, show_automatic):
         # Toggle visibility of automatic control sliders
@@ -119,4 +367,5 @@ class UI(QMainWindow):
         self.slider_section.manual_brightness_label.setVisible(not show_automatic)
 
     def set_manual_brightness(self, value):
-        self.brightness_controller.set_manual_brightness(value)
\ No newline at end of file
+        self.manual_brightness = value
+        self.brightness_worker.request_manual_brightness(value)
\ No newline at end of file
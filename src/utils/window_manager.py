@@ -28,9 +28,12 @@ class WindowManager:
         self.tray_icon.setContextMenu(tray_menu)
         self.tray_icon.activated.connect(self.tray_icon_activated)
 
+    def show_tray(self):
+        self.tray_icon.show()
+
     def minimize(self):
         self.main_window.hide()
-        self.tray_icon.show()
+        self.show_tray()
         self.tray_icon.showMessage(
             "Glimmer",
             "Application minimized to tray. Click the tray icon to restore.",